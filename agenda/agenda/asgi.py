@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'agenda.settings')
+# Sob ASGI as views de contatos usam as versões async (core/async_views.py).
+os.environ.setdefault('AGENDA_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,7 +58,7 @@ ROOT_URLCONF = 'agenda.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -80,6 +84,69 @@ DATABASES = {
     }
 }
 
+# Perfil de execução: `production` liga o ajuste do SQLite abaixo e as
+# conexões persistentes. Escolhido pela variável de ambiente AGENDA_PROFILE.
+AGENDA_PROFILE = os.environ.get('AGENDA_PROFILE', 'development')
+
+# PRAGMAs aplicados a cada nova conexão SQLite (core.sqlite). Em produção:
+# WAL (leitores não bloqueiam o escritor), fsync só nos checkpoints, espera
+# de até 5s por um lock em vez de falhar, 256 MB de mmap e 64 MB de cache.
+AGENDA_SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'temp_store': 'MEMORY',
+}
+AGENDA_SQLITE_PRAGMAS = {}
+
+if AGENDA_PROFILE == 'production':
+    AGENDA_SQLITE_PRAGMAS = AGENDA_SQLITE_PRODUCTION_PRAGMAS
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        # Transações de escrita pegam o lock já no BEGIN: com WAL, isso evita
+        # o "database is locked" imediato ao promover uma leitura a escrita.
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    })
+
+# Usuário autenticado em cache por alguns segundos (core.backends): com as
+# sessões em cache, uma página autenticada não consulta o banco para saber
+# quem está logado. 0 desliga.
+AGENDA_USER_CACHE_TTL = 0
+
+if AGENDA_PROFILE == 'production':
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    AGENDA_USER_CACHE_TTL = 60
+    # Sessões e usuários em cache precisam de um cache compartilhado pelos
+    # processos, senão um logout num processo não vale nos outros: Redis com
+    # AGENDA_REDIS_URL, ou arquivos em AGENDA_CACHE_DIR (mesmo servidor).
+    if os.environ.get('AGENDA_REDIS_URL'):
+        CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['AGENDA_REDIS_URL'],
+        }}
+    else:
+        CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('AGENDA_CACHE_DIR', '/var/tmp/agenda-cache'),
+        }}
+
+# Réplicas de leitura: arquivos SQLite separados por vírgula em AGENDA_REPLICAS,
+# atualizados a partir do banco principal pelo comando `sync_replicas`. As
+# leituras de contatos vão para elas (core.routers); depois de um POST, o
+# usuário lê do principal por AGENDA_REPLICA_PIN_SECONDS para ver o que gravou.
+AGENDA_READ_REPLICAS = []
+AGENDA_REPLICA_PIN_SECONDS = 10
+
+for number, path in enumerate(filter(None, os.environ.get('AGENDA_REPLICAS', '').split(',')), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': path.strip(), 'TEST': {'MIRROR': 'default'}}
+    AGENDA_READ_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -99,9 +166,109 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = [
+    'core.backends.EmailBackend',
+]
 
 LOGIN_URL = '/login/'
 LOGOUT_URL = '/logout/'
+
+# Views de contatos assíncronas (ligado por padrão em agenda/asgi.py)
+AGENDA_ASYNC_VIEWS = os.environ.get('AGENDA_ASYNC_VIEWS', '0') == '1'
+
+# Paginação da lista de contatos (por cursor)
+AGENDA_PAGE_SIZE = 50
+AGENDA_MAX_PAGE_SIZE = 500
+
+# Autocompletar da busca: sugestões por requisição e por quanto tempo o
+# navegador pode reaproveitar a resposta de um mesmo prefixo.
+AGENDA_AUTOCOMPLETE_LIMIT = 10
+AGENDA_AUTOCOMPLETE_MAX_LIMIT = 25
+AGENDA_AUTOCOMPLETE_MAX_AGE = 10
+
+# Fragmentos da listagem em cache (invalidados por versão a cada escrita).
+# Com vários processos, use um backend de cache compartilhado (Redis,
+# Memcached, arquivo); o timeout limita quanto um processo pode ficar defasado.
+AGENDA_LIST_CACHE_TIMEOUT = 300
+
+# Importação em lote: contatos por transação e limite de erros no relatório
+AGENDA_IMPORT_BATCH_SIZE = 1000
+AGENDA_IMPORT_MAX_ERRORS = 1000
+
+# Exportação: linhas lidas do banco (e enviadas) por bloco
+AGENDA_EXPORT_CHUNK_SIZE = 2000
+
+# API JSON: máximo de contatos por requisição de lote
+AGENDA_API_MAX_BATCH = 1000
+
+# Feed de sincronização (api/contacts/changes/): alterações por página e
+# por quantos dias as exclusões ficam registradas. Um cursor mais antigo
+# que isso recebe 410 e o cliente sincroniza do zero.
+AGENDA_SYNC_PAGE_SIZE = 500
+AGENDA_SYNC_MAX_PAGE_SIZE = 2000
+AGENDA_SYNC_TOMBSTONE_DAYS = 30
+
+# Eventos ao vivo da listagem (Server-Sent Events, só sob ASGI). O backend
+# padrão consulta o log de alterações a cada AGENDA_EVENTS_POLL_INTERVAL
+# segundos e vê escritas de todos os processos; core.events.LocalBackend só
+# vê as deste processo, mas não depende do log (que exige SQLite). Cada
+# conexão guarda até AGENDA_EVENTS_QUEUE_SIZE eventos e recebe um comentário
+# a cada AGENDA_EVENTS_KEEPALIVE segundos sem eventos.
+AGENDA_EVENTS_BACKEND = 'core.events.ChangeLogBackend'
+AGENDA_EVENTS_POLL_INTERVAL = 1.0
+AGENDA_EVENTS_POLL_BATCH = 500
+AGENDA_EVENTS_QUEUE_SIZE = 100
+AGENDA_EVENTS_KEEPALIVE = 25
+AGENDA_EVENTS_REPLAY_LIMIT = 500
+
+# Tarefas em segundo plano (core/jobs.py, comando run_jobs): arquivos das
+# importações e exportações, tarefas simultâneas por worker, espera entre
+# tentativas (dobra a cada falha) e após quanto tempo sem progresso uma
+# tarefa "executando" volta para a fila. Importações acima de
+# AGENDA_JOBS_IMPORT_MIN_BYTES e exportações acima de
+# AGENDA_JOBS_EXPORT_MIN_ROWS contatos vão para a fila.
+AGENDA_JOBS_DIR = os.environ.get('AGENDA_JOBS_DIR', str(BASE_DIR / 'jobs'))
+AGENDA_JOBS_CONCURRENCY = 2
+AGENDA_JOBS_POLL_INTERVAL = 1.0
+AGENDA_JOBS_RETRY_DELAY = 30
+AGENDA_JOBS_STALE_AFTER = 600
+AGENDA_JOBS_IMPORT_MIN_BYTES = 1024 * 1024
+AGENDA_JOBS_EXPORT_MIN_ROWS = 50000
+
+# Admin: com filtros ou busca, a contagem da changelist para neste número
+# de linhas (sem filtros o total é estimado pelos ids).
+AGENDA_ADMIN_COUNT_LIMIT = 10000
+
+# Consultas, tempo de banco, de templates e da view em cada requisição
+# (cabeçalho Server-Timing e log `core.timing`). Desligado por padrão.
+AGENDA_REQUEST_TIMING = os.environ.get('AGENDA_REQUEST_TIMING', '0') == '1'
+
+# Métricas no formato do Prometheus em /metrics. Com vários processos de
+# aplicação, aponte AGENDA_METRICS_DIR para um diretório local compartilhado
+# por eles (limpo a cada deploy); cada processo grava ali seus valores a cada
+# AGENDA_METRICS_FLUSH_INTERVAL segundos.
+#
+# O /metrics só responde ao cabeçalho `Authorization: Bearer <token>` com
+# AGENDA_METRICS_TOKEN ou a um usuário da equipe (is_staff) logado; sem
+# token definido, fica aberto com DEBUG. AGENDA_METRICS_PUBLIC=1 dispensa a
+# autenticação, para quando só o Prometheus alcança o endpoint.
+AGENDA_METRICS = os.environ.get('AGENDA_METRICS', '1') == '1'
+AGENDA_METRICS_DIR = os.environ.get('AGENDA_METRICS_DIR') or None
+AGENDA_METRICS_FLUSH_INTERVAL = 1.0
+AGENDA_METRICS_TOKEN = os.environ.get('AGENDA_METRICS_TOKEN') or None
+AGENDA_METRICS_PUBLIC = os.environ.get('AGENDA_METRICS_PUBLIC', '0') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.0/topics/i18n/
 LANGUAGE_CODE = 'pt-br'
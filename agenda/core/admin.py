@@ -1,3 +1,118 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.db.models import Count
 
-# Register your models here.
+from core.bulk import delete_matching, update_matching
+from core.models import Agenda
+from core.pagination import EstimatedCountPaginator
+from core.search import filter_contacts
+
+# DDDs válidos no Brasil: a lista do filtro não precisa consultar o banco.
+DDDS = (
+    '11', '12', '13', '14', '15', '16', '17', '18', '19', '21', '22', '24', '27', '28',
+    '31', '32', '33', '34', '35', '37', '38', '41', '42', '43', '44', '45', '46', '47',
+    '48', '49', '51', '53', '54', '55', '61', '62', '63', '64', '65', '66', '67', '68',
+    '69', '71', '73', '74', '75', '77', '79', '81', '82', '83', '84', '85', '86', '87',
+    '88', '89', '91', '92', '93', '94', '95', '96', '97', '98', '99',
+)
+
+TOP_DOMAINS = 20
+TOP_DOMAINS_CACHE_KEY = 'agenda:admin:top-domains'
+TOP_DOMAINS_CACHE_TIMEOUT = 600
+
+
+class EmailDomainFilter(admin.SimpleListFilter):
+    title = 'domínio do e-mail'
+    parameter_name = 'dominio'
+
+    def lookups(self, request, model_admin):
+        # Contar por domínio percorre o índice inteiro: os mais frequentes
+        # ficam em cache. Outros domínios podem ser filtrados pela URL.
+        domains = cache.get(TOP_DOMAINS_CACHE_KEY)
+        if domains is None:
+            domains = list(
+                Agenda.objects.exclude(email_dominio='')
+                .values('email_dominio')
+                .annotate(total=Count('id'))
+                .order_by('-total', 'email_dominio')
+                .values_list('email_dominio', flat=True)[:TOP_DOMAINS]
+            )
+            cache.set(TOP_DOMAINS_CACHE_KEY, domains, TOP_DOMAINS_CACHE_TIMEOUT)
+        return [(domain, domain) for domain in domains]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(email_dominio=self.value().strip().lower())
+        return queryset
+
+
+class DddFilter(admin.SimpleListFilter):
+    title = 'DDD'
+    parameter_name = 'ddd'
+
+    def lookups(self, request, model_admin):
+        return [(ddd, ddd) for ddd in DDDS]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(ddd=self.value())
+        return queryset
+
+
+class AgendaChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # Só as colunas exibidas; o formulário de edição usa o queryset completo.
+        return super().get_queryset(request, exclude_parameters).only(*AgendaAdmin.changelist_fields)
+
+
+@admin.register(Agenda)
+class AgendaAdmin(admin.ModelAdmin):
+    """
+    Admin de contatos para tabelas com milhões de linhas: sem COUNT(*)
+    exato, busca pelo índice FTS, filtros por colunas indexadas, ordem pela
+    chave primária e ações que rodam como um único UPDATE/DELETE.
+    """
+    list_display = ('nome_completo', 'email', 'telefone', 'owner', 'atualizado_em')
+    changelist_fields = ('nome_completo', 'email', 'telefone', 'atualizado_em', 'owner__username')
+    list_select_related = ('owner',)
+    list_filter = (EmailDomainFilter, DddFilter)
+    search_fields = ('nome_completo',)
+    search_help_text = 'Busca por nome, e-mail, telefone ou observação.'
+    readonly_fields = ('owner', 'criado_em', 'atualizado_em')
+    ordering = ('-id',)
+    # Ordenar por outra coluna exigiria ordenar a tabela inteira.
+    sortable_by = ()
+    list_per_page = 100
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('limpar_observacao', 'excluir_em_lote')
+
+    def get_changelist(self, request, **kwargs):
+        return AgendaChangeList
+
+    def save_model(self, request, obj, form, change):
+        # O dono não é editável: contatos criados pelo admin ficam com quem os criou.
+        if not change and obj.owner_id is None:
+            obj.owner = request.user
+        super().save_model(request, obj, form, change)
+
+    def get_search_results(self, request, queryset, search_term):
+        return filter_contacts(queryset, search_term), False
+
+    def get_actions(self, request):
+        # O delete_selected padrão carrega cada contato (e o que depende dele)
+        # para a página de confirmação; excluir_em_lote substitui.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Limpar observação dos contatos selecionados', permissions=['change'])
+    def limpar_observacao(self, request, queryset):
+        updated = update_matching(queryset, observacao='')
+        self.message_user(request, f'{updated} contato(s) atualizado(s).', messages.SUCCESS)
+
+    @admin.action(description='Excluir contatos selecionados (em lote)', permissions=['delete'])
+    def excluir_em_lote(self, request, queryset):
+        deleted = delete_matching(queryset)
+        self.message_user(request, f'{deleted} contato(s) excluído(s).', messages.SUCCESS)
@@ -0,0 +1,99 @@
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from core import sync
+from core.bulk import create_batch, delete_batch, update_batch
+from core.pagination import InvalidCursor
+
+
+def api_login_required(view):
+    # Clientes de API não seguem o redirecionamento para a tela de login.
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'erro': 'Autenticação necessária.'}, status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def read_batch(request, key):
+    """
+    Lê do corpo JSON a lista em `key`. Devolve (itens, None) ou
+    (None, resposta de erro).
+    """
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return None, JsonResponse({'erro': 'JSON inválido.'}, status=400)
+    items = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return None, JsonResponse({'erro': f'Informe a lista "{key}".'}, status=400)
+    if len(items) > settings.AGENDA_API_MAX_BATCH:
+        return None, JsonResponse(
+            {'erro': f'O lote aceita no máximo {settings.AGENDA_API_MAX_BATCH} itens.'}, status=400
+        )
+    return items, None
+
+
+def batch_response(results):
+    return JsonResponse({'results': results})
+
+
+@require_POST
+@api_login_required
+def create_contacts(request):
+    items, error = read_batch(request, 'contacts')
+    if error:
+        return error
+    return batch_response(create_batch(items, request.user))
+
+
+@require_POST
+@api_login_required
+def update_contacts(request):
+    items, error = read_batch(request, 'contacts')
+    if error:
+        return error
+    return batch_response(update_batch(items, request.user))
+
+
+@require_POST
+@api_login_required
+def delete_contacts(request):
+    ids, error = read_batch(request, 'ids')
+    if error:
+        return error
+    return batch_response(delete_batch(ids, request.user))
+
+
+def get_sync_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.AGENDA_SYNC_PAGE_SIZE))
+    except ValueError:
+        limit = settings.AGENDA_SYNC_PAGE_SIZE
+    return max(1, min(limit, settings.AGENDA_SYNC_MAX_PAGE_SIZE))
+
+
+@require_GET
+@api_login_required
+def contact_changes(request):
+    """
+    Criações, alterações e exclusões desde `cursor`, na ordem em que
+    aconteceram. Sem cursor, devolve todos os contatos (carga inicial). O
+    cliente guarda o `cursor` da resposta e repete enquanto `has_more`.
+    """
+    if not sync.is_supported():
+        return JsonResponse({'erro': 'Sincronização indisponível neste banco.'}, status=501)
+    cursor = request.GET.get('cursor')
+    try:
+        after = sync.parse_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        return JsonResponse({'erro': 'Cursor inválido.'}, status=400)
+    except sync.CursorExpired:
+        return JsonResponse({'erro': 'Cursor expirado: sincronize do zero.'}, status=410)
+    changes, next_cursor, has_more = sync.changes_since(request.user.pk, after, get_sync_limit(request))
+    return JsonResponse({'changes': changes, 'cursor': next_cursor, 'has_more': has_more})
@@ -0,0 +1,21 @@
+from django.urls import path
+from core import async_views
+from core.urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    'list_contacts': async_views.list_contacts,
+    'search_contacts': async_views.search_contacts,
+    'autocomplete_contacts': async_views.autocomplete_contacts,
+    'contact_detail': async_views.contact_detail,
+    'create_contact': async_views.create_contact,
+    'update_contact': async_views.update_contact,
+    'delete_contact': async_views.delete_contact,
+    'contact_events': async_views.contact_events,
+}
+
+# Mesmas rotas e nomes de core.urls, trocando as views de contatos pelas
+# versões assíncronas; as demais continuam síncronas.
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS.get(pattern.name, pattern.callback), name=pattern.name)
+    for pattern in sync_urlpatterns
+]
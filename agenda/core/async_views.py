@@ -0,0 +1,169 @@
+"""
+Versões assíncronas das views de contatos, servidas quando a aplicação roda
+sob ASGI (ver core/async_urls.py). Usam a API assíncrona do ORM e não ocupam
+uma thread do pool do sync_to_async enquanto esperam pelo banco.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+from core import events
+from core.cache import alist_cache_key
+from core.conditional import (
+    add_contact_validators, contact_list_etag, contact_list_last_modified, contact_not_modified, is_partial,
+)
+from core.forms import AgendaForm
+from core.pagination import KeysetPaginator, InvalidCursor
+from core.search import aautocomplete, asearch_contacts
+from core.views import (
+    autocomplete_response, contacts_queryset, get_autocomplete_limit, get_page_size,
+    owner_contacts, parse_id, render_contact_form, render_contact_row,
+)
+
+
+async def resolve_user(request):
+    # request.user é um objeto preguiçoso que consultaria o banco de forma
+    # síncrona (no context processor de auth ou no escopo por dono); o
+    # login_required já buscou o usuário com auser(), que fica em cache.
+    request.user = await request.auser()
+    return request.user
+
+
+async def arender(request, template_name, context):
+    await resolve_user(request)
+    return render(request, template_name, context)
+
+
+async def arender_contact_list(request, kind, build_context):
+    # Versão assíncrona de core.views.render_contact_list.
+    context = {'query': request.GET.get('q', '').strip()}
+    key = await alist_cache_key(request, kind)
+    contact_list = await cache.aget(key)
+    if contact_list is None:
+        context.update(await build_context())
+        contact_list = render_to_string('_contact_list.html', context, request)
+        await cache.aset(key, contact_list, settings.AGENDA_LIST_CACHE_TIMEOUT)
+    context['contact_list'] = mark_safe(contact_list)
+    return await arender(request, 'list_contacts.html', context)
+
+
+@login_required
+@condition(etag_func=contact_list_etag, last_modified_func=contact_list_last_modified)
+async def list_contacts(request):
+    async def build_context():
+        await resolve_user(request)
+        paginator = KeysetPaginator(contacts_queryset(request), 'nome_ordenacao', get_page_size(request))
+        try:
+            page = await paginator.apage(after=request.GET.get('after'), before=request.GET.get('before'))
+        except InvalidCursor:
+            page = await paginator.apage()
+        return {'contacts': page.object_list, 'page': page}
+    return await arender_contact_list(request, 'list', build_context)
+
+
+@login_required
+async def search_contacts(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return redirect('list_contacts')
+
+    async def build_context():
+        user = await resolve_user(request)
+        return {'contacts': await asearch_contacts(query, get_page_size(request), user.pk)}
+    return await arender_contact_list(request, 'search', build_context)
+
+
+@login_required
+async def autocomplete_contacts(request):
+    prefix = request.GET.get('q', '').lstrip()
+    results = []
+    if prefix:
+        user = await resolve_user(request)
+        results = await aautocomplete(prefix, get_autocomplete_limit(request), user.pk)
+    return autocomplete_response(request, prefix, results)
+
+
+@login_required
+async def contact_detail(request, contact_id):
+    await resolve_user(request)
+    contact = await aget_object_or_404(owner_contacts(request), id=contact_id)
+    return JsonResponse(contact.to_dict())
+
+
+@login_required
+async def create_contact(request):
+    if request.method == 'POST':
+        form = AgendaForm(request.POST)
+        # A validação do AgendaForm não consulta o banco; só a gravação é assíncrona.
+        if form.is_valid():
+            form.instance.owner = await resolve_user(request)
+            await form.instance.asave()
+            if is_partial(request):
+                return render_contact_row(request, form.instance, status=201)
+            return redirect('list_contacts')
+    else:
+        form = AgendaForm()
+    await resolve_user(request)
+    return render_contact_form(request, 'create_contact.html', form)
+
+
+@login_required
+async def update_contact(request, contact_id):
+    await resolve_user(request)
+    contact = await aget_object_or_404(owner_contacts(request), id=contact_id)
+    if request.method == 'POST':
+        form = AgendaForm(request.POST, instance=contact)
+        if form.is_valid():
+            await form.instance.asave()
+            if is_partial(request):
+                return render_contact_row(request, contact)
+            return redirect('list_contacts')
+    else:
+        not_modified = contact_not_modified(request, contact)
+        if not_modified is not None:
+            return not_modified
+        form = AgendaForm(instance=contact)
+    response = render_contact_form(request, 'update_contact.html', form, contact)
+    return add_contact_validators(request, response, contact)
+
+
+@login_required
+async def delete_contact(request, contact_id):
+    await resolve_user(request)
+    contact = await aget_object_or_404(owner_contacts(request), id=contact_id)
+    if request.method == 'POST':
+        await contact.adelete()
+        if is_partial(request):
+            return HttpResponse(status=204)
+    return redirect('list_contacts')
+
+
+@login_required
+async def contact_events(request):
+    """
+    Eventos ao vivo dos contatos do usuário (Server-Sent Events). Numa
+    reconexão, o navegador manda o último id recebido e os eventos perdidos
+    são repetidos a partir do log de alterações.
+    """
+    user = await resolve_user(request)
+    subscription = events.broker.subscribe(user.pk)
+    try:
+        await events.get_backend().start()
+        # Um Last-Event-ID que não é um seq válido é ignorado: o stream começa do zero.
+        last_event_id = parse_id(request.headers.get('Last-Event-ID'))
+        missed = []
+        if last_event_id is not None:
+            missed = await sync_to_async(events.missed_events)(user.pk, last_event_id)
+    except BaseException:
+        subscription.close()
+        raise
+    response = StreamingHttpResponse(events.stream(subscription, missed), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Sem buffer no nginx: cada evento sai assim que é gerado.
+    response['X-Accel-Buffering'] = 'no'
+    return response
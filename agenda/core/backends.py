@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+UserModel = get_user_model()
+
+
+def user_cache_key(user_id):
+    return f'agenda:user:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class EmailBackend(ModelBackend):
+    """
+    Autentica pelo e-mail com uma única consulta, usando o índice único
+    parcial de auth_user.email (migração core 0006). Sem e-mail, cai no
+    comportamento padrão do ModelBackend (login por username, admin).
+
+    Com AGENDA_USER_CACHE_TTL, o usuário de cada requisição vem do cache;
+    core.signals o descarta quando ele é salvo (troca de senha, desativação)
+    ou faz logout.
+    """
+
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        if email is None:
+            return super().authenticate(request, username=username, password=password, **kwargs)
+        if not email or password is None:
+            return None
+        try:
+            # email__gt='' repete a condição do índice parcial para que o
+            # SQLite possa usá-lo.
+            user = UserModel._default_manager.get(email=email, email__gt='')
+        except UserModel.DoesNotExist:
+            # Roda o hasher mesmo sem usuário, para que o tempo de resposta
+            # não revele se o e-mail está cadastrado.
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        ttl = settings.AGENDA_USER_CACHE_TTL
+        if not ttl:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, ttl)
+        return user
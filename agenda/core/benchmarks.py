@@ -0,0 +1,331 @@
+import platform
+import random
+import sqlite3
+import threading
+import time
+import tracemalloc
+from http import HTTPStatus
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Agenda
+from core.sqlite import apply_pragmas
+
+DATASETS = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+SEED_BATCH_SIZE = 5000
+
+USERNAME = 'benchmark'
+EMAIL = 'benchmark@fatec.sp.gov.br'
+PASSWORD = 'benchmark123'
+
+FIRST_NAMES = ('Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor',
+               'Isabela', 'João', 'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael')
+LAST_NAMES = ('Almeida', 'Barbosa', 'Cardoso', 'Dias', 'Esteves', 'Ferreira', 'Gomes', 'Lima',
+              'Martins', 'Nogueira', 'Oliveira', 'Pereira', 'Ribeiro', 'Santos', 'Souza', 'Teixeira')
+
+
+def contact_data(rng, number):
+    nome = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}'
+    ddd = rng.randint(11, 99)
+    return {
+        'nome_completo': nome,
+        'telefone': f'({ddd}) 9{rng.randint(0, 9999):04d}-{number % 10000:04d}',
+        'email': f'contato{number}@example.com',
+        'observacao': '' if number % 3 else f'Observação do contato {number}',
+    }
+
+
+def seed_contacts(rows, seed=0, owner=None):
+    """
+    Grava `rows` contatos de `owner` gerados de forma determinística a partir
+    de `seed` (o mesmo seed sempre produz os mesmos dados) e devolve seus ids.
+    """
+    rng = random.Random(seed)
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        batch = []
+        for number in range(start, min(start + SEED_BATCH_SIZE, rows)):
+            contact = Agenda(owner=owner, **contact_data(rng, number))
+            contact.refresh_derived_fields()
+            batch.append(contact)
+        Agenda.objects.bulk_create(batch)
+    return list(Agenda.objects.filter(owner=owner).order_by('id').values_list('id', flat=True))
+
+
+def percentile(samples, p):
+    # Interpolação linear entre as duas amostras vizinhas (como numpy).
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+# Execuções extras de cada cenário, fora da medição de tempo, com o
+# tracemalloc ligado (que deixaria as requisições bem mais lentas).
+MEMORY_SAMPLES = 3
+
+
+def peak_alloc_kb(scenario, samples=MEMORY_SAMPLES):
+    """
+    Maior pico de memória alocada pelo Python durante uma requisição do
+    cenário. O ru_maxrss é o pico do processo inteiro, quase sempre o da
+    carga dos dados: não distingue um cenário do outro.
+    """
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            state = scenario.prepare(i)
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            scenario.request(state)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return peak // 1024
+
+
+class Scenario:
+    """
+    Uma requisição medida repetidamente. `prepare(i)` roda fora da medição e
+    devolve o que `request` recebe; `expected` é o status que a resposta deve ter.
+    """
+
+    def __init__(self, name, request, expected, prepare=None):
+        self.name = name
+        self.request = request
+        self.expected = expected
+        self.prepare = prepare or (lambda i: None)
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def measure(scenario, iterations, warmup=0):
+    timings, queries = [], []
+    for i in range(warmup + iterations):
+        state = scenario.prepare(i)
+        # O log de consultas tem tamanho fixo e já chega cheio depois da carga
+        # dos dados; cheio, a contagem do CaptureQueriesContext dá zero.
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter_ns()
+            response = scenario.request(state)
+            elapsed = time.perf_counter_ns() - start
+        if response.status_code != scenario.expected:
+            raise BenchmarkError(
+                f'{scenario.name}: status {response.status_code}, esperado {scenario.expected}.'
+            )
+        if i >= warmup:
+            timings.append(elapsed / 1_000_000)
+            queries.append(len(captured))
+    total = sum(timings)
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(total / iterations, 3),
+        'throughput_rps': round(iterations / (total / 1000), 1) if total else None,
+        'queries_mean': round(sum(queries) / iterations, 2),
+        'queries_max': max(queries),
+        'peak_alloc_kb': peak_alloc_kb(scenario),
+    }
+
+
+def build_scenarios(ids, seed=0):
+    """
+    Cenários das views principais sobre os contatos `ids` já gravados. As
+    exclusões consomem ids do fim da lista; as edições usam os do começo.
+    """
+    rng = random.Random(seed + 1)
+    client = Client()
+    client.login(username=USERNAME, password=PASSWORD)
+    to_delete = list(reversed(ids))
+
+    def login(fresh_client):
+        return fresh_client.post(reverse('login'), {'email': EMAIL, 'password': PASSWORD})
+
+    def list_contacts_cold(_):
+        return client.get(reverse('list_contacts'))
+
+    def clear_cache(i):
+        cache.clear()
+
+    def list_contacts_cached(_):
+        return client.get(reverse('list_contacts'))
+
+    def autocomplete(prefix):
+        return client.get(reverse('autocomplete_contacts'), {'q': prefix})
+
+    def create_contact(data):
+        return client.post(reverse('create_contact'), data)
+
+    def update_contact(args):
+        contact_id, data = args
+        return client.post(reverse('update_contact', args=[contact_id]), data)
+
+    def delete_contact(contact_id):
+        return client.post(reverse('delete_contact', args=[contact_id]))
+
+    return [
+        Scenario('login', login, HTTPStatus.FOUND, prepare=lambda i: Client()),
+        Scenario('list_contacts', list_contacts_cold, HTTPStatus.OK, prepare=clear_cache),
+        Scenario('list_contacts_cached', list_contacts_cached, HTTPStatus.OK),
+        # Prefixos de 1 a 4 letras de um nome, como numa digitação.
+        Scenario('autocomplete', autocomplete, HTTPStatus.OK,
+                 prepare=lambda i: FIRST_NAMES[i % len(FIRST_NAMES)][:i % 4 + 1]),
+        Scenario('create_contact', create_contact, HTTPStatus.FOUND,
+                 prepare=lambda i: contact_data(rng, len(ids) + i)),
+        Scenario('update_contact', update_contact, HTTPStatus.FOUND,
+                 prepare=lambda i: (ids[i % len(ids)], contact_data(rng, i))),
+        Scenario('delete_contact', delete_contact, HTTPStatus.FOUND,
+                 prepare=lambda i: to_delete.pop()),
+    ]
+
+
+def run_benchmarks(rows, iterations, warmup=5, seed=0, only=None):
+    """
+    Popula o banco atual com `rows` contatos e mede cada cenário. Deve rodar
+    num banco descartável (o comando `benchmark` usa um banco de teste).
+    """
+    if rows < (warmup + iterations + MEMORY_SAMPLES) * 2:
+        raise BenchmarkError('O conjunto de dados é pequeno demais para o número de iterações.')
+    user = get_user_model().objects.create_user(username=USERNAME, email=EMAIL, password=PASSWORD)
+    start = time.perf_counter()
+    ids = seed_contacts(rows, seed, owner=user)
+    seed_seconds = time.perf_counter() - start
+
+    results = {}
+    for scenario in build_scenarios(ids, seed):
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = measure(scenario, iterations, warmup)
+    return {
+        'meta': {
+            'rows': rows,
+            'iterations': iterations,
+            'warmup': warmup,
+            'seed': seed,
+            'seed_seconds': round(seed_seconds, 2),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.machine(),
+            'date': timezone.now().isoformat(),
+        },
+        'scenarios': results,
+    }
+
+
+def compare(results, baseline, metric='p95_ms'):
+    """
+    Variação percentual de `metric` em cada cenário presente nos dois
+    resultados (positiva quando ficou mais lento).
+    """
+    changes = {}
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous or not previous.get(metric):
+            continue
+        changes[name] = round((current[metric] - previous[metric]) / previous[metric] * 100, 1)
+    return changes
+
+
+SQLITE_SCHEMA = (
+    'CREATE TABLE contato (id INTEGER PRIMARY KEY, nome_completo TEXT NOT NULL, '
+    'telefone TEXT NOT NULL, email TEXT NOT NULL)',
+    'CREATE INDEX contato_nome_idx ON contato (nome_completo, id)',
+)
+
+
+def _sqlite_connect(path, pragmas, timeout):
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    apply_pragmas(conn, pragmas)
+    return conn
+
+
+def sqlite_throughput(path, pragmas, persistent, readers=4, writers=1, duration=5.0,
+                      rows=10_000, timeout=5.0, seed=0):
+    """
+    Leituras (páginas da listagem) e escritas (cadastros) concorrentes em
+    threads sobre um arquivo SQLite novo em `path`. Sem `persistent`, cada
+    operação abre a própria conexão, como uma requisição com CONN_MAX_AGE=0.
+    """
+    rng = random.Random(seed)
+    setup = _sqlite_connect(path, pragmas, timeout)
+    for statement in SQLITE_SCHEMA:
+        setup.execute(statement)
+    setup.executemany(
+        'INSERT INTO contato (nome_completo, telefone, email) VALUES (?, ?, ?)',
+        ((d['nome_completo'], d['telefone'], d['email']) for d in (contact_data(rng, n) for n in range(rows))),
+    )
+    setup.commit()
+    setup.close()
+
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(readers + writers)
+
+    def read(conn, worker_rng):
+        start = worker_rng.choice(FIRST_NAMES)
+        conn.execute(
+            'SELECT id, nome_completo, telefone, email FROM contato '
+            'WHERE nome_completo >= ? ORDER BY nome_completo, id LIMIT 50', (start,)
+        ).fetchall()
+
+    def write(conn, worker_rng):
+        data = contact_data(worker_rng, worker_rng.randint(rows, rows * 10))
+        with conn:
+            conn.execute(
+                'INSERT INTO contato (nome_completo, telefone, email) VALUES (?, ?, ?)',
+                (data['nome_completo'], data['telefone'], data['email']),
+            )
+
+    def worker(operation, kind, number):
+        worker_rng = random.Random(seed * 1000 + number)
+        done = errors = 0
+        conn = _sqlite_connect(path, pragmas, timeout) if persistent else None
+        barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            current = conn or _sqlite_connect(path, pragmas, timeout)
+            try:
+                operation(current, worker_rng)
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+            finally:
+                if conn is None:
+                    current.close()
+        if conn is not None:
+            conn.close()
+        with lock:
+            counts[kind] += done
+            counts['errors'] += errors
+
+    threads = [
+        threading.Thread(target=worker, args=(read, 'reads', i)) for i in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=(write, 'writes', readers + i)) for i in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'readers': readers,
+        'writers': writers,
+        'reads_per_s': round(counts['reads'] / duration, 1),
+        'writes_per_s': round(counts['writes'] / duration, 1),
+        'errors': counts['errors'],
+    }
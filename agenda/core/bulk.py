@@ -0,0 +1,340 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.cache import bump_contacts_version
+from core.forms import AgendaForm, validate_telefone
+from core.importers import InvalidImportFile, open_text, read_rows
+from core.models import Agenda, DuplicateCandidate
+from core.sqlite import max_query_params
+
+
+class ContactValidator:
+    """
+    Valida dados de contato com as regras do AgendaForm: o clean() de cada
+    campo do formulário (obrigatório, tamanho e formato, com as mensagens do
+    Meta) e validate_telefone, a regra do clean_telefone.
+
+    Criar um ModelForm por linha copia (deepcopy) todos os campos e repete,
+    na validação do modelo, o que os campos já verificaram; esse custo
+    dominava importações grandes. Contatos novos são criados com o dono
+    `owner`.
+    """
+
+    fields = AgendaForm.base_fields
+
+    def __init__(self, owner=None):
+        self.owner = owner
+
+    def clean(self, data):
+        """
+        Devolve (dados limpos, None) ou (None, erros por campo).
+        """
+        cleaned, errors = {}, {}
+        for name, field in self.fields.items():
+            try:
+                cleaned[name] = field.clean(data.get(name))
+            except ValidationError as e:
+                errors[name] = e.messages
+        # Como no formulário, a regra do telefone só roda se o campo passou.
+        if 'telefone' in cleaned:
+            try:
+                validate_telefone(cleaned['telefone'])
+            except ValidationError as e:
+                errors['telefone'] = e.messages
+        if errors:
+            return None, errors
+        return cleaned, None
+
+    def build(self, data, instance=None):
+        """
+        Devolve (contato não salvo, None) ou (None, erros por campo).
+        """
+        cleaned, errors = self.clean(data)
+        if errors:
+            return None, errors
+        contact = instance if instance is not None else Agenda(owner=self.owner)
+        for name, value in cleaned.items():
+            setattr(contact, name, value)
+        contact.refresh_derived_fields()
+        return contact, None
+
+
+class BulkReport:
+    def __init__(self, max_errors=None):
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        # Linha da última entrada lida: com o lote gravado, tudo até ela já
+        # foi importado ou recusado.
+        self.last_line = None
+        self.max_errors = settings.AGENDA_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+
+    @classmethod
+    def from_dict(cls, data, max_errors=None):
+        """Retoma um relatório salvo com to_dict() (e `linha`, se houver)."""
+        report = cls(max_errors)
+        report.created, report.error_count = data['criados'], data['com_erro']
+        report.errors = data['erros'][:report.max_errors]
+        report.last_line = data.get('linha')
+        return report
+
+    def add_error(self, line, errors):
+        # Só os primeiros erros ficam guardados, para a memória não crescer
+        # com arquivos inteiramente inválidos; o total continua sendo contado.
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'linha': line, 'erros': errors})
+
+    @property
+    def errors_truncated(self):
+        return self.error_count > len(self.errors)
+
+    def to_dict(self):
+        return {
+            'criados': self.created,
+            'com_erro': self.error_count,
+            'erros': self.errors,
+        }
+
+
+def bulk_create_contacts(rows, owner, batch_size=None, report=None, progress=None, checkpoint=None):
+    """
+    Valida e insere contatos de `owner` a partir de um iterável de (linha, dados).
+
+    As linhas são consumidas sob demanda e gravadas em lotes, uma transação
+    por lote, então a memória usada não depende do tamanho da entrada.
+    `progress(report)`, se informado, é chamado a cada lote gravado.
+    `checkpoint(report)` é chamado dentro da transação de cada lote, para
+    gravar junto com ele até onde a entrada foi importada. Com um `report`
+    retomado, as linhas até report.last_line são puladas.
+    """
+    batch_size = batch_size or settings.AGENDA_IMPORT_BATCH_SIZE
+    report = report or BulkReport()
+    validator = ContactValidator(owner)
+    resume_after = report.last_line
+    batch = []
+    for line, data in rows:
+        if resume_after is not None and line <= resume_after:
+            continue
+        report.last_line = line
+        cleaned, errors = validator.clean(data)
+        if errors:
+            report.add_error(line, errors)
+            continue
+        batch.append(cleaned)
+        if len(batch) >= batch_size:
+            _flush(batch, owner, report, checkpoint)
+            batch = []
+            if progress:
+                progress(report)
+    if batch:
+        _flush(batch, owner, report, checkpoint)
+    if progress:
+        progress(report)
+    return report
+
+
+INSERT_FIELDS = [field for field in Agenda._meta.concrete_fields if not field.primary_key]
+
+
+def _insert_contacts(batch, owner, using):
+    """
+    Grava os dados limpos de `batch` com INSERTs de várias linhas, tantas
+    quantas os parâmetros da consulta permitirem. O bulk_create instancia o
+    modelo e converte cada valor de cada objeto (get_db_prep_save); numa
+    importação grande, isso custava mais que a própria gravação. Os valores
+    aqui já são os que o SQLite grava: textos e o instante do lote.
+
+    Não usa executemany: cada linha seria um comando, e o FTS5 descarrega
+    o índice pendente em disco ao fim de cada comando que dispara os
+    triggers. Com um comando por bloco de linhas, a indexação da busca e o
+    registro de alterações custam cerca de um terço.
+    """
+    connection = connections[using]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in INSERT_FIELDS)
+    row = f"({', '.join(['%s'] * len(INSERT_FIELDS))})"
+    sql = f'INSERT INTO {connection.ops.quote_name(Agenda._meta.db_table)} ({columns}) VALUES '
+    params = []
+    for cleaned in batch:
+        values = {
+            'owner_id': owner.pk,
+            'criado_em': now,
+            'atualizado_em': now,
+            **cleaned,
+            **Agenda.derived_values(cleaned['nome_completo'], cleaned['telefone'], cleaned['email']),
+        }
+        params.append([values[field.attname] for field in INSERT_FIELDS])
+    limit = max_query_params(connection)
+    size = max(limit // len(INSERT_FIELDS), 1) if limit else len(params)
+    with connection.cursor() as cursor:
+        for start in range(0, len(params), size):
+            chunk = params[start:start + size]
+            cursor.execute(sql + ', '.join([row] * len(chunk)), [value for values in chunk for value in values])
+
+
+def _flush(batch, owner, report, checkpoint=None):
+    using = router.db_for_write(Agenda)
+    with transaction.atomic(using=using):
+        _insert_contacts(batch, owner, using)
+        report.created += len(batch)
+        if checkpoint:
+            checkpoint(report)
+    # O INSERT direto não dispara post_save.
+    bump_contacts_version(owner.pk)
+
+
+def import_file(fileobj, format, owner, batch_size=None, report=None, progress=None, checkpoint=None):
+    stream = open_text(fileobj)
+    try:
+        return bulk_create_contacts(
+            read_rows(stream, format), owner,
+            batch_size=batch_size, report=report, progress=progress, checkpoint=checkpoint,
+        )
+    except UnicodeDecodeError:
+        raise InvalidImportFile('O arquivo deve estar codificado em UTF-8.')
+    finally:
+        stream.detach()
+
+
+FORM_FIELDS = AgendaForm._meta.fields
+UPDATE_FIELDS = Agenda.with_derived_fields([*FORM_FIELDS, 'atualizado_em'])
+
+
+# Maior inteiro que o SQLite guarda (INTEGER com sinal de 64 bits).
+MAX_ID = 2 ** 63 - 1
+
+
+def is_contact_id(value):
+    # JSON decodifica true como bool, subclasse de int; um inteiro fora da
+    # faixa do SQLite estoura (OverflowError) ao virar parâmetro da consulta.
+    return isinstance(value, int) and not isinstance(value, bool) and -MAX_ID - 1 <= value <= MAX_ID
+
+
+def _invalid(index, errors):
+    return {'index': index, 'status': 'invalid', 'erros': errors}
+
+
+def create_batch(items, owner):
+    """
+    Valida uma lista de contatos de `owner` e insere os válidos em uma única
+    transação. Devolve um resultado por item, na ordem recebida.
+    """
+    validator = ContactValidator(owner)
+    results, contacts = [], []
+    for index, data in enumerate(items):
+        if not isinstance(data, dict):
+            results.append(_invalid(index, {'__all__': ['Item deve ser um objeto.']}))
+            continue
+        contact, errors = validator.build(data)
+        if errors:
+            results.append(_invalid(index, errors))
+            continue
+        results.append({'index': index, 'status': 'created'})
+        contacts.append((results[-1], contact))
+    if contacts:
+        with transaction.atomic():
+            Agenda.objects.bulk_create([contact for _, contact in contacts])
+        for result, contact in contacts:
+            result['id'] = contact.id
+        bump_contacts_version(owner.pk)
+    return results
+
+
+def update_batch(items, owner):
+    """
+    Atualiza parcialmente contatos de `owner`: campos ausentes no item mantêm
+    o valor atual. Os válidos são gravados com um único bulk_update.
+    """
+    validator = ContactValidator(owner)
+    ids = [item.get('id') for item in items if isinstance(item, dict)]
+    existing = Agenda.objects.filter(owner=owner).in_bulk([i for i in ids if is_contact_id(i)])
+    results, contacts, seen = [], [], set()
+    now = timezone.now()
+    for index, data in enumerate(items):
+        contact_id = data.get('id') if isinstance(data, dict) else None
+        if not is_contact_id(contact_id):
+            results.append(_invalid(index, {'id': ['Informe o id do contato.']}))
+            continue
+        if contact_id in seen:
+            results.append(_invalid(index, {'id': ['Contato repetido no lote.']}))
+            continue
+        seen.add(contact_id)
+        instance = existing.get(contact_id)
+        if instance is None:
+            results.append({'index': index, 'id': contact_id, 'status': 'not_found'})
+            continue
+        merged = {field: getattr(instance, field) for field in FORM_FIELDS}
+        merged.update((k, v) for k, v in data.items() if k in FORM_FIELDS)
+        contact, errors = validator.build(merged, instance=instance)
+        if errors:
+            results.append(_invalid(index, errors))
+            continue
+        # bulk_update não aplica auto_now.
+        contact.atualizado_em = now
+        contacts.append(contact)
+        results.append({'index': index, 'id': contact_id, 'status': 'updated'})
+    if contacts:
+        with transaction.atomic():
+            Agenda.objects.bulk_update(contacts, UPDATE_FIELDS)
+        bump_contacts_version(owner.pk)
+    return results
+
+
+def delete_batch(ids, owner):
+    valid_ids = {i for i in ids if is_contact_id(i)}
+    contacts = Agenda.objects.filter(owner=owner)
+    with transaction.atomic():
+        existing = set(contacts.filter(id__in=valid_ids).values_list('id', flat=True))
+        if existing:
+            contacts.filter(id__in=existing).delete()
+    results = []
+    for index, contact_id in enumerate(ids):
+        if not is_contact_id(contact_id):
+            results.append(_invalid(index, {'id': ['Informe o id do contato.']}))
+        else:
+            status = 'deleted' if contact_id in existing else 'not_found'
+            results.append({'index': index, 'id': contact_id, 'status': status})
+    return results
+
+
+def _owners(queryset):
+    return list(queryset.order_by().values_list('owner_id', flat=True).distinct())
+
+
+def update_matching(queryset, **values):
+    """
+    Altera todos os contatos de `queryset` com um único UPDATE. Não passa por
+    save(): só vale para campos sem derivados. Devolve quantos mudaram.
+    """
+    owners = _owners(queryset)
+    updated = queryset.update(atualizado_em=timezone.now(), **values)
+    for owner_id in owners:
+        bump_contacts_version(owner_id)
+    return updated
+
+
+def delete_matching(queryset):
+    """
+    Exclui todos os contatos de `queryset` com um único DELETE (mais o dos
+    candidatos a duplicata que os citam). O queryset.delete() carregaria cada
+    contato para disparar o post_delete; aqui o índice de busca é atualizado
+    pelos triggers e o cache das listagens, uma vez por dono.
+    """
+    # Com réplicas, queryset.db de uma leitura seria uma réplica.
+    using = router.db_for_write(queryset.model)
+    queryset = queryset.using(using)
+    ids = queryset.order_by().values('pk')
+    owners = _owners(queryset)
+    with transaction.atomic(using=using):
+        DuplicateCandidate.objects.using(using).filter(Q(contact_a__in=ids) | Q(contact_b__in=ids)).delete()
+        sql, params = ids.query.sql_with_params()
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {Agenda._meta.db_table} WHERE id IN ({sql})', params)
+            deleted = cursor.rowcount
+    for owner_id in owners:
+        bump_contacts_version(owner_id)
+    return deleted
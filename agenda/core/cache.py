@@ -0,0 +1,72 @@
+import hashlib
+import time
+
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.utils import timezone
+
+# Versões por dono: uma escrita invalida só as listagens de quem a fez.
+VERSION_KEY = 'agenda:contacts:{owner}:version'
+CHANGED_AT_KEY = 'agenda:contacts:{owner}:changed_at'
+
+
+def _initial_version():
+    # Começa de um valor único (e não de 1) para que um cache recém-criado
+    # nunca reaproveite fragmentos gravados sob uma versão antiga.
+    return time.time_ns()
+
+
+def request_owner_id(request):
+    # O id vem da sessão, já validada pelo login_required: serve às views
+    # síncronas e assíncronas sem consultar auth_user.
+    return request.session.get(SESSION_KEY)
+
+
+def contacts_version(owner_id):
+    key = VERSION_KEY.format(owner=owner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def acontacts_version(owner_id):
+    key = VERSION_KEY.format(owner=owner_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _initial_version(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_contacts_version(owner_id):
+    """
+    Invalida de uma vez todos os fragmentos de listagem em cache do dono: as
+    chaves incluem a versão, então as antigas simplesmente deixam de ser lidas.
+    """
+    key = VERSION_KEY.format(owner=owner_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+    cache.set(CHANGED_AT_KEY.format(owner=owner_id), timezone.now(), timeout=None)
+
+
+def contacts_changed_at(owner_id):
+    # None quando ainda não houve escrita desde que o cache foi criado.
+    return cache.get(CHANGED_AT_KEY.format(owner=owner_id))
+
+
+def _list_key(request, kind, version):
+    params = sorted(request.GET.lists())
+    digest = hashlib.md5(repr(params).encode('utf-8'), usedforsecurity=False).hexdigest()
+    return f'agenda:contacts:{request_owner_id(request)}:{kind}:{version}:{digest}'
+
+
+def list_cache_key(request, kind):
+    return _list_key(request, kind, contacts_version(request_owner_id(request)))
+
+
+async def alist_cache_key(request, kind):
+    return _list_key(request, kind, await acontacts_version(request_owner_id(request)))
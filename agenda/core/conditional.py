@@ -0,0 +1,64 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from core.cache import contacts_changed_at, contacts_version, request_owner_id
+
+
+def is_partial(request):
+    # A listagem edita na própria página (fetch com X-Partial): a resposta é
+    # só o trecho afetado, sem redirect nem a página inteira.
+    return request.headers.get('X-Partial') == '1'
+
+
+def _etag(*parts):
+    digest = hashlib.md5(repr(parts).encode('utf-8'), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def _page_identity(request):
+    # A página embute o token CSRF, que muda a cada login, e depende de quem
+    # está logado; ambos entram no ETag. O usuário vem da sessão, que o
+    # login_required já carregou (inclusive nas views async).
+    return request.session.get(SESSION_KEY), request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+
+
+def contact_list_etag(request, *args, **kwargs):
+    return _etag('list', contacts_version(request_owner_id(request)), sorted(request.GET.lists()), _page_identity(request))
+
+
+def contact_list_last_modified(request, *args, **kwargs):
+    return contacts_changed_at(request_owner_id(request))
+
+
+def contact_etag(request, contact):
+    # A página inteira e o trecho (X-Partial) têm a mesma URL: o ETag de um
+    # não pode validar o outro.
+    return _etag(
+        'contact', contact.pk, contact.atualizado_em.isoformat(), is_partial(request), _page_identity(request),
+    )
+
+
+def contact_not_modified(request, contact):
+    """
+    Resposta 304 se o cliente já tem a versão atual da página do contato,
+    ou None. Para views que já buscaram o contato e não querem repetir a
+    consulta em um last_modified_func do condition().
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return get_conditional_response(
+        request,
+        etag=contact_etag(request, contact),
+        last_modified=int(contact.atualizado_em.timestamp()),
+    )
+
+
+def add_contact_validators(request, response, contact):
+    if request.method in ('GET', 'HEAD'):
+        response.headers.setdefault('ETag', contact_etag(request, contact))
+        response.headers.setdefault('Last-Modified', http_date(contact.atualizado_em.timestamp()))
+    return response
@@ -0,0 +1,185 @@
+from difflib import SequenceMatcher
+from itertools import combinations, groupby
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from core.cache import bump_contacts_version
+from core.models import Agenda, DuplicateCandidate
+from core.normalization import fold_text, normalize_email
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_BATCH_SIZE = 2000
+
+# Blocos maiores que isto (ex.: muitos contatos com telefone "0") geram pares
+# demais e quase nunca são duplicatas de verdade: são ignorados.
+MAX_BLOCK_SIZE = 50
+
+# Pesos do score: somam 1.0 quando nome, e-mail e telefone coincidem.
+EMAIL_WEIGHT = 0.3
+PHONE_WEIGHT = 0.3
+PHONE_SUFFIX_WEIGHT = 0.17
+NAME_WEIGHT = 0.4
+
+_FIELDS = ('id', 'nome_completo', 'email', 'telefone_normalizado', 'observacao')
+
+
+def name_key(nome):
+    # Tokens em ordem alfabética: "Silva, João" e "joão silva" caem no mesmo bloco.
+    return ' '.join(sorted(fold_text(nome).split()))
+
+
+def _sorted_blocks(rows, key):
+    # Linhas (id, dono, valor) ordenadas por dono e valor.
+    for (owner_id, value), group in groupby(rows, key=lambda row: (row[1], key(row[2]))):
+        if value:
+            yield [contact_id for contact_id, _, _ in group]
+
+
+def candidate_blocks(queryset):
+    """
+    Grupos de ids do mesmo dono que compartilham uma chave de bloqueio.
+    E-mail e telefone vêm ordenados do banco e são agrupados numa só
+    passada; o nome (sem acentos) não tem ordem no banco e é agrupado em
+    memória pelo hash da chave.
+    """
+    by_email = queryset.order_by('owner_id', Lower('email'), 'id').values_list('id', 'owner_id', 'email')
+    yield from _sorted_blocks(by_email.iterator(chunk_size=DEFAULT_BATCH_SIZE), normalize_email)
+
+    by_phone = queryset.exclude(telefone_normalizado='').order_by('owner_id', 'telefone_normalizado', 'id')
+    yield from _sorted_blocks(
+        by_phone.values_list('id', 'owner_id', 'telefone_normalizado').iterator(chunk_size=DEFAULT_BATCH_SIZE),
+        lambda telefone: telefone,
+    )
+
+    by_name = {}
+    rows = queryset.values_list('id', 'owner_id', 'nome_completo').iterator(chunk_size=DEFAULT_BATCH_SIZE)
+    for contact_id, owner_id, nome in rows:
+        key = hash((owner_id, name_key(nome)))
+        ids = by_name.get(key)
+        if ids is None:
+            by_name[key] = contact_id
+        elif isinstance(ids, list):
+            ids.append(contact_id)
+        else:
+            by_name[key] = [ids, contact_id]
+    for ids in by_name.values():
+        if isinstance(ids, list):
+            yield ids
+
+
+def candidate_pairs(queryset, max_block_size=MAX_BLOCK_SIZE):
+    pairs = set()
+    for ids in candidate_blocks(queryset):
+        if len(ids) <= max_block_size:
+            pairs.update(combinations(sorted(ids), 2))
+    return pairs
+
+
+def score_pair(a, b):
+    """Score entre 0 e 1 de dois contatos (dicts) e os campos que coincidiram."""
+    score, motivos = 0.0, []
+    if normalize_email(a['email']) and normalize_email(a['email']) == normalize_email(b['email']):
+        score += EMAIL_WEIGHT
+        motivos.append('email')
+    phone_a, phone_b = a['telefone_normalizado'], b['telefone_normalizado']
+    if phone_a and phone_a == phone_b:
+        score += PHONE_WEIGHT
+        motivos.append('telefone')
+    elif len(phone_a) >= 8 and phone_a[-8:] == phone_b[-8:]:
+        # Mesmo número com DDD diferente ou sem o nono dígito.
+        score += PHONE_SUFFIX_WEIGHT
+        motivos.append('telefone parecido')
+    similarity = SequenceMatcher(None, name_key(a['nome_completo']), name_key(b['nome_completo'])).ratio()
+    if similarity >= 0.8:
+        motivos.append('nome' if similarity == 1 else 'nome parecido')
+    score += NAME_WEIGHT * similarity
+    return round(score, 3), motivos
+
+
+def find_duplicates(queryset=None, threshold=DEFAULT_THRESHOLD, batch_size=DEFAULT_BATCH_SIZE,
+                    max_block_size=MAX_BLOCK_SIZE):
+    """
+    Gera os pares candidatos pelos blocos, calcula o score de cada um e grava
+    os que passam de `threshold` como DuplicateCandidate. Pares já gravados
+    (inclusive os descartados) são mantidos como estão.
+    """
+    queryset = Agenda.objects.all() if queryset is None else queryset
+    pairs = sorted(candidate_pairs(queryset, max_block_size))
+    found = 0
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        ids = {contact_id for pair in batch for contact_id in pair}
+        rows = {row['id']: row for row in Agenda.objects.filter(id__in=ids).values(*_FIELDS)}
+        candidates = []
+        for a, b in batch:
+            score, motivos = score_pair(rows[a], rows[b])
+            if score >= threshold:
+                candidates.append(DuplicateCandidate(
+                    contact_a_id=a, contact_b_id=b, score=score, motivos=', '.join(motivos),
+                ))
+        DuplicateCandidate.objects.bulk_create(candidates, ignore_conflicts=True)
+        found += len(candidates)
+    return {'pares_avaliados': len(pairs), 'candidatos': found}
+
+
+def _groups(pairs):
+    # Union-find: pares encadeados (a~b, b~c) viram um grupo só.
+    parent = {}
+
+    def root(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        ra, rb = root(a), root(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups = {}
+    for x in list(parent):
+        groups.setdefault(root(x), []).append(x)
+    return list(groups.values())
+
+
+def merge_candidates(candidates, batch_size=500):
+    """
+    Mescla os pares confirmados: em cada grupo fica o contato mais antigo
+    (menor id), que herda as observações dos demais; os outros são excluídos.
+    Cada lote de grupos é gravado numa transação.
+    """
+    pairs = list(candidates.values_list('contact_a_id', 'contact_b_id'))
+    groups = _groups(pairs)
+    merged = 0
+    owners = set()
+    now = timezone.now()
+    for start in range(0, len(groups), batch_size):
+        batch = groups[start:start + batch_size]
+        with transaction.atomic():
+            contacts = Agenda.objects.in_bulk([contact_id for group in batch for contact_id in group])
+            survivors, removed = [], []
+            owners.update(contact.owner_id for contact in contacts.values())
+            for group in batch:
+                members = sorted(contact_id for contact_id in group if contact_id in contacts)
+                if len(members) < 2:
+                    continue
+                survivor = contacts[members[0]]
+                notes = [survivor.observacao] if survivor.observacao else []
+                for contact_id in members[1:]:
+                    observacao = contacts[contact_id].observacao
+                    if observacao and observacao not in notes:
+                        notes.append(observacao)
+                    removed.append(contact_id)
+                survivor.observacao = '\n'.join(notes)
+                survivor.atualizado_em = now
+                survivors.append(survivor)
+            Agenda.objects.bulk_update(survivors, ['observacao', 'atualizado_em'])
+            Agenda.objects.filter(id__in=removed).delete()
+        merged += len(removed)
+    if merged:
+        for owner_id in owners:
+            bump_contacts_version(owner_id)
+    return merged
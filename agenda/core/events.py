@@ -0,0 +1,267 @@
+"""
+Eventos ao vivo dos contatos (Server-Sent Events, ver
+core.async_views.contact_events).
+
+Cada processo tem um Broker: as conexões abertas se inscrevem por dono e
+recebem os eventos numa fila própria, sem consultar o banco. Quem alimenta o
+broker é o backend configurado em AGENDA_EVENTS_BACKEND:
+
+- ChangeLogBackend (padrão): uma única tarefa por processo lê o log de
+  alterações de core/sync.py. Vê as escritas de todos os processos (outros
+  workers, run_jobs, o admin) e de todos os caminhos (bulk, update em lote).
+  O log e os contatos são lidos do principal, mesmo com réplicas.
+- LocalBackend: publica a partir dos sinais post_save/post_delete. Só vê o
+  que passa por save()/delete() neste processo; serve a bancos sem o log.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from core.models import Agenda, ContactChange
+
+logger = logging.getLogger(__name__)
+
+# Avisa o cliente de que perdeu eventos (fila cheia ou histórico longo
+# demais): a página deve ser recarregada.
+RESET = {'op': 'reset'}
+
+# Espera sugerida ao navegador antes de reconectar (ms).
+RETRY_MS = 5000
+
+
+def contact_event(contact, seq=None):
+    return {
+        'op': 'upsert',
+        'id': contact.id,
+        'seq': seq,
+        'ordem': contact.nome_ordenacao,
+        'html': render_to_string('_contact_row.html', {'contact': contact}),
+    }
+
+
+def delete_event(contact_id, seq=None):
+    return {'op': 'delete', 'id': contact_id, 'seq': seq}
+
+
+def change_events(rows):
+    """(dono, evento) de cada linha do log de alterações, com um só SELECT dos contatos."""
+    # Do principal, como o log: numa réplica atrasada o contato recém-gravado
+    # ainda não existiria e o evento se perderia.
+    contacts = Agenda.objects.using(DEFAULT_DB_ALIAS).in_bulk([row.contact_id for row in rows if not row.apagado])
+    for row in rows:
+        if row.apagado:
+            yield row.owner_id, delete_event(row.contact_id, row.seq)
+        elif row.contact_id in contacts:
+            yield row.owner_id, contact_event(contacts[row.contact_id], row.seq)
+
+
+def missed_events(owner_id, after, limit=None):
+    """
+    Eventos de `owner_id` depois do seq `after` (o Last-Event-ID de uma
+    reconexão). Se forem mais que `limit`, vale mais recarregar a página.
+    """
+    limit = limit or settings.AGENDA_EVENTS_REPLAY_LIMIT
+    log = ContactChange.objects.using(DEFAULT_DB_ALIAS).filter(owner_id=owner_id, seq__gt=after)
+    rows = list(log.order_by('seq')[:limit + 1])
+    if len(rows) > limit:
+        return [RESET]
+    return [event for _, event in change_events(rows)]
+
+
+def format_event(event):
+    """Evento no formato text/event-stream; o seq vira o id (Last-Event-ID)."""
+    lines = []
+    if event.get('seq') is not None:
+        lines.append(f"id: {event['seq']}")
+    lines.append(f"event: {'reset' if event['op'] == 'reset' else 'contact'}")
+    lines.append(f'data: {json.dumps(event, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """Fila de eventos de uma conexão, ligada ao event loop que a criou."""
+
+    def __init__(self, broker, owner_id, maxsize):
+        self.broker = broker
+        self.owner_id = owner_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        # Roda no loop da conexão. Um cliente lento demais não segura os
+        # outros nem acumula memória: perde a fila e recebe um reset.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, owner_id, maxsize=None):
+        subscription = Subscription(self, owner_id, maxsize or settings.AGENDA_EVENTS_QUEUE_SIZE)
+        with self.lock:
+            self.subscriptions.setdefault(owner_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.owner_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.owner_id, None)
+
+    def has_subscribers(self, owner_id=None):
+        with self.lock:
+            return owner_id in self.subscriptions if owner_id is not None else bool(self.subscriptions)
+
+    def publish(self, owner_id, event):
+        # Pode ser chamado de qualquer thread (views síncronas, sinais).
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(owner_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Loop já encerrado: a conexão morreu sem se desinscrever.
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+class LocalBackend:
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def start(self):
+        pass
+
+    def contact_saved(self, contact):
+        if self.broker.has_subscribers(contact.owner_id):
+            self.broker.publish(contact.owner_id, contact_event(contact))
+
+    def contact_deleted(self, contact_id, owner_id):
+        if self.broker.has_subscribers(owner_id):
+            self.broker.publish(owner_id, delete_event(contact_id))
+
+
+class ChangeLogBackend(LocalBackend):
+    """
+    Consulta o log de alterações a cada AGENDA_EVENTS_POLL_INTERVAL segundos
+    numa única tarefa por processo: o custo não cresce com o número de
+    conexões. Sem conexões abertas, não consulta nada.
+    """
+
+    def __init__(self, broker):
+        super().__init__(broker)
+        self.task = None
+        self.last_seq = None
+
+    async def start(self):
+        # Quem se inscreve e depois repete o histórico (Last-Event-ID) até
+        # o seq atual não perde nada: a tarefa continua a partir daqui.
+        if self.last_seq is None:
+            last = await sync_to_async(self.current_seq)()
+            if self.last_seq is None:
+                self.last_seq = last
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.task = loop.create_task(self.run())
+
+    def contact_saved(self, contact):
+        pass
+
+    def contact_deleted(self, contact_id, owner_id):
+        pass
+
+    def current_seq(self):
+        return ContactChange.objects.using(DEFAULT_DB_ALIAS).aggregate(last=Max('seq'))['last'] or 0
+
+    def poll(self):
+        """Publica as alterações posteriores a last_seq; devolve quantas leu."""
+        rows = list(
+            ContactChange.objects.using(DEFAULT_DB_ALIAS).filter(seq__gt=self.last_seq)
+            .order_by('seq')[:settings.AGENDA_EVENTS_POLL_BATCH]
+        )
+        if not rows:
+            return 0
+        self.last_seq = rows[-1].seq
+        watched = [row for row in rows if self.broker.has_subscribers(row.owner_id)]
+        for owner_id, event in change_events(watched):
+            self.broker.publish(owner_id, event)
+        return len(rows)
+
+    async def run(self):
+        poll = sync_to_async(self.poll)
+        while True:
+            if not self.broker.has_subscribers() or self.last_seq is None:
+                # A próxima inscrição recomeça do fim do log.
+                self.last_seq = None
+                await asyncio.sleep(settings.AGENDA_EVENTS_POLL_INTERVAL)
+                continue
+            try:
+                # Lote cheio: há mais alterações, consulta de novo sem esperar.
+                if await poll() < settings.AGENDA_EVENTS_POLL_BATCH:
+                    await asyncio.sleep(settings.AGENDA_EVENTS_POLL_INTERVAL)
+            except Exception:
+                logger.exception('Falha ao consultar o log de alterações.')
+                await asyncio.sleep(settings.AGENDA_EVENTS_POLL_INTERVAL)
+
+
+_backends = {}
+
+
+def get_backend():
+    path = settings.AGENDA_EVENTS_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)(broker)
+    return _backends[path]
+
+
+async def stream(subscription, initial=()):
+    """
+    Corpo da resposta text/event-stream. Uma conexão ociosa é só uma
+    corrotina parada na própria fila; o comentário periódico mantém a
+    conexão viva em proxies que cortam conexões sem tráfego.
+    """
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        for event in initial:
+            yield format_event(event)
+            if event is RESET:
+                return
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), settings.AGENDA_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
+            if event is RESET:
+                return
+    finally:
+        subscription.close()
@@ -0,0 +1,55 @@
+import csv
+
+from django.conf import settings
+
+from core import vcard
+
+FIELDS = ('nome_completo', 'telefone', 'email', 'observacao')
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'contatos.csv'),
+    'vcard': ('text/vcard; charset=utf-8', 'contatos.vcf'),
+}
+
+
+class _Echo:
+    # "Arquivo" cujo write devolve a linha formatada em vez de gravá-la.
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, chunk_size):
+    # values_list evita instanciar um modelo por linha; iterator() lê do
+    # cursor em blocos sem guardar o resultado no cache do queryset.
+    return queryset.values_list(*FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _buffered(lines, size):
+    # Agrupa várias linhas por pedaço enviado, para reduzir o custo por chunk
+    # da resposta sem acumular o arquivo inteiro.
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def csv_lines(queryset, chunk_size):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in _rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+def vcard_lines(queryset, chunk_size):
+    for row in _rows(queryset, chunk_size):
+        yield vcard.serialize(*row)
+
+
+def stream_contacts(queryset, format, chunk_size=None):
+    chunk_size = chunk_size or settings.AGENDA_EXPORT_CHUNK_SIZE
+    lines = csv_lines(queryset, chunk_size) if format == 'csv' else vcard_lines(queryset, chunk_size)
+    return _buffered(lines, chunk_size)
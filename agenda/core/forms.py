@@ -4,6 +4,7 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.forms import ModelForm
+from core.importers import InvalidImportFile, detect_format
 from core.models import Agenda
 
 class LoginForm(ModelForm):
@@ -38,18 +39,41 @@ class LoginForm(ModelForm):
         password = cleaned_data.get('password')
 
         if email and password:
-            try:
-                user = User.objects.get(email=email)
-            except User.DoesNotExist:
-                raise ValidationError("Usuário com esse e-mail não encontrado.")
-
-            user = authenticate(username=user.username, password=password)
+            # Uma só consulta pelo e-mail (core.backends.EmailBackend); a
+            # consulta extra só acontece em falhas, igual nos dois casos.
+            user = authenticate(email=email, password=password)
             if user is None:
+                if not User.objects.filter(email=email).exists():
+                    raise ValidationError("Usuário com esse e-mail não encontrado.")
                 raise ValidationError("Senha incorreta para o e-mail informado.")
 
             self.user = user
 
 
+def validate_telefone(telefone):
+    """Regras do telefone do AgendaForm; usadas também pela importação em lote (core.bulk)."""
+    if telefone:
+        # Verifica se contém apenas caracteres válidos (dígitos, parênteses, traços, espaços)
+        if not re.match(r'^[\d\s\(\)\-]+$', telefone):
+            raise ValidationError('O telefone deve conter apenas números e caracteres especiais permitidos ((), -, espaços).')
+
+        # Remove caracteres especiais para contar apenas os dígitos
+        telefone_limpo = re.sub(r'[^\d]', '', telefone)
+
+        # Verifica se tem pelo menos alguns dígitos
+        if not telefone_limpo:
+            raise ValidationError('O telefone deve conter pelo menos alguns números.')
+
+        # Verifica o tamanho mínimo (10 dígitos para telefone fixo) e máximo (11 dígitos para celular)
+        if len(telefone_limpo) < 10:
+            raise ValidationError('O telefone deve ter no mínimo 10 dígitos.')
+
+        if len(telefone_limpo) > 11:
+            raise ValidationError('O telefone deve ter no máximo 11 dígitos.')
+
+    return telefone
+
+
 class AgendaForm(ModelForm):
     class Meta:
         model = Agenda
@@ -93,24 +117,25 @@ class AgendaForm(ModelForm):
         }
 
     def clean_telefone(self):
-        telefone = self.cleaned_data.get('telefone')
-        if telefone:
-            # Verifica se contém apenas caracteres válidos (dígitos, parênteses, traços, espaços)
-            if not re.match(r'^[\d\s\(\)\-]+$', telefone):
-                raise ValidationError('O telefone deve conter apenas números e caracteres especiais permitidos ((), -, espaços).')
-
-            # Remove caracteres especiais para contar apenas os dígitos
-            telefone_limpo = re.sub(r'[^\d]', '', telefone)
-
-            # Verifica se tem pelo menos alguns dígitos
-            if not telefone_limpo:
-                raise ValidationError('O telefone deve conter pelo menos alguns números.')
+        return validate_telefone(self.cleaned_data.get('telefone'))
 
-            # Verifica o tamanho mínimo (10 dígitos para telefone fixo) e máximo (11 dígitos para celular)
-            if len(telefone_limpo) < 10:
-                raise ValidationError('O telefone deve ter no mínimo 10 dígitos.')
 
-            if len(telefone_limpo) > 11:
-                raise ValidationError('O telefone deve ter no máximo 11 dígitos.')
+class ImportContactsForm(forms.Form):
+    arquivo = forms.FileField(
+        label='Arquivo (.csv ou .vcf):',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.vcf,.vcard',
+        }),
+        error_messages={
+            'required': 'Selecione um arquivo para importar.',
+        },
+    )
 
-        return telefone
\ No newline at end of file
+    def clean_arquivo(self):
+        arquivo = self.cleaned_data['arquivo']
+        try:
+            self.formato = detect_format(arquivo.name)
+        except InvalidImportFile as e:
+            raise ValidationError(str(e))
+        return arquivo
@@ -0,0 +1,66 @@
+import csv
+import io
+import os
+
+from core import vcard
+
+FIELDS = ('nome_completo', 'telefone', 'email', 'observacao')
+REQUIRED_FIELDS = ('nome_completo', 'telefone', 'email')
+
+FORMATS = {
+    '.csv': 'csv',
+    '.vcf': 'vcard',
+    '.vcard': 'vcard',
+}
+
+
+class InvalidImportFile(ValueError):
+    pass
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename or '')[1].lower()
+    try:
+        return FORMATS[extension]
+    except KeyError:
+        raise InvalidImportFile('Formato não suportado: envie um arquivo .csv ou .vcf.')
+
+
+def open_text(fileobj):
+    # Decodifica o upload sob demanda, sem ler o arquivo inteiro para a memória.
+    return io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+
+
+def read_csv(stream):
+    header = stream.readline()
+    if not header.strip():
+        raise InvalidImportFile('O arquivo CSV está vazio.')
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    try:
+        columns = [c.strip().lower() for c in next(csv.reader([header], delimiter=delimiter))]
+    except csv.Error as e:
+        raise InvalidImportFile(f'Cabeçalho do CSV inválido: {e}.')
+    missing = [f for f in REQUIRED_FIELDS if f not in columns]
+    if missing:
+        raise InvalidImportFile(f'Colunas obrigatórias ausentes no CSV: {", ".join(missing)}.')
+    positions = {f: columns.index(f) for f in FIELDS if f in columns}
+
+    reader = csv.reader(stream, delimiter=delimiter)
+    try:
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            data = {f: (row[i] if i < len(row) else '') for f, i in positions.items()}
+            # +1 pela linha de cabeçalho já consumida.
+            yield reader.line_num + 1, data
+    except csv.Error as e:
+        # Campo acima de csv.field_size_limit() ou aspas malformadas: o resto
+        # do arquivo não pode ser lido.
+        raise InvalidImportFile(f'CSV inválido na linha {reader.line_num + 1}: {e}.')
+
+
+def read_rows(stream, format):
+    if format == 'csv':
+        return read_csv(stream)
+    return vcard.parse(stream)
+
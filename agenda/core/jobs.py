@@ -0,0 +1,316 @@
+"""
+Fila de tarefas no próprio banco (modelo Job), sem broker externo. As views
+só enfileiram; o comando run_jobs busca as pendentes e as executa num pool
+de threads com concorrência limitada, repetindo as que falham com espera
+crescente.
+
+O SQLite não tem SELECT ... FOR UPDATE SKIP LOCKED: uma tarefa é reservada
+com um UPDATE condicionado ao status "pendente", e só o worker cujo UPDATE
+alterou a linha fica com ela.
+"""
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, connection, connections
+from django.db.models import F
+from django.utils import timezone
+
+from core import search
+from core.bulk import BulkReport, import_file
+from core.dedupe import DEFAULT_THRESHOLD, find_duplicates
+from core.exporters import FORMATS as EXPORT_FORMATS, stream_contacts
+from core.importers import InvalidImportFile
+from core.models import Agenda, Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# Intervalo mínimo, em segundos, entre duas gravações de progresso.
+PROGRESS_INTERVAL = 0.5
+
+
+class JobFailed(Exception):
+    """Erro que não adianta repetir (ex.: arquivo inválido): a tarefa falha de vez."""
+
+
+def handler(tipo):
+    """Registra a função que executa as tarefas de `tipo`."""
+    def register(func):
+        HANDLERS[tipo] = func
+        return func
+    return register
+
+
+def enqueue(tipo, owner=None, params=None, arquivo=None, max_tentativas=None):
+    if tipo not in HANDLERS:
+        raise ValueError(f'Tipo de tarefa desconhecido: {tipo}.')
+    job = Job(tipo=tipo, owner=owner, params=params or {})
+    if max_tentativas is not None:
+        job.max_tentativas = max_tentativas
+    if arquivo is not None:
+        job.arquivo.save(os.path.basename(arquivo.name), arquivo, save=False)
+    job.save()
+    return job
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, now=None):
+    """
+    Reserva a próxima tarefa pendente para `worker` e a devolve (ou None).
+    Se outro worker reservar a mesma tarefa antes, tenta a seguinte.
+    """
+    now = now or timezone.now()
+    candidates = list(
+        Job.objects.filter(status=Job.PENDENTE, executar_apos__lte=now)
+        .order_by('executar_apos', 'id').values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = Job.objects.filter(id=job_id, status=Job.PENDENTE).update(
+            status=Job.EXECUTANDO, worker=worker, tentativas=F('tentativas') + 1,
+            iniciado_em=now, atualizado_em=now,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def requeue_stale(now=None):
+    """
+    Tarefas "executando" sem progresso há mais de AGENDA_JOBS_STALE_AFTER
+    segundos são de um worker que morreu: voltam para a fila, ou falham se
+    já esgotaram as tentativas.
+    """
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.EXECUTANDO, atualizado_em__lt=now - timedelta(seconds=settings.AGENDA_JOBS_STALE_AFTER),
+    )
+    failed = stale.filter(tentativas__gte=F('max_tentativas')).update(
+        status=Job.FALHOU, erro='Worker interrompido.', concluido_em=now, atualizado_em=now,
+    )
+    requeued = stale.update(status=Job.PENDENTE, worker='', executar_apos=now, atualizado_em=now)
+    return requeued + failed
+
+
+class Progress:
+    """
+    Repassado às tarefas: `progress(feito, total)` grava o andamento, no
+    máximo a cada PROGRESS_INTERVAL segundos (e sempre ao chegar no total).
+    Cada gravação também serve de sinal de vida do worker.
+    """
+
+    def __init__(self, job, interval=PROGRESS_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self.last = None
+
+    def __call__(self, done, total=None):
+        now = time.monotonic()
+        finished = total is not None and done >= total
+        if self.last is not None and now - self.last < self.interval and not finished:
+            return
+        self.last = now
+        self.job.progresso, self.job.total = done, total
+        Job.objects.filter(id=self.job.id).update(progresso=done, total=total, atualizado_em=timezone.now())
+
+
+class Heartbeat(threading.Thread):
+    """
+    Renova `atualizado_em` da tarefa a cada quarto de AGENDA_JOBS_STALE_AFTER
+    enquanto ela roda, para que requeue_stale não a devolva à fila. Cobre as
+    tarefas que passam muito tempo sem chamar `progress` (reindexação,
+    busca de duplicatas).
+    """
+
+    def __init__(self, job, interval=None):
+        super().__init__(name=f'job-heartbeat-{job.id}', daemon=True)
+        self.job = job
+        self.interval = settings.AGENDA_JOBS_STALE_AFTER / 4 if interval is None else interval
+        self.stopped = threading.Event()
+
+    def beat(self):
+        Job.objects.filter(id=self.job.id, status=Job.EXECUTANDO, worker=self.job.worker).update(
+            atualizado_em=timezone.now(),
+        )
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    self.beat()
+                except DatabaseError:
+                    # Banco ocupado (ex.: a própria tarefa segurando a escrita):
+                    # tenta de novo no próximo intervalo.
+                    logger.warning('Sinal de vida da tarefa %s não gravado.', self.job, exc_info=True)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def _retry_delay(tentativas):
+    return timedelta(seconds=settings.AGENDA_JOBS_RETRY_DELAY * 2 ** (tentativas - 1))
+
+
+def run(job):
+    """Executa uma tarefa já reservada e grava o resultado ou o erro."""
+    func = HANDLERS.get(job.tipo)
+    try:
+        if func is None:
+            raise JobFailed(f'Tipo de tarefa desconhecido: {job.tipo}.')
+        heartbeat = Heartbeat(job)
+        heartbeat.start()
+        try:
+            resultado = func(job, Progress(job))
+        finally:
+            heartbeat.stop()
+    except Exception as e:
+        logger.exception('Tarefa %s falhou (tentativa %s).', job, job.tentativas)
+        now = timezone.now()
+        job.erro = str(e) or e.__class__.__name__
+        if isinstance(e, JobFailed) or job.tentativas >= job.max_tentativas:
+            job.status, job.concluido_em = Job.FALHOU, now
+        else:
+            job.status, job.executar_apos = Job.PENDENTE, now + _retry_delay(job.tentativas)
+        job.save(update_fields=['status', 'erro', 'concluido_em', 'executar_apos', 'atualizado_em'])
+    else:
+        job.status, job.resultado, job.erro = Job.CONCLUIDO, resultado, ''
+        job.concluido_em = timezone.now()
+        if job.total is not None:
+            job.progresso = job.total
+        job.save(update_fields=[
+            'status', 'resultado', 'erro', 'concluido_em', 'progresso', 'arquivo_resultado', 'atualizado_em',
+        ])
+    if job.finished and job.arquivo:
+        # A entrada só é guardada enquanto a tarefa pode ser repetida.
+        job.arquivo.delete(save=True)
+    return job
+
+
+def run_pending(worker='inline', max_jobs=None):
+    """Executa, nesta thread, as tarefas pendentes até a fila esvaziar."""
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = claim(worker)
+        if job is None:
+            break
+        run(job)
+        done += 1
+    return done
+
+
+def _run_in_thread(job):
+    try:
+        return run(job)
+    finally:
+        # Cada thread do pool abre a própria conexão; fechada ao fim da
+        # tarefa para não acumular conexões ociosas.
+        connections.close_all()
+
+
+def work(worker=None, concurrency=None, poll_interval=None, burst=False, max_jobs=None, stop=None):
+    """
+    Laço do worker: mantém até `concurrency` tarefas rodando em threads e
+    consulta a fila a cada `poll_interval` segundos quando não há vaga ou
+    tarefa. Com `burst`, termina quando a fila esvazia. `stop` (um
+    threading.Event) interrompe a busca de novas tarefas; as que estão
+    rodando terminam antes do retorno. Devolve quantas tarefas iniciou.
+    """
+    worker = worker or worker_name()
+    concurrency = concurrency or settings.AGENDA_JOBS_CONCURRENCY
+    poll_interval = settings.AGENDA_JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+    stop = stop or threading.Event()
+    started = 0
+    running = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job') as executor:
+        while not stop.is_set() and (max_jobs is None or started < max_jobs):
+            job = None
+            if len(running) < concurrency:
+                requeue_stale()
+                job = claim(worker)
+            if job is not None:
+                running.add(executor.submit(_run_in_thread, job))
+                started += 1
+                continue
+            if burst and not running:
+                break
+            if running:
+                finished, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            else:
+                stop.wait(poll_interval)
+        wait(running)
+    return started
+
+
+@handler('import_contacts')
+def import_contacts(job, progress):
+    # Cada lote grava, na mesma transação, até que linha o arquivo já foi
+    # importado: uma nova tentativa continua dali, sem duplicar contatos.
+    resume = job.params.get('retomar')
+    report = BulkReport.from_dict(resume) if resume else None
+
+    def checkpoint(report):
+        job.params['retomar'] = {**report.to_dict(), 'linha': report.last_line}
+        Job.objects.filter(id=job.id).update(params=job.params)
+
+    try:
+        with job.arquivo.open('rb') as fileobj:
+            report = import_file(
+                fileobj, job.params['formato'], job.owner, report=report,
+                progress=lambda report: progress(report.created + report.error_count),
+                checkpoint=checkpoint,
+            )
+    except InvalidImportFile as e:
+        raise JobFailed(str(e))
+    return report.to_dict()
+
+
+@handler('export_contacts')
+def export_contacts(job, progress):
+    formato = job.params.get('formato', 'csv')
+    if formato not in EXPORT_FORMATS:
+        raise JobFailed('Formato de exportação inválido.')
+    queryset = search.filter_contacts(
+        Agenda.objects.filter(owner=job.owner), job.params.get('q', ''),
+    ).order_by('nome_ordenacao', 'id')
+    total = queryset.count()
+    chunk_size = settings.AGENDA_EXPORT_CHUNK_SIZE
+    done = 0
+    progress(done, total)
+    # Grava num temporário e só depois no storage: o arquivo de saída nunca
+    # fica pela metade se a tarefa falhar.
+    with tempfile.TemporaryFile() as output:
+        for chunk in stream_contacts(queryset, formato, chunk_size):
+            output.write(chunk.encode('utf-8'))
+            done = min(done + chunk_size, total)
+            progress(done, total)
+        output.seek(0)
+        job.arquivo_resultado.save(EXPORT_FORMATS[formato][1], File(output), save=False)
+    return {'contatos': total}
+
+
+@handler('rebuild_search_index')
+def rebuild_search_index(job, progress):
+    if not search.is_supported(connection):
+        raise JobFailed('A busca textual indexada exige o banco SQLite (FTS5).')
+    search.reinstall(connection)
+    return {}
+
+
+@handler('find_duplicates')
+def find_contact_duplicates(job, progress):
+    queryset = Agenda.objects.all() if job.owner is None else Agenda.objects.filter(owner=job.owner)
+    return find_duplicates(queryset, threshold=job.params.get('threshold', DEFAULT_THRESHOLD))
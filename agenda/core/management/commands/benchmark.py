@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core.benchmarks import DATASETS, BenchmarkError, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede latência (p50/p95/p99), vazão, consultas e memória das views '
+        'principais sobre um banco de teste populado com dados determinísticos.'
+    )
+
+    PRAGMAS = {
+        'production': lambda: settings.AGENDA_SQLITE_PRODUCTION_PRAGMAS,
+        'settings': lambda: settings.AGENDA_SQLITE_PRAGMAS,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=DATASETS, default='1k')
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Mede só este cenário (pode repetir).')
+        parser.add_argument('--pragmas', choices=self.PRAGMAS, default='production',
+                            help='PRAGMAs do SQLite no banco medido (padrão: os de produção).')
+        parser.add_argument('--output', help='Grava o resultado em JSON neste arquivo.')
+        parser.add_argument('--baseline', help='JSON de uma execução anterior para comparar.')
+        parser.add_argument('--max-regression', type=float, default=None,
+                            help='Falha se o p95 de algum cenário piorar mais que este percentual.')
+
+    def handle(self, *args, **options):
+        baseline = self.load_baseline(options['baseline'])
+
+        # Banco de teste descartável: o banco real nunca é tocado. Fica num
+        # arquivo, como em produção; o banco de teste padrão do SQLite é em
+        # memória e não teria o custo de E/S nem o efeito dos PRAGMAs.
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(AGENDA_SQLITE_PRAGMAS=self.PRAGMAS[options['pragmas']]()):
+            test_settings = connection.settings_dict.setdefault('TEST', {})
+            old_test_name = test_settings.get('NAME')
+            test_settings['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                results = run_benchmarks(
+                    DATASETS[options['dataset']],
+                    options['iterations'],
+                    warmup=options['warmup'],
+                    seed=options['seed'],
+                    only=options['scenarios'],
+                )
+            except BenchmarkError as e:
+                raise CommandError(str(e))
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+                test_settings['NAME'] = old_test_name
+
+        results['meta']['dataset'] = options['dataset']
+        results['meta']['pragmas'] = options['pragmas']
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fileobj:
+                json.dump(results, fileobj, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultado gravado em {options['output']}.")
+        if baseline:
+            self.report_changes(compare(results, baseline), options['max_regression'])
+
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path, encoding='utf-8') as fileobj:
+                return json.load(fileobj)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Não foi possível ler a baseline: {e}')
+
+    def report(self, results):
+        meta = results['meta']
+        self.stdout.write(
+            f"{meta['rows']} contatos (populados em {meta['seed_seconds']}s), "
+            f"{meta['iterations']} iterações por cenário"
+        )
+        self.stdout.write(
+            f"{'cenário':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'consultas':>11}{'pico KB':>10}"
+        )
+        for name, row in results['scenarios'].items():
+            self.stdout.write(
+                f"{name:<22}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+                f"{row['throughput_rps']:>10}{row['queries_mean']:>11}{row['peak_alloc_kb']:>10}"
+            )
+
+    def report_changes(self, changes, max_regression):
+        regressions = []
+        for name, change in changes.items():
+            line = f'{name}: p95 {change:+.1f}% em relação à baseline'
+            if max_regression is not None and change > max_regression:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f"Regressão acima de {max_regression}%: {', '.join(regressions)}.")
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import sqlite_throughput
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a vazão de leituras e escritas concorrentes no SQLite com a '
+        'configuração padrão e com o perfil de produção (WAL, PRAGMAs e '
+        'conexões persistentes). Usa arquivos temporários, nunca o banco real.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0)
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--output', help='Grava o resultado em JSON neste arquivo.')
+
+    def handle(self, *args, **options):
+        profiles = {
+            'padrão': ({}, False),
+            'produção': (settings.AGENDA_SQLITE_PRODUCTION_PRAGMAS, True),
+        }
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (name, (pragmas, persistent)) in enumerate(profiles.items()):
+                results[name] = sqlite_throughput(
+                    os.path.join(directory, f'{number}.sqlite3'), pragmas, persistent,
+                    readers=options['readers'], writers=options['writers'],
+                    duration=options['duration'], rows=options['rows'],
+                )
+
+        self.stdout.write(
+            f"{options['readers']} leitores e {options['writers']} escritores por {options['duration']}s"
+        )
+        self.stdout.write(f"{'perfil':<12}{'leituras/s':>12}{'escritas/s':>12}{'erros':>8}")
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<12}{row['reads_per_s']:>12}{row['writes_per_s']:>12}{row['errors']:>8}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fileobj:
+                json.dump(results, fileobj, indent=2, ensure_ascii=False)
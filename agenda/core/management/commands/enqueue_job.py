@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core.jobs import enqueue
+
+# Importação e exportação são enfileiradas pelas views, com arquivo e filtros.
+TIPOS = ('rebuild_search_index', 'find_duplicates')
+
+
+class Command(BaseCommand):
+    help = 'Enfileira uma tarefa (ex.: rebuild_search_index, find_duplicates) para o run_jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=TIPOS)
+        parser.add_argument('--owner', default=None, help='Username ou e-mail do dono da tarefa.')
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['owner']:
+            owner = get_user_model().objects.filter(
+                Q(username=options['owner']) | Q(email=options['owner'], email__gt='')
+            ).first()
+            if owner is None:
+                raise CommandError(f"Usuário {options['owner']} não encontrado.")
+        job = enqueue(options['tipo'], owner)
+        self.stdout.write(self.style.SUCCESS(f'Tarefa #{job.id} enfileirada.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.dedupe import DEFAULT_THRESHOLD, MAX_BLOCK_SIZE, find_duplicates, merge_candidates
+from core.models import DuplicateCandidate
+
+
+class Command(BaseCommand):
+    help = (
+        'Procura contatos duplicados (mesmo e-mail, telefone ou nome) e grava os '
+        'pares candidatos para revisão em /contacts/duplicates/.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='Score mínimo (0 a 1) para gravar um par.')
+        parser.add_argument('--max-block-size', type=int, default=MAX_BLOCK_SIZE)
+        parser.add_argument('--merge-above', type=float, default=None,
+                            help='Mescla sem revisão os pares pendentes com score a partir deste valor.')
+
+    def handle(self, *args, **options):
+        result = find_duplicates(threshold=options['threshold'], max_block_size=options['max_block_size'])
+        self.stdout.write(
+            f"{result['pares_avaliados']} par(es) avaliado(s), {result['candidatos']} candidato(s) a duplicata."
+        )
+        if options['merge_above'] is not None:
+            pending = DuplicateCandidate.objects.filter(
+                status=DuplicateCandidate.PENDENTE, score__gte=options['merge_above'],
+            )
+            merged = merge_candidates(pending)
+            self.stdout.write(f'{merged} contato(s) mesclado(s).')
+        self.stdout.write(self.style.SUCCESS('Busca de duplicatas concluída.'))
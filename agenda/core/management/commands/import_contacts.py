@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core.bulk import import_file
+from core.importers import InvalidImportFile, detect_format
+
+
+class Command(BaseCommand):
+    help = 'Importa contatos de um arquivo CSV ou vCard em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--owner', required=True, help='Username ou e-mail do dono dos contatos.')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        owner = get_user_model().objects.filter(
+            Q(username=options['owner']) | Q(email=options['owner'], email__gt='')
+        ).first()
+        if owner is None:
+            raise CommandError(f"Usuário {options['owner']} não encontrado.")
+        try:
+            with open(path, 'rb') as fileobj:
+                report = import_file(fileobj, detect_format(path), owner, batch_size=options['batch_size'])
+        except (OSError, InvalidImportFile) as e:
+            raise CommandError(str(e))
+        for erro in report.errors:
+            self.stderr.write(f"Linha {erro['linha']}: {erro['erros']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'{report.created} contato(s) importado(s), {report.error_count} com erro.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Expurga do feed de sincronização as marcas de contatos excluídos há mais '
+        'de AGENDA_SYNC_TOMBSTONE_DAYS dias.'
+    )
+
+    def handle(self, *args, **options):
+        purged = purge_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'{purged} marca(s) de exclusão expurgada(s).'))
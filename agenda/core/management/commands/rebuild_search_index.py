@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói do zero o índice de busca textual (FTS5) dos contatos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.is_supported(connection):
+            raise CommandError('A busca textual indexada exige o banco SQLite (FTS5).')
+        search.reinstall(connection)
+        self.stdout.write(self.style.SUCCESS('Índice de busca reconstruído.'))
@@ -0,0 +1,41 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import work, worker_name
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa as tarefas em segundo plano (importações e exportações grandes, '
+        'reindexação, busca de duplicatas) num pool de threads.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Tarefas simultâneas (padrão: AGENDA_JOBS_CONCURRENCY).')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Segundos entre consultas à fila (padrão: AGENDA_JOBS_POLL_INTERVAL).')
+        parser.add_argument('--burst', action='store_true',
+                            help='Termina quando a fila esvaziar, em vez de esperar novas tarefas.')
+        parser.add_argument('--max-jobs', type=int, default=None,
+                            help='Termina depois de iniciar este número de tarefas.')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+
+        def shutdown(signum, frame):
+            # Para de buscar tarefas; as que estão rodando terminam.
+            self.stdout.write('Encerrando após as tarefas em andamento...')
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        name = worker_name()
+        self.stdout.write(f'Worker {name} aguardando tarefas.')
+        started = work(
+            worker=name, concurrency=options['concurrency'], poll_interval=options['poll_interval'],
+            burst=options['burst'], max_jobs=options['max_jobs'], stop=stop,
+        )
+        self.stdout.write(self.style.SUCCESS(f'{started} tarefa(s) executada(s).'))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.sqlite import copy_database
+
+
+class Command(BaseCommand):
+    help = 'Copia o banco principal para as réplicas de leitura (AGENDA_REPLICAS).'
+
+    def handle(self, *args, **options):
+        replicas = settings.AGENDA_READ_REPLICAS
+        if not replicas:
+            raise CommandError('Nenhuma réplica configurada (variável AGENDA_REPLICAS).')
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('A cópia pela API de backup exige o banco SQLite.')
+        for alias in replicas:
+            target = connections[alias].settings_dict['NAME']
+            copy_database(source.settings_dict['NAME'], target)
+            self.stdout.write(f'{alias}: {target} atualizada.')
+        self.stdout.write(self.style.SUCCESS(f'{len(replicas)} réplica(s) sincronizada(s).'))
@@ -0,0 +1,221 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# nome -> (tipo, ajuda, buckets)
+METRICS = {
+    'agenda_http_requests_total': ('counter', 'Requisições recebidas por view e método.', None),
+    'agenda_http_responses_total': ('counter', 'Respostas enviadas por view e status.', None),
+    'agenda_http_request_duration_seconds': (
+        'histogram', 'Latência das requisições por view.', LATENCY_BUCKETS),
+    'agenda_http_request_queries': (
+        'histogram', 'Consultas SQL por requisição, por view.', QUERY_BUCKETS),
+    'agenda_logins_total': ('counter', 'Tentativas de login por resultado.', None),
+}
+
+
+class Shard:
+    """
+    Valores gravados por uma única thread. Como cada thread só escreve no
+    próprio shard, o caminho quente não precisa de lock.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name, labels=(), amount=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        buckets = METRICS[name][2]
+        values = histograms.get(key)
+        if values is None:
+            # Uma posição por bucket, mais +Inf e a soma.
+            values = histograms[key] = [0] * (len(buckets) + 2)
+        values[bisect.bisect_left(buckets, value)] += 1
+        values[-1] += value
+
+    def snapshot(self):
+        """
+        Soma dos shards de todas as threads, no formato usado nos arquivos de
+        outros processos: {'counters': {...}, 'histograms': {...}}.
+        """
+        with self._lock:
+            shards = list(self._shards)
+        counters, histograms = {}, {}
+        for shard in shards:
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, values in list(shard.histograms.items()):
+                merge_histogram(histograms, key, values)
+        return {'counters': counters, 'histograms': histograms}
+
+    def clear(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+
+
+def merge_histogram(histograms, key, values):
+    total = histograms.get(key)
+    if total is None:
+        histograms[key] = list(values)
+    else:
+        for i, value in enumerate(values):
+            total[i] += value
+
+
+registry = Registry()
+
+
+def inc(name, labels=(), amount=1):
+    registry.inc(name, labels, amount)
+
+
+def observe(name, labels, value):
+    registry.observe(name, labels, value)
+
+
+# Vários processos (gunicorn, uvicorn --workers): cada um grava de tempos em
+# tempos um retrato dos seus valores em AGENDA_METRICS_DIR e o /metrics soma
+# os arquivos. O nome inclui o instante de início para que um pid reutilizado
+# não sobrescreva os contadores de um processo que já terminou.
+_process_file = None
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+
+
+def process_file():
+    global _process_file
+    if _process_file is None:
+        _process_file = os.path.join(
+            settings.AGENDA_METRICS_DIR, f'{os.getpid()}-{time.time_ns()}.json'
+        )
+    return _process_file
+
+
+def _dump(snapshot):
+    return {
+        'counters': [[name, labels, value] for (name, labels), value in snapshot['counters'].items()],
+        'histograms': [[name, labels, values] for (name, labels), values in snapshot['histograms'].items()],
+    }
+
+
+def _load(data, snapshot):
+    for name, labels, value in data['counters']:
+        key = (name, tuple(tuple(pair) for pair in labels))
+        snapshot['counters'][key] = snapshot['counters'].get(key, 0) + value
+    for name, labels, values in data['histograms']:
+        merge_histogram(snapshot['histograms'], (name, tuple(tuple(pair) for pair in labels)), values)
+
+
+def flush(force=False):
+    global _last_flush
+    directory = settings.AGENDA_METRICS_DIR
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.AGENDA_METRICS_FLUSH_INTERVAL:
+        return
+    # Uma thread grava por vez; as outras seguem sem esperar.
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as fileobj:
+            json.dump(_dump(registry.snapshot()), fileobj)
+        os.replace(path, process_file())
+    finally:
+        _flush_lock.release()
+
+
+atexit.register(lambda: flush(force=True))
+
+
+def collect():
+    """Valores de todos os processos: os arquivos dos outros e o deste ao vivo."""
+    snapshot = registry.snapshot()
+    directory = settings.AGENDA_METRICS_DIR
+    if directory:
+        own = process_file()
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path) as fileobj:
+                    _load(json.load(fileobj), snapshot)
+            except (OSError, ValueError):
+                continue
+    return snapshot
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    escaped = (
+        (k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in pairs
+    )
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshot=None):
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+    snapshot = snapshot or collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(snapshot['counters'].items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+        for (metric, labels), values in sorted(snapshot['histograms'].items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), values):
+                cumulative += count
+                le = bound if bound == '+Inf' else _format_value(float(bound))
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(float(values[-1]))}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
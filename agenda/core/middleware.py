@@ -0,0 +1,187 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core import metrics
+from core.routers import pinned
+from core.timing import RequestTiming, current, install_query_recorder
+
+logger = logging.getLogger('core.timing')
+
+
+def install_query_recorders():
+    for conn in connections.all():
+        install_query_recorder(conn)
+
+
+class RequestTimingMiddleware:
+    """
+    Mede consultas SQL, tempo de banco, de templates e da view em cada
+    requisição e os expõe no cabeçalho Server-Timing e no log `core.timing`.
+    Ligado por AGENDA_REQUEST_TIMING; deve vir no topo de MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.AGENDA_REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timing = RequestTiming()
+        token = current.set(timing)
+        try:
+            install_query_recorders()
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = current.set(timing)
+        try:
+            # O ORM roda na thread do sync_to_async: as conexões a instrumentar
+            # são as dela, não as da thread do event loop.
+            await sync_to_async(install_query_recorders)()
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, timing)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = current.get()
+        if timing is not None:
+            timing.start_view()
+
+    def finish(self, request, response, timing):
+        timing.finish()
+        response['Server-Timing'] = timing.server_timing()
+        data = timing.as_dict()
+        logger.info(
+            'method=%s path=%s status=%s queries=%s db_ms=%s template_ms=%s view_ms=%s total_ms=%s',
+            request.method, request.path, response.status_code, data['queries'], data['db_ms'],
+            data['template_ms'], data['view_ms'], data['total_ms'],
+            extra={'timing': data, 'path': request.path, 'status_code': response.status_code},
+        )
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Alimenta o registro de core.metrics (exposto em /metrics): contagem de
+    requisições e respostas, latência e consultas SQL por nome de rota.
+    Ligado por AGENDA_METRICS.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.AGENDA_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def start(self):
+        # Aproveita a medição do RequestTimingMiddleware, se ele estiver ativo.
+        timing = current.get()
+        if timing is not None:
+            return timing, None
+        timing = RequestTiming()
+        return timing, current.set(timing)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timing, token = self.start()
+        start = time.perf_counter()
+        try:
+            install_query_recorders()
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                current.reset(token)
+        self.record(request, response, time.perf_counter() - start, timing.queries)
+        return response
+
+    async def __acall__(self, request):
+        timing, token = self.start()
+        start = time.perf_counter()
+        try:
+            await sync_to_async(install_query_recorders)()
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                current.reset(token)
+        self.record(request, response, time.perf_counter() - start, timing.queries)
+        return response
+
+    def record(self, request, response, duration, queries):
+        match = request.resolver_match
+        view = (match.url_name if match else None) or 'unmatched'
+        metrics.inc('agenda_http_requests_total', (('view', view), ('method', request.method)))
+        metrics.inc('agenda_http_responses_total', (('view', view), ('status', str(response.status_code))))
+        metrics.observe('agenda_http_request_duration_seconds', (('view', view),), duration)
+        metrics.observe('agenda_http_request_queries', (('view', view),), queries)
+        metrics.flush()
+
+
+class ReplicaPinningMiddleware:
+    """
+    Leitura das próprias escritas com réplicas: requisições que alteram dados
+    e as seguintes do mesmo navegador, por AGENDA_REPLICA_PIN_SECONDS (como o
+    redirect depois de criar um contato), leem do banco principal.
+    """
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'agenda_primary'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        if not settings.AGENDA_READ_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def must_pin(self, request):
+        return request.method not in self.safe_methods or self.cookie_name in request.COOKIES
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = pinned.set(self.must_pin(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            pinned.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = pinned.set(self.must_pin(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            pinned.reset(token)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if request.method not in self.safe_methods:
+            response.set_cookie(
+                self.cookie_name, '1', max_age=settings.AGENDA_REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
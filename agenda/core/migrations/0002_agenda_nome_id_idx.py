@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['nome_completo', 'id'], name='agenda_nome_id_idx'),
+        ),
+    ]
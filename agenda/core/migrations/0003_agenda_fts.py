@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from core.migrations._triggers import DROP_SEARCH_SCHEMA, SEARCH_SCHEMA, execute
+
+
+def install_search_index(apps, schema_editor):
+    execute(schema_editor, SEARCH_SCHEMA)
+
+
+def uninstall_search_index(apps, schema_editor):
+    execute(schema_editor, DROP_SEARCH_SCHEMA)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_agenda_nome_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
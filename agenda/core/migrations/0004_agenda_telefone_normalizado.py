@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_agenda_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenda',
+            name='telefone_normalizado',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+    ]
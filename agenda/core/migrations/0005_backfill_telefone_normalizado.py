@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+from core.migrations._batches import id_batches
+from core.migrations._normalization import normalize_phone
+
+
+def backfill_telefone_normalizado(apps, schema_editor):
+    Agenda = apps.get_model('core', 'Agenda')
+    contacts = Agenda.objects.using(schema_editor.connection.alias)
+    for batch in id_batches(contacts.only('id', 'telefone')):
+        for contact in batch:
+            contact.telefone_normalizado = normalize_phone(contact.telefone)
+        contacts.bulk_update(batch, ['telefone_normalizado'])
+
+
+class Migration(migrations.Migration):
+    # Sem transação única: cada lote do preenchimento é confirmado em separado.
+    atomic = False
+
+    dependencies = [
+        ('core', '0004_agenda_telefone_normalizado'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_telefone_normalizado, migrations.RunPython.noop),
+        # O índice é criado depois do preenchimento, de uma só vez.
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['telefone_normalizado'], name='agenda_telefone_norm_idx'),
+        ),
+    ]
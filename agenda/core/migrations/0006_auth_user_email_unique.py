@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0005_backfill_telefone_normalizado'),
+    ]
+
+    operations = [
+        # Índice único parcial: usuários sem e-mail (string vazia, permitido
+        # pelo createsuperuser) continuam podendo coexistir.
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX core_auth_user_email_uniq ON auth_user (email) WHERE email > ''",
+            'DROP INDEX core_auth_user_email_uniq',
+        ),
+    ]
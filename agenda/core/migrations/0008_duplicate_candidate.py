@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_agenda_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('motivos', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('descartado', 'Descartado')], default='pendente', max_length=20)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('contact_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.agenda')),
+                ('contact_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.agenda')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', '-score'], name='duplicate_status_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('contact_a', 'contact_b'), name='duplicate_pair_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_duplicate_candidate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='agenda',
+            name='agenda_nome_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='agenda',
+            name='agenda_telefone_norm_idx',
+        ),
+        migrations.AddField(
+            model_name='agenda',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='contatos', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['owner', 'nome_completo', 'id'], name='agenda_owner_nome_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['owner', 'telefone_normalizado'], name='agenda_owner_telefone_idx'),
+        ),
+    ]
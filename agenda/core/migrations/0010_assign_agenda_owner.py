@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import migrations, transaction
+from django.db.models import Max
+
+BATCH_SIZE = 2000
+
+
+def assign_owner(apps, schema_editor):
+    """
+    Os contatos anteriores à separação por dono ficam com o primeiro
+    superusuário (ou, sem nenhum, com o primeiro usuário). Sem usuários, o
+    banco não tem quem os veja e eles ficam sem dono.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Agenda = apps.get_model('core', 'Agenda')
+    db_alias = schema_editor.connection.alias
+    users = User.objects.using(db_alias).order_by('id')
+    owner = users.filter(is_superuser=True).first() or users.first()
+    if owner is None:
+        return
+    last_id = Agenda.objects.using(db_alias).aggregate(Max('id'))['id__max'] or 0
+    # Um UPDATE por faixa de id, cada um na sua transação.
+    for start in range(0, last_id, BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            Agenda.objects.using(db_alias).filter(
+                owner__isnull=True, id__gt=start, id__lte=start + BATCH_SIZE,
+            ).update(owner=owner)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_agenda_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_owner, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+from core.migrations._batches import id_batches
+from core.migrations._normalization import fold_text, normalize_email
+
+
+def backfill_prefix_search(apps, schema_editor):
+    Agenda = apps.get_model('core', 'Agenda')
+    contacts = Agenda.objects.using(schema_editor.connection.alias)
+    for batch in id_batches(contacts.only('id', 'nome_completo', 'email')):
+        for contact in batch:
+            contact.nome_busca = fold_text(contact.nome_completo)
+            contact.email_busca = normalize_email(contact.email)
+        contacts.bulk_update(batch, ['nome_busca', 'email_busca'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0010_assign_agenda_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenda',
+            name='nome_busca',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='agenda',
+            name='email_busca',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.RunPython(backfill_prefix_search, migrations.RunPython.noop),
+        # Índices criados depois do preenchimento, de uma só vez.
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['owner', 'nome_busca', 'id'], name='agenda_owner_nome_busca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['owner', 'email_busca', 'id'], name='agenda_owner_email_busca_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+from core.migrations._batches import id_batches
+from core.migrations._normalization import sort_key
+
+
+def backfill_nome_ordenacao(apps, schema_editor):
+    Agenda = apps.get_model('core', 'Agenda')
+    contacts = Agenda.objects.using(schema_editor.connection.alias)
+    for batch in id_batches(contacts.only('id', 'nome_completo')):
+        for contact in batch:
+            contact.nome_ordenacao = sort_key(contact.nome_completo)
+        contacts.bulk_update(batch, ['nome_ordenacao'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_agenda_prefix_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenda',
+            name='nome_ordenacao',
+            field=models.CharField(blank=True, editable=False, max_length=400),
+        ),
+        migrations.RunPython(backfill_nome_ordenacao, migrations.RunPython.noop),
+        # A listagem passa a usar o novo índice; o antigo só ocuparia espaço.
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['owner', 'nome_ordenacao', 'id'], name='agenda_owner_ordenacao_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='agenda',
+            name='agenda_owner_nome_id_idx',
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+from core.migrations._batches import id_batches
+from core.migrations._normalization import area_code, email_domain
+
+
+def backfill_admin_filters(apps, schema_editor):
+    Agenda = apps.get_model('core', 'Agenda')
+    contacts = Agenda.objects.using(schema_editor.connection.alias)
+    for batch in id_batches(contacts.only('id', 'email', 'telefone_normalizado')):
+        for contact in batch:
+            contact.email_dominio = email_domain(contact.email)
+            contact.ddd = area_code(contact.telefone_normalizado)
+        contacts.bulk_update(batch, ['email_dominio', 'ddd'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0012_agenda_nome_ordenacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenda',
+            name='email_dominio',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='agenda',
+            name='ddd',
+            field=models.CharField(blank=True, editable=False, max_length=2),
+        ),
+        migrations.RunPython(backfill_admin_filters, migrations.RunPython.noop),
+        # Os índices entram depois do preenchimento, de uma só vez.
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['email_dominio'], name='agenda_email_dominio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['ddd'], name='agenda_ddd_idx'),
+        ),
+    ]
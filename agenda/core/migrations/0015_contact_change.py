@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:37
+
+from django.db import migrations, models
+
+from core.migrations._batches import id_batches
+from core.migrations._triggers import DROP_SYNC_SCHEMA, SYNC_SCHEMA, execute
+
+
+def backfill_changes(apps, schema_editor):
+    # Os contatos existentes entram no feed em ordem de id, antes dos
+    # triggers assumirem as escritas seguintes.
+    Agenda = apps.get_model('core', 'Agenda')
+    ContactChange = apps.get_model('core', 'ContactChange')
+    db_alias = schema_editor.connection.alias
+    contacts = Agenda.objects.using(db_alias).only('id', 'owner_id', 'atualizado_em')
+    for batch in id_batches(contacts):
+        ContactChange.objects.using(db_alias).bulk_create(
+            ContactChange(contact_id=contact.id, owner_id=contact.owner_id, alterado_em=contact.atualizado_em)
+            for contact in batch
+        )
+
+
+def install_triggers(apps, schema_editor):
+    execute(schema_editor, SYNC_SCHEMA)
+
+
+def uninstall_triggers(apps, schema_editor):
+    execute(schema_editor, DROP_SYNC_SCHEMA)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('owner_id', models.IntegerField(null=True)),
+                ('contact_id', models.IntegerField(unique=True)),
+                ('apagado', models.BooleanField(default=False)),
+                ('alterado_em', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner_id', 'seq'], name='change_owner_seq_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+        migrations.RunPython(install_triggers, uninstall_triggers),
+    ]
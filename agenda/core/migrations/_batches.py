@@ -0,0 +1,19 @@
+from django.db import transaction
+
+BATCH_SIZE = 2000
+
+
+def id_batches(queryset, batch_size=BATCH_SIZE):
+    """
+    Percorre `queryset` em lotes por faixa de id, cada um na sua transação:
+    a tabela não fica bloqueada durante todo o preenchimento. O lote é
+    entregue com a transação ainda aberta, para ser gravado dentro dela.
+    """
+    last_id = 0
+    while True:
+        with transaction.atomic(using=queryset.db):
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                return
+            yield batch
+        last_id = batch[-1].id
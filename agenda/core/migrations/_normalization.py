@@ -0,0 +1,42 @@
+"""
+Cópia de core.normalization no estado em que as migrações a usaram. Uma
+migração precisa dar sempre o mesmo resultado: mudanças nas regras do app
+entram em migrações novas, não alteram as já aplicadas.
+"""
+import re
+import unicodedata
+
+_NON_DIGITS = re.compile(r'\D')
+_NON_WORD = re.compile(r'[\W_]+')
+
+SORT_SEPARATOR = '\x1f'
+
+
+def normalize_phone(telefone):
+    digits = _NON_DIGITS.sub('', telefone or '').lstrip('0')
+    if len(digits) in (12, 13) and digits.startswith('55'):
+        digits = digits[2:]
+    return digits
+
+
+def fold_text(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(' ', stripped.casefold()).strip()
+
+
+def sort_key(nome):
+    original = unicodedata.normalize('NFC', (nome or '').strip())
+    return f'{fold_text(nome)}{SORT_SEPARATOR}{original}'
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def email_domain(email):
+    return normalize_email(email).rpartition('@')[2]
+
+
+def area_code(telefone_normalizado):
+    return telefone_normalizado[:2] if len(telefone_normalizado) in (10, 11) else ''
@@ -0,0 +1,71 @@
+"""
+SQL da busca (core/search.py) e do feed de sincronização (core/sync.py) no
+estado em que as migrações 0003 e 0015 o instalaram. Mudar o índice ou os
+triggers pede uma migração nova (ou o comando rebuild_search_index), não
+uma edição destas.
+"""
+
+SEARCH_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_agenda_fts USING fts5("
+    "nome_completo, email, telefone, observacao, content='core_agenda', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS core_agenda_fts_ai AFTER INSERT ON core_agenda BEGIN "
+    "INSERT INTO core_agenda_fts(rowid, nome_completo, email, telefone, observacao) "
+    "VALUES (new.id, new.nome_completo, new.email, new.telefone, new.observacao); END",
+
+    "CREATE TRIGGER IF NOT EXISTS core_agenda_fts_ad AFTER DELETE ON core_agenda BEGIN "
+    "INSERT INTO core_agenda_fts(core_agenda_fts, rowid, nome_completo, email, telefone, observacao) "
+    "VALUES ('delete', old.id, old.nome_completo, old.email, old.telefone, old.observacao); END",
+
+    "CREATE TRIGGER IF NOT EXISTS core_agenda_fts_au "
+    "AFTER UPDATE OF nome_completo, email, telefone, observacao ON core_agenda BEGIN "
+    "INSERT INTO core_agenda_fts(core_agenda_fts, rowid, nome_completo, email, telefone, observacao) "
+    "VALUES ('delete', old.id, old.nome_completo, old.email, old.telefone, old.observacao); "
+    "INSERT INTO core_agenda_fts(rowid, nome_completo, email, telefone, observacao) "
+    "VALUES (new.id, new.nome_completo, new.email, new.telefone, new.observacao); END",
+
+    "INSERT INTO core_agenda_fts(core_agenda_fts) VALUES ('rebuild')",
+    "INSERT INTO core_agenda_fts(core_agenda_fts) VALUES ('optimize')",
+)
+
+DROP_SEARCH_SCHEMA = (
+    'DROP TRIGGER IF EXISTS core_agenda_fts_ai',
+    'DROP TRIGGER IF EXISTS core_agenda_fts_ad',
+    'DROP TRIGGER IF EXISTS core_agenda_fts_au',
+    'DROP TABLE IF EXISTS core_agenda_fts',
+)
+
+
+def _record(row, apagado):
+    return (
+        "INSERT OR REPLACE INTO core_contactchange (owner_id, contact_id, apagado, alterado_em) "
+        f"VALUES ({row}.owner_id, {row}.id, {apagado}, strftime('%Y-%m-%d %H:%M:%f', 'now'));"
+    )
+
+
+SYNC_SCHEMA = (
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_sync_ai AFTER INSERT ON core_agenda BEGIN "
+    f"{_record('new', 0)} END",
+
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_sync_au AFTER UPDATE ON core_agenda BEGIN "
+    f"{_record('new', 0)} END",
+
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_sync_ad AFTER DELETE ON core_agenda BEGIN "
+    f"{_record('old', 1)} END",
+)
+
+DROP_SYNC_SCHEMA = (
+    'DROP TRIGGER IF EXISTS core_agenda_sync_ai',
+    'DROP TRIGGER IF EXISTS core_agenda_sync_au',
+    'DROP TRIGGER IF EXISTS core_agenda_sync_ad',
+)
+
+
+def execute(schema_editor, statements):
+    # Os triggers e o FTS5 são do SQLite; nos outros bancos, nada a fazer.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
@@ -1,10 +1,231 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
+from django.utils import timezone
+
+from core.normalization import area_code, email_domain, fold_text, normalize_email, normalize_phone, sort_key
+
 
 class Agenda(models.Model):
+    # Dono da agenda: cada usuário só vê e altera os próprios contatos. O
+    # índice do FK fica de fora porque os índices compostos já começam por ele.
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='contatos',
+        null=True, blank=True, editable=False, db_index=False,
+    )
     nome_completo = models.CharField(max_length=150)
     telefone = models.CharField(max_length=20)
     email = models.EmailField()
     observacao = models.TextField(blank=True)
+    telefone_normalizado = models.CharField(max_length=20, blank=True, editable=False)
+    # Nome e e-mail sem acentos e em minúsculas, para o autocompletar por prefixo.
+    nome_busca = models.CharField(max_length=150, blank=True, editable=False)
+    email_busca = models.CharField(max_length=254, blank=True, editable=False)
+    # Ordem alfabética em português (ver normalization.sort_key); a colação
+    # binária do SQLite poria "Ágata" depois de "Zuleica".
+    nome_ordenacao = models.CharField(max_length=400, blank=True, editable=False)
+    # Filtros do admin (entre todos os donos).
+    email_dominio = models.CharField(max_length=254, blank=True, editable=False)
+    ddd = models.CharField(max_length=2, blank=True, editable=False)
+    criado_em = models.DateTimeField(auto_now_add=True, db_index=True)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Campos calculados a partir de outros campos: origem -> derivados.
+    DERIVED_FIELDS = {
+        'telefone': ('telefone_normalizado', 'ddd'),
+        'nome_completo': ('nome_busca', 'nome_ordenacao'),
+        'email': ('email_busca', 'email_dominio'),
+    }
+
+    class Meta:
+        indexes = [
+            # A listagem de um usuário, paginada por cursor em (nome_ordenacao, id),
+            # é uma varredura de intervalo neste índice.
+            models.Index(fields=['owner', 'nome_ordenacao', 'id'], name='agenda_owner_ordenacao_idx'),
+            models.Index(fields=['owner', 'telefone_normalizado'], name='agenda_owner_telefone_idx'),
+            # Autocompletar: prefixo digitado vira uma faixa nestes índices.
+            models.Index(fields=['owner', 'nome_busca', 'id'], name='agenda_owner_nome_busca_idx'),
+            models.Index(fields=['owner', 'email_busca', 'id'], name='agenda_owner_email_busca_idx'),
+            models.Index(fields=['email_dominio'], name='agenda_email_dominio_idx'),
+            models.Index(fields=['ddd'], name='agenda_ddd_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nome_completo} - {self.email}"
+
+    def save(self, *args, **kwargs):
+        self.refresh_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # auto_now só é gravado se estiver entre os update_fields.
+            kwargs['update_fields'] = self.with_derived_fields([*update_fields, 'atualizado_em'])
+        super().save(*args, **kwargs)
+
+    def refresh_derived_fields(self):
+        # bulk_create/bulk_update não chamam save(): quem usa esses caminhos
+        # deve chamar este método antes de gravar.
+        for field, value in self.derived_values(self.nome_completo, self.telefone, self.email).items():
+            setattr(self, field, value)
+
+    @staticmethod
+    def derived_values(nome_completo, telefone, email):
+        telefone_normalizado = normalize_phone(telefone)
+        nome_busca = fold_text(nome_completo)
+        return {
+            'telefone_normalizado': telefone_normalizado,
+            'nome_busca': nome_busca,
+            'nome_ordenacao': sort_key(nome_completo, nome_busca),
+            'email_busca': normalize_email(email),
+            'email_dominio': email_domain(email),
+            'ddd': area_code(telefone_normalizado),
+        }
+
+    @classmethod
+    def with_derived_fields(cls, fields):
+        fields = list(fields)
+        for field in list(fields):
+            for derived in cls.DERIVED_FIELDS.get(field, ()):
+                if derived not in fields:
+                    fields.append(derived)
+        return fields
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nome_completo': self.nome_completo,
+            'telefone': self.telefone,
+            'email': self.email,
+            'observacao': self.observacao,
+            'criado_em': self.criado_em,
+            'atualizado_em': self.atualizado_em,
+        }
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Par de contatos que parecem ser a mesma pessoa, encontrado por
+    core.dedupe e aguardando revisão. contact_a é sempre o de menor id.
+    """
+    PENDENTE = 'pendente'
+    DESCARTADO = 'descartado'
+    STATUS_CHOICES = [(PENDENTE, 'Pendente'), (DESCARTADO, 'Descartado')]
+
+    contact_a = models.ForeignKey(Agenda, on_delete=models.CASCADE, related_name='+')
+    contact_b = models.ForeignKey(Agenda, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    motivos = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDENTE)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['contact_a', 'contact_b'], name='duplicate_pair_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-score'], name='duplicate_status_score_idx'),
+        ]
+
+
+class ContactChange(models.Model):
+    """
+    Última escrita de cada contato, gravada pelos triggers de core/sync.py:
+    `seq` cresce a cada escrita em core_agenda. A linha de um contato
+    excluído fica com apagado=True até ser expurgada.
+    """
+    seq = models.BigAutoField(primary_key=True)
+    # Sem chave estrangeira: a linha sobrevive à exclusão do contato.
+    owner_id = models.IntegerField(null=True)
+    contact_id = models.IntegerField(unique=True)
+    apagado = models.BooleanField(default=False)
+    alterado_em = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Feed de um dono a partir de um cursor: faixa de seq neste índice.
+            models.Index(fields=['owner_id', 'seq'], name='change_owner_seq_idx'),
+        ]
+
+
+class JobsStorage(FileSystemStorage):
+    # Arquivos de entrada (importações) e de saída (exportações) das tarefas.
+    # O diretório é lido de AGENDA_JOBS_DIR a cada uso, não só na carga do
+    # modelo.
+    @property
+    def base_location(self):
+        return settings.AGENDA_JOBS_DIR
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+def jobs_storage():
+    return JobsStorage()
+
+
+class Job(models.Model):
+    """
+    Tarefa demorada (importação, exportação, manutenção) executada fora da
+    requisição pelo comando run_jobs. Ver core/jobs.py.
+    """
+    PENDENTE = 'pendente'
+    EXECUTANDO = 'executando'
+    CONCLUIDO = 'concluido'
+    FALHOU = 'falhou'
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'), (EXECUTANDO, 'Executando'), (CONCLUIDO, 'Concluído'), (FALHOU, 'Falhou'),
+    ]
+
+    tipo = models.CharField(max_length=50)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True,
+    )
+    params = models.JSONField(default=dict, blank=True)
+    arquivo = models.FileField(storage=jobs_storage, upload_to='entrada/', blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDENTE)
+    progresso = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    resultado = models.JSONField(null=True, blank=True)
+    arquivo_resultado = models.FileField(storage=jobs_storage, upload_to='saida/', blank=True)
+    erro = models.TextField(blank=True)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    max_tentativas = models.PositiveSmallIntegerField(default=3)
+    # Só é executada a partir deste instante (adiada entre tentativas).
+    executar_apos = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    # Atualizado a cada progresso: uma tarefa "executando" parada há muito
+    # tempo é de um worker que morreu.
+    atualizado_em = models.DateTimeField(auto_now=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Fila: próximas pendentes em ordem de chegada.
+            models.Index(fields=['status', 'executar_apos', 'id'], name='job_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.tipo} #{self.pk} ({self.status})'
+
+    @property
+    def finished(self):
+        return self.status in (self.CONCLUIDO, self.FALHOU)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'status': self.status,
+            'progresso': self.progresso,
+            'total': self.total,
+            'resultado': self.resultado,
+            'erro': self.erro,
+            'tentativas': self.tentativas,
+            'criado_em': self.criado_em,
+            'iniciado_em': self.iniciado_em,
+            'concluido_em': self.concluido_em,
+        }
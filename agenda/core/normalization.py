@@ -0,0 +1,63 @@
+import re
+import unicodedata
+
+_NON_DIGITS = re.compile(r'\D')
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_phone(telefone):
+    """
+    Reduz um telefone aos dígitos de DDD + número: "(19) 99999-8888",
+    "+55 19 99999-8888" e "019 99999 8888" viram "19999998888".
+    """
+    digits = _NON_DIGITS.sub('', telefone or '')
+    # DDDs nunca começam com zero; zeros à esquerda são prefixo de operadora/tronco.
+    digits = digits.lstrip('0')
+    if len(digits) in (12, 13) and digits.startswith('55'):
+        digits = digits[2:]
+    return digits
+
+
+def fold_text(text):
+    """
+    Minúsculas, sem acentos e com pontuação e espaços repetidos reduzidos a
+    um espaço: "  José  da Silva-Júnior" vira "jose da silva junior".
+    """
+    text = text or ''
+    # Texto ASCII não tem acentos nem muda na NFKD: evita percorrer caractere
+    # a caractere, o que dominava o custo em importações grandes.
+    if not text.isascii():
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(' ', text.casefold()).strip()
+
+
+# Separa o nome normalizado do original na chave de ordenação. Fica abaixo
+# do espaço: "ana" vem antes de "ana maria", qualquer que seja o desempate.
+SORT_SEPARATOR = '\x1f'
+
+
+def sort_key(nome, folded=None):
+    """
+    Chave de ordenação de nomes em português: compara sem acentos nem
+    maiúsculas ("Ágata" antes de "Zuleica") e desempata nomes iguais por essa
+    regra pelo texto original ("Joao" antes de "João"). `folded` é
+    fold_text(nome), se quem chama já o calculou.
+    """
+    if folded is None:
+        folded = fold_text(nome)
+    original = unicodedata.normalize('NFC', (nome or '').strip())
+    return f'{folded}{SORT_SEPARATOR}{original}'
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def email_domain(email):
+    return normalize_email(email).rpartition('@')[2]
+
+
+def area_code(telefone_normalizado):
+    # Só números com DDD (10 ou 11 dígitos) têm um.
+    return telefone_normalizado[:2] if len(telefone_normalizado) in (10, 11) else ''
@@ -0,0 +1,152 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Max, Min, Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([value, pk], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor, value_type=str):
+    """
+    (valor, pk) de um cursor. O cursor vem do cliente: qualquer coisa fora
+    do formato (valor do tipo `value_type`, pk inteiro) é InvalidCursor, e
+    não um erro na consulta.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor(cursor)
+    valid_value = _is_int(value) if value_type is int else isinstance(value, value_type)
+    if not valid_value or not _is_int(pk):
+        raise InvalidCursor(cursor)
+    return value, pk
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginação por cursor sobre a chave composta (campo, id).
+
+    Cada página é uma varredura de intervalo no índice correspondente:
+    não há COUNT(*) nem OFFSET, então o custo é o mesmo da primeira à
+    última página.
+    """
+
+    def __init__(self, queryset, field, page_size):
+        self.queryset = queryset
+        self.field = field
+        self.page_size = page_size
+
+    def page(self, after=None, before=None):
+        queryset, backwards = self._page_queryset(after, before)
+        return self._build_page(list(queryset), after, before, backwards)
+
+    async def apage(self, after=None, before=None):
+        queryset, backwards = self._page_queryset(after, before)
+        rows = [obj async for obj in queryset]
+        return self._build_page(rows, after, before, backwards)
+
+    def _page_queryset(self, after, before):
+        field = self.field
+        queryset = self.queryset
+        if before is not None:
+            value, pk = decode_cursor(before)
+            # O filtro redundante em campo__lte delimita o intervalo no índice.
+            queryset = queryset.filter(
+                Q(**{f'{field}__lte': value}),
+                Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}),
+            ).order_by(f'-{field}', '-id')
+            return queryset[:self.page_size + 1], True
+        if after is not None:
+            value, pk = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(**{f'{field}__gte': value}),
+                Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}),
+            )
+        return queryset.order_by(field, 'id')[:self.page_size + 1], False
+
+    def _build_page(self, rows, after, before, backwards):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, after is not None
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.cursor_for(rows[-1])
+        if rows and has_previous:
+            previous_cursor = self.cursor_for(rows[0])
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def cursor_for(self, obj):
+        return encode_cursor(getattr(obj, self.field), obj.pk)
+
+
+def estimated_count(model, using=None):
+    """
+    Estimativa do total de linhas da tabela a partir do menor e do maior id,
+    que vêm das pontas do índice da chave primária sem percorrer a tabela.
+    Os ids não são reaproveitados: a estimativa só erra para mais, pelas
+    linhas excluídas.
+    """
+    bounds = model._default_manager.using(using).aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return 0
+    return bounds['last'] - bounds['first'] + 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator por número de página para tabelas grandes (changelist do
+    admin). O COUNT(*) exato percorreria milhões de linhas a cada página:
+    sem filtros, o total é estimado; com filtros, a contagem para em
+    AGENDA_ADMIN_COUNT_LIMIT linhas.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return estimated_count(queryset.model, queryset.db)
+        return queryset.order_by()[:settings.AGENDA_ADMIN_COUNT_LIMIT].count()
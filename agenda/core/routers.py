@@ -0,0 +1,55 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Ligado durante as requisições que precisam ler as próprias escritas
+# (ver core.middleware.ReplicaPinningMiddleware).
+pinned = ContextVar('agenda_pinned_to_primary', default=False)
+
+# Só os contatos: a fila de tarefas, o feed de alterações e os pares de
+# duplicatas são lidos logo depois de gravados e não toleram atraso.
+ROUTED_MODELS = {'core.agenda'}
+
+
+@contextmanager
+def pin_to_primary():
+    token = pinned.set(True)
+    try:
+        yield
+    finally:
+        pinned.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Leituras dos modelos em ROUTED_MODELS vão para uma das réplicas em
+    AGENDA_READ_REPLICAS; escritas, migrações e todo o resto ficam no banco
+    principal. Sem réplicas configuradas, não interfere em nada.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.AGENDA_READ_REPLICAS
+        if not replicas or model._meta.label_lower not in ROUTED_MODELS or pinned.get():
+            return None
+        # Dentro de uma transação no principal, a réplica não enxergaria o
+        # que a própria transação já gravou.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.AGENDA_READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.AGENDA_READ_REPLICAS:
+            return False
+        return None
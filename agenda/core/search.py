@@ -0,0 +1,204 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from core.models import Agenda
+from core.normalization import fold_text, normalize_email
+
+FTS_TABLE = 'core_agenda_fts'
+FTS_COLUMNS = ('nome_completo', 'email', 'telefone', 'observacao')
+
+# Pesos do bm25 na ordem de FTS_COLUMNS: o nome pesa mais que a observação.
+BM25_WEIGHTS = (10.0, 5.0, 5.0, 1.0)
+
+_columns = ', '.join(FTS_COLUMNS)
+_new_values = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+_old_values = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+
+# Tabela FTS5 de conteúdo externo: guarda só o índice invertido e lê as
+# colunas de core_agenda. Os triggers mantêm o índice em sincronia com
+# qualquer escrita (save, delete, bulk_create, update em lote, admin...).
+SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, content='core_agenda', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_fts_ai AFTER INSERT ON core_agenda BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_fts_ad AFTER DELETE ON core_agenda BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_fts_au AFTER UPDATE OF {_columns} ON core_agenda BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+)
+
+DROP_SCHEMA = (
+    'DROP TRIGGER IF EXISTS core_agenda_fts_ai',
+    'DROP TRIGGER IF EXISTS core_agenda_fts_ad',
+    'DROP TRIGGER IF EXISTS core_agenda_fts_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def is_supported(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def install(conn=None):
+    conn = conn or connection
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+
+def uninstall(conn=None):
+    conn = conn or connection
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        for statement in DROP_SCHEMA:
+            cursor.execute(statement)
+
+
+def rebuild(conn=None):
+    conn = conn or connection
+    if not is_supported(conn):
+        return
+    install(conn)
+    with conn.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def reinstall(conn=None):
+    """
+    Recria do zero a tabela FTS, os triggers e o índice numa só transação:
+    até o commit, as buscas continuam usando o índice antigo, e uma falha
+    no meio o deixa como estava.
+    """
+    conn = conn or connection
+    if not is_supported(conn):
+        return
+    with transaction.atomic(using=conn.alias):
+        uninstall(conn)
+        rebuild(conn)
+
+
+def match_expression(query):
+    # Cada palavra digitada vira um termo entre aspas com busca por prefixo,
+    # o que neutraliza a sintaxe do FTS5 (AND, NEAR, aspas, *) vinda do usuário.
+    tokens = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def filter_contacts(queryset, query):
+    expression = match_expression(query)
+    if not expression:
+        return queryset
+    if not is_supported():
+        terms = Q()
+        for column in FTS_COLUMNS:
+            terms |= Q(**{f'{column}__icontains': query})
+        return queryset.filter(terms)
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression]
+    ))
+
+
+def ranked_contacts(query, limit, owner_id):
+    """
+    Queryset (ou RawQuerySet) com os `limit` contatos de `owner_id` mais
+    relevantes para `query`, ordenados pelo bm25, ou None se a busca não
+    tiver termos.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return None
+    if not is_supported():
+        contacts = Agenda.objects.filter(owner_id=owner_id)
+        return filter_contacts(contacts, query).order_by('nome_ordenacao', 'id')[:limit]
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    return Agenda.objects.raw(
+        f'SELECT core_agenda.* FROM {FTS_TABLE} '
+        f'JOIN core_agenda ON core_agenda.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s AND core_agenda.owner_id = %s '
+        f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+        [expression, owner_id, limit],
+    )
+
+
+def search_contacts(query, limit, owner_id):
+    results = ranked_contacts(query, limit, owner_id)
+    return [] if results is None else list(results)
+
+
+async def asearch_contacts(query, limit, owner_id):
+    results = ranked_contacts(query, limit, owner_id)
+    return [] if results is None else [contact async for contact in results]
+
+
+AUTOCOMPLETE_FIELDS = ('id', 'nome_completo', 'email', 'telefone')
+
+# Maior caractere Unicode: [prefixo, prefixo + _MAX_CHAR) é a faixa de tudo
+# que começa com o prefixo, e uma faixa usa o índice (um LIKE 'x%' não usa).
+_MAX_CHAR = '\U0010ffff'
+
+
+def _prefix_range(field, prefix):
+    return {f'{field}__gte': prefix, f'{field}__lt': prefix + _MAX_CHAR}
+
+
+def autocomplete_querysets(prefix, limit, owner_id):
+    """
+    Consultas do autocompletar: contatos de `owner_id` cujo nome (sem acentos
+    e maiúsculas) ou e-mail começa com `prefix`, cada uma limitada a `limit`
+    linhas e lida em ordem direto dos índices agenda_owner_*_busca_idx.
+    """
+    nome = fold_text(prefix)
+    if nome and prefix[-1:].isspace():
+        # "ana " não deve trazer "anabela".
+        nome += ' '
+    # E-mails não têm espaços: com espaço no prefixo, só o nome pode casar.
+    email = '' if any(c.isspace() for c in prefix) else normalize_email(prefix)
+    contacts = Agenda.objects.filter(owner_id=owner_id)
+    querysets = []
+    if nome:
+        querysets.append(contacts.filter(**_prefix_range('nome_busca', nome)).order_by('nome_busca', 'id'))
+    if email:
+        querysets.append(contacts.filter(**_prefix_range('email_busca', email)).order_by('email_busca', 'id'))
+    return [queryset.values(*AUTOCOMPLETE_FIELDS)[:limit] for queryset in querysets]
+
+
+def _add_results(results, rows, limit):
+    seen = {row['id'] for row in results}
+    for row in rows:
+        if len(results) == limit:
+            break
+        if row['id'] not in seen:
+            results.append(row)
+
+
+def autocomplete(prefix, limit, owner_id):
+    # Primeiro os nomes, depois os e-mails; se os nomes já enchem a lista,
+    # a consulta dos e-mails nem é feita.
+    results = []
+    for queryset in autocomplete_querysets(prefix, limit, owner_id):
+        if len(results) == limit:
+            break
+        _add_results(results, list(queryset), limit)
+    return results
+
+
+async def aautocomplete(prefix, limit, owner_id):
+    results = []
+    for queryset in autocomplete_querysets(prefix, limit, owner_id):
+        if len(results) == limit:
+            break
+        _add_results(results, [row async for row in queryset], limit)
+    return results
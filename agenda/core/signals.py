@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from core import events, metrics, search, sqlite, sync
+from core.backends import forget_user
+from core.cache import bump_contacts_version
+from core.models import Agenda
+
+
+@receiver(post_migrate)
+def ensure_triggers(sender, using, **kwargs):
+    # O SQLite recria a tabela core_agenda em várias operações de schema
+    # (AddField, AlterField...) e os triggers do FTS somem junto com a tabela
+    # antiga (os do feed de sincronização também); aqui eles são
+    # reinstalados ao final de cada migrate. Só se as tabelas existirem: um
+    # migrate para trás de 0003 ou 0015 as removeu, e um trigger apontando
+    # para core_contactchange apagada quebraria toda escrita em core_agenda.
+    if sender.name != 'core':
+        return
+    conn = connections[using]
+    tables = conn.introspection.table_names()
+    if search.FTS_TABLE in tables:
+        search.install(conn)
+    if sync.CHANGE_TABLE in tables:
+        sync.install(conn)
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    sqlite.configure(connection)
+
+
+@receiver(post_save, sender=Agenda)
+@receiver(post_delete, sender=Agenda)
+def invalidate_contact_lists(sender, instance, **kwargs):
+    bump_contacts_version(instance.owner_id)
+
+
+@receiver(post_save, sender=Agenda)
+def publish_saved_contact(sender, instance, **kwargs):
+    events.get_backend().contact_saved(instance)
+
+
+@receiver(post_delete, sender=Agenda)
+def publish_deleted_contact(sender, instance, **kwargs):
+    events.get_backend().contact_deleted(instance.id, instance.owner_id)
+
+
+@receiver(user_logged_in)
+def count_login(sender, **kwargs):
+    metrics.inc('agenda_logins_total', (('result', 'success'),))
+
+
+@receiver(user_login_failed)
+def count_failed_login(sender, **kwargs):
+    metrics.inc('agenda_logins_total', (('result', 'failure'),))
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
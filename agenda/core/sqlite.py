@@ -0,0 +1,54 @@
+import sqlite3
+
+from django.conf import settings
+
+
+def pragma_statements(pragmas):
+    # PRAGMA não aceita parâmetros: nomes e valores entram no SQL, então só
+    # passam identificadores e números.
+    statements = []
+    for name, value in pragmas.items():
+        value = str(value)
+        if not (name.replace('_', '').isalnum() and value.lstrip('-').isalnum()):
+            raise ValueError(f'PRAGMA inválido: {name}={value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_pragmas(cursor, pragmas):
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def configure(connection):
+    if connection.vendor != 'sqlite' or not settings.AGENDA_SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.AGENDA_SQLITE_PRAGMAS)
+
+
+def max_query_params(connection):
+    """
+    Quantos parâmetros cabem numa consulta de `connection` (None: sem
+    limite). Para o SQLite, o Django assume 999, o limite anterior à versão
+    3.32; o limite real vem da própria conexão.
+    """
+    if connection.vendor != 'sqlite':
+        return connection.features.max_query_params
+    connection.ensure_connection()
+    return connection.connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+
+def copy_database(source, target):
+    """
+    Copia o banco `source` para `target` com a API de backup online do
+    SQLite: a cópia é consistente mesmo com escritas em andamento e as
+    conexões já abertas em `target` passam a ver o conteúdo novo.
+    """
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
@@ -0,0 +1,138 @@
+"""
+Feed de sincronização: o que mudou nos contatos de um dono desde um cursor.
+
+Triggers em core_agenda mantêm em core_contactchange uma linha por contato
+com o número de sequência da última escrita (AUTOINCREMENT: só cresce, e a
+ordem é a dos commits, porque o SQLite tem um único escritor). Exclusões
+deixam a linha marcada como apagada: é a marca que avisa o cliente. Assim
+como o índice FTS (core/search.py), os triggers pegam qualquer escrita:
+save, bulk_create, update em lote, DELETE do admin, cascata do dono...
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.utils import timezone
+
+from core.models import Agenda, ContactChange
+from core.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+CHANGE_TABLE = ContactChange._meta.db_table
+
+
+def _record(row, apagado):
+    # OR REPLACE apaga a linha anterior do contato e grava uma nova, com a
+    # próxima sequência.
+    return (
+        f"INSERT OR REPLACE INTO {CHANGE_TABLE} (owner_id, contact_id, apagado, alterado_em) "
+        f"VALUES ({row}.owner_id, {row}.id, {apagado}, strftime('%Y-%m-%d %H:%M:%f', 'now'));"
+    )
+
+
+SCHEMA = (
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_sync_ai AFTER INSERT ON core_agenda BEGIN "
+    f"{_record('new', 0)} END",
+
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_sync_au AFTER UPDATE ON core_agenda BEGIN "
+    f"{_record('new', 0)} END",
+
+    f"CREATE TRIGGER IF NOT EXISTS core_agenda_sync_ad AFTER DELETE ON core_agenda BEGIN "
+    f"{_record('old', 1)} END",
+)
+
+DROP_SCHEMA = (
+    'DROP TRIGGER IF EXISTS core_agenda_sync_ai',
+    'DROP TRIGGER IF EXISTS core_agenda_sync_au',
+    'DROP TRIGGER IF EXISTS core_agenda_sync_ad',
+)
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def is_supported(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def install(conn=None):
+    conn = conn or connection
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+
+def uninstall(conn=None):
+    conn = conn or connection
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        for statement in DROP_SCHEMA:
+            cursor.execute(statement)
+
+
+def make_cursor(seq, now=None):
+    # Opaco para o cliente: a sequência e o instante em que foi emitido.
+    return encode_cursor(seq, int((now or timezone.now()).timestamp()))
+
+
+def parse_cursor(cursor, now=None):
+    """
+    Sequência do cursor. Marcas de exclusão mais antigas que
+    AGENDA_SYNC_TOMBSTONE_DAYS são expurgadas: um cursor mais velho que isso
+    pode ter perdido exclusões e o cliente precisa sincronizar do zero.
+    """
+    seq, issued = decode_cursor(cursor, value_type=int)
+    if not isinstance(seq, int) or seq < 0:
+        raise InvalidCursor(cursor)
+    now = now or timezone.now()
+    if now.timestamp() - issued > timedelta(days=settings.AGENDA_SYNC_TOMBSTONE_DAYS).total_seconds():
+        raise CursorExpired(cursor)
+    return seq
+
+
+def changes_since(owner_id, after, limit, now=None):
+    """
+    Até `limit` alterações dos contatos de `owner_id` com sequência maior
+    que `after`, em ordem. Devolve (alterações, próximo cursor, has_more).
+    Sem cursor (`after` None), é a carga inicial: só contatos existentes.
+    Cada página é uma faixa do índice change_owner_seq_idx.
+    """
+    now = now or timezone.now()
+    # O feed vem do principal: uma réplica atrasada devolveria ao cliente um
+    # retrato antigo, sem as alterações que ele acabou de gravar.
+    using = DEFAULT_DB_ALIAS
+    # As duas consultas numa transação leem o mesmo retrato do banco.
+    with transaction.atomic(using=using):
+        log = ContactChange.objects.using(using).filter(owner_id=owner_id, seq__gt=after or 0)
+        if after is None:
+            log = log.filter(apagado=False)
+        rows = list(log.order_by('seq')[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        contacts = Agenda.objects.using(using).in_bulk([row.contact_id for row in rows if not row.apagado])
+    result = []
+    for row in rows:
+        if row.apagado:
+            result.append({'op': 'delete', 'seq': row.seq, 'id': row.contact_id})
+        elif row.contact_id in contacts:
+            result.append({'op': 'upsert', 'seq': row.seq, 'contact': contacts[row.contact_id].to_dict()})
+    last = rows[-1].seq if rows else (after or 0)
+    return result, make_cursor(last, now), has_more
+
+
+def purge_tombstones(days=None, batch_size=2000, now=None):
+    """Expurga as marcas de exclusão com mais de `days` dias, em lotes."""
+    days = settings.AGENDA_SYNC_TOMBSTONE_DAYS if days is None else days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    purged = 0
+    while True:
+        ids = list(
+            ContactChange.objects.filter(apagado=True, alterado_em__lt=cutoff)
+            .values_list('seq', flat=True)[:batch_size]
+        )
+        if not ids:
+            return purged
+        purged += ContactChange.objects.filter(seq__in=ids).delete()[0]
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Para TestCase: `assertMaxQueries(n)` falha quando o bloco faz mais de `n`
+    consultas, listando-as. Diferente de assertNumQueries, aceita melhorias e
+    só acusa regressões (como um N+1 novo).
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as captured:
+            yield captured
+        if len(captured) > budget:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(captured.captured_queries, start=1)
+            )
+            self.fail(f'{len(captured)} consultas executadas, orçamento de {budget}:\n{queries}')
@@ -0,0 +1,125 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from http import HTTPStatus
+from core.bulk import delete_matching, update_matching
+from core.cache import contacts_version
+from core.models import Agenda, DuplicateCandidate
+from core.pagination import EstimatedCountPaginator, estimated_count
+
+
+class AgendaAdminTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='admin', password='testpass123')
+        self.url = reverse('admin:core_agenda_changelist')
+        self.joao = Agenda.objects.create(
+            owner=self.admin, nome_completo='João da Silva', telefone='(19) 99999-8888',
+            email='joao@Empresa.com.br', observacao='Cliente antigo'
+        )
+        self.maria = Agenda.objects.create(
+            owner=self.admin, nome_completo='Maria Souza', telefone='(11) 98888-7777',
+            email='maria@example.com', observacao='Fornecedora'
+        )
+
+    def test_derived_filter_columns(self):
+        self.assertEqual((self.joao.email_dominio, self.joao.ddd), ('empresa.com.br', '19'))
+
+    def test_added_contact_belongs_to_admin(self):
+        response = self.client.post(reverse('admin:core_agenda_add'), {
+            'nome_completo': 'Ana Lima', 'telefone': '(19) 97777-6666', 'email': 'ana@example.com',
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertEqual(Agenda.objects.get(nome_completo='Ana Lima').owner, self.admin)
+
+    def test_changelist_without_exact_count(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'João da Silva')
+        counts = [q['sql'] for q in captured if 'COUNT(' in q['sql'] and 'core_agenda' in q['sql']]
+        # Só a contagem dos domínios do filtro (depois fica em cache).
+        self.assertEqual(len(counts), 1)
+        self.assertIn('email_dominio', counts[0])
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(self.url)
+        self.assertFalse([q for q in captured if 'COUNT(' in q['sql']])
+
+    def test_search_uses_full_text_index(self):
+        response = self.client.get(self.url, {'q': 'fornecedora'})
+        self.assertContains(response, 'Maria Souza')
+        self.assertNotContains(response, 'João da Silva')
+
+    def test_filters(self):
+        response = self.client.get(self.url, {'ddd': '19'})
+        self.assertContains(response, 'João da Silva')
+        self.assertNotContains(response, 'Maria Souza')
+        response = self.client.get(self.url, {'dominio': 'example.com'})
+        self.assertContains(response, 'Maria Souza')
+        self.assertNotContains(response, 'João da Silva')
+
+    def test_filters_use_indexes(self):
+        self.assertIn('agenda_ddd_idx', Agenda.objects.filter(ddd='19').order_by('-id').explain())
+        self.assertIn('agenda_email_dominio_idx', Agenda.objects.filter(email_dominio='x.com').explain())
+
+    def test_clear_notes_action(self):
+        version = contacts_version(self.admin.pk)
+        response = self.client.post(self.url, {
+            'action': 'limpar_observacao', '_selected_action': [self.joao.id, self.maria.id],
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertFalse(Agenda.objects.exclude(observacao='').exists())
+        self.assertGreater(contacts_version(self.admin.pk), version)
+
+    def test_bulk_delete_action(self):
+        DuplicateCandidate.objects.create(contact_a=self.joao, contact_b=self.maria, score=0.9, motivos='nome')
+        self.client.post(self.url, {'action': 'excluir_em_lote', '_selected_action': [self.joao.id]})
+        self.assertEqual(list(Agenda.objects.all()), [self.maria])
+        self.assertFalse(DuplicateCandidate.objects.exists())
+
+    def test_default_delete_action_is_replaced(self):
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'value="delete_selected"')
+
+
+class SetBasedOperationsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@fatec.sp.gov.br', password='x')
+        Agenda.objects.bulk_create(
+            Agenda(owner=self.user, nome_completo=f'Contato {i}', telefone='19999998888', email=f'c{i}@x.com')
+            for i in range(20)
+        )
+
+    def test_delete_matching_is_set_based(self):
+        # Donos, candidatos a duplicata e contatos (mais o savepoint); nada por linha.
+        with self.assertNumQueries(5):
+            deleted = delete_matching(Agenda.objects.filter(nome_completo__startswith='Contato 1'))
+        self.assertEqual(deleted, 11)
+        self.assertEqual(Agenda.objects.count(), 9)
+
+    def test_update_matching_is_set_based(self):
+        # Donos e um único UPDATE.
+        with self.assertNumQueries(2):
+            updated = update_matching(Agenda.objects.filter(nome_completo__startswith='Contato 1'), observacao='x')
+        self.assertEqual(updated, 11)
+
+    def test_estimated_count(self):
+        self.assertEqual(estimated_count(Agenda), 20)
+        Agenda.objects.filter(nome_completo='Contato 5').delete()
+        # Exclusões no meio não reduzem a estimativa.
+        self.assertEqual(estimated_count(Agenda), 20)
+
+    def test_paginator_caps_filtered_count(self):
+        with self.settings(AGENDA_ADMIN_COUNT_LIMIT=5):
+            paginator = EstimatedCountPaginator(Agenda.objects.filter(owner=self.user).order_by('-id'), 2)
+            self.assertEqual(paginator.count, 5)
+            self.assertEqual(EstimatedCountPaginator(Agenda.objects.order_by('-id'), 2).count, 20)
@@ -0,0 +1,111 @@
+import json
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from http import HTTPStatus
+from core.models import Agenda
+
+
+class BatchApiTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def post(self, name, payload):
+        return self.client.post(reverse(name), json.dumps(payload), content_type='application/json')
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.post('api_create_contacts', {'contacts': []})
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_requires_post(self):
+        response = self.client.get(reverse('api_create_contacts'))
+        self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+
+    def test_invalid_json(self):
+        response = self.client.post(reverse('api_create_contacts'), 'nao é json', content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.post('api_create_contacts', {'contatos': []})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    @override_settings(AGENDA_API_MAX_BATCH=2)
+    def test_batch_too_large(self):
+        response = self.post('api_delete_contacts', {'ids': [1, 2, 3]})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_create_batch(self):
+        contacts = [
+            {'nome_completo': f'Contato {i}', 'telefone': f'(19) 99999-{i:04d}', 'email': f'c{i}@example.com'}
+            for i in range(50)
+        ]
+        contacts.append({'nome_completo': 'Sem telefone', 'email': 'x@example.com'})
+        with self.assertNumQueries(5):
+            response = self.post('api_create_contacts', {'contacts': contacts})
+        results = response.json()['results']
+        self.assertEqual(len(results), 51)
+        self.assertEqual(results[0]['status'], 'created')
+        self.assertEqual(Agenda.objects.get(id=results[0]['id']).telefone_normalizado, '19999990000')
+        self.assertEqual(results[50]['status'], 'invalid')
+        self.assertIn('telefone', results[50]['erros'])
+        self.assertEqual(Agenda.objects.count(), 51)
+
+    def test_update_batch_is_partial(self):
+        other = Agenda.objects.create(owner=self.user, nome_completo='Jane', telefone='(19) 99999-7777', email='jane@example.com')
+        response = self.post('api_update_contacts', {'contacts': [
+            {'id': self.contact.id, 'telefone': '(19) 88888-7777'},
+            {'id': other.id, 'email': 'invalido'},
+            {'id': 999, 'nome_completo': 'Ninguém'},
+            {'id': self.contact.id, 'nome_completo': 'Repetido'},
+            {'nome_completo': 'Sem id'},
+        ]})
+        statuses = [r['status'] for r in response.json()['results']]
+        self.assertEqual(statuses, ['updated', 'invalid', 'not_found', 'invalid', 'invalid'])
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.nome_completo, 'John Doe')
+        self.assertEqual(self.contact.telefone_normalizado, '19888887777')
+        self.assertGreater(self.contact.atualizado_em, self.contact.criado_em)
+        other.refresh_from_db()
+        self.assertEqual(other.email, 'jane@example.com')
+
+    def test_delete_batch(self):
+        response = self.post('api_delete_contacts', {'ids': [self.contact.id, 999, 'x']})
+        statuses = [r['status'] for r in response.json()['results']]
+        self.assertEqual(statuses, ['deleted', 'not_found', 'invalid'])
+        self.assertFalse(Agenda.objects.exists())
+
+    def test_out_of_range_and_bool_ids_are_invalid(self):
+        response = self.post('api_delete_contacts', {'ids': [2 ** 70, True, -2 ** 64]})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['invalid'] * 3)
+        response = self.post('api_update_contacts', {'contacts': [
+            {'id': 2 ** 70, 'nome_completo': 'X'}, {'id': True, 'nome_completo': 'X'},
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['invalid', 'invalid'])
+        self.assertTrue(Agenda.objects.filter(id=self.contact.id, nome_completo='John Doe').exists())
+
+    def test_csrf_is_enforced(self):
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='testuser', password='testpass123')
+        response = client.post(reverse('api_delete_contacts'), json.dumps({'ids': []}),
+                               content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_batch_invalidates_list_cache(self):
+        self.client.get(reverse('list_contacts'))
+        self.post('api_create_contacts', {'contacts': [
+            {'nome_completo': 'Jane Smith', 'telefone': '(19) 99999-7777', 'email': 'jane@example.com'},
+        ]})
+        self.assertContains(self.client.get(reverse('list_contacts')), 'Jane Smith')
@@ -0,0 +1,112 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse, resolve
+from http import HTTPStatus
+from core import async_views
+from core.models import Agenda
+
+
+@override_settings(ROOT_URLCONF='core.async_urls')
+class AsyncContactViewsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def test_routes_use_async_views(self):
+        self.assertIs(resolve(reverse('list_contacts')).func, async_views.list_contacts)
+        self.assertIs(resolve(reverse('update_contact', args=[1])).func, async_views.update_contact)
+
+    async def test_list_requires_login(self):
+        response = await self.async_client.get(reverse('list_contacts'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    async def test_list_contacts(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('list_contacts'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'John Doe')
+
+    async def test_autocomplete(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('autocomplete_contacts'), {'q': 'JOH', 'seq': '3'})
+        data = response.json()
+        self.assertEqual(data['seq'], 3)
+        self.assertEqual([row['id'] for row in data['results']], [self.contact.id])
+        response = await self.async_client.get(reverse('autocomplete_contacts'), {'q': 'JOH', 'seq': '²'})
+        self.assertIsNone(response.json()['seq'])
+
+    async def test_search_contacts(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('search_contacts'), {'q': 'john'})
+        self.assertEqual(response.context['contacts'], [self.contact])
+
+    async def test_detail(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('contact_detail', args=[self.contact.id]))
+        self.assertEqual(response.json()['nome_completo'], 'John Doe')
+        response = await self.async_client.get(reverse('contact_detail', args=[999]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    async def test_create_contact(self):
+        await self.async_client.aforce_login(self.user)
+        data = {
+            'nome_completo': 'Jane Smith',
+            'telefone': '(19) 99999-7777',
+            'email': 'jane@example.com',
+        }
+        response = await self.async_client.post(reverse('create_contact'), data)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        contact = await Agenda.objects.aget(nome_completo='Jane Smith')
+        self.assertEqual(contact.telefone_normalizado, '19999997777')
+
+    async def test_create_contact_invalid(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse('create_contact'), {'nome_completo': ''})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('telefone', response.context['form'].errors)
+
+    async def test_update_contact(self):
+        await self.async_client.aforce_login(self.user)
+        data = {
+            'nome_completo': 'John Updated',
+            'telefone': '(19) 88888-7777',
+            'email': 'john@example.com',
+        }
+        response = await self.async_client.post(reverse('update_contact', args=[self.contact.id]), data)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        await sync_to_async(self.contact.refresh_from_db)()
+        self.assertEqual(self.contact.nome_completo, 'John Updated')
+
+    async def test_delete_contact(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse('delete_contact', args=[self.contact.id]))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertFalse(await Agenda.objects.filter(id=self.contact.id).aexists())
+
+    async def test_partial_responses(self):
+        await self.async_client.aforce_login(self.user)
+        partial = {'X-Partial': '1'}
+        response = await self.async_client.get(reverse('create_contact'), headers=partial)
+        self.assertTemplateUsed(response, '_contact_form.html')
+        self.assertTemplateNotUsed(response, 'create_contact.html')
+        data = {'nome_completo': 'Jane Smith', 'telefone': '(19) 99999-7777', 'email': 'jane@example.com'}
+        response = await self.async_client.post(reverse('create_contact'), data, headers=partial)
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertContains(response, 'Jane Smith', status_code=HTTPStatus.CREATED)
+        url = reverse('update_contact', args=[self.contact.id])
+        response = await self.async_client.post(url, {'nome_completo': ''}, headers=partial)
+        self.assertEqual(response.status_code, HTTPStatus.UNPROCESSABLE_ENTITY)
+        response = await self.async_client.post(url, dict(data, nome_completo='John Updated'), headers=partial)
+        self.assertContains(response, f'data-contact-id="{self.contact.id}"')
+        response = await self.async_client.post(reverse('delete_contact', args=[self.contact.id]), headers=partial)
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
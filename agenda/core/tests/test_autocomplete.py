@@ -0,0 +1,121 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from http import HTTPStatus
+from core.models import Agenda
+from core.search import autocomplete, autocomplete_querysets
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+        self.joao = Agenda.objects.create(
+            owner=self.user, nome_completo='João da Silva', telefone='19999998888', email='silva@example.com'
+        )
+        self.joana = Agenda.objects.create(
+            owner=self.user, nome_completo='Joana Souza', telefone='19999997777', email='jsouza@example.com'
+        )
+        self.maria = Agenda.objects.create(
+            owner=self.user, nome_completo='Maria Lima', telefone='19999996666', email='joao.lima@example.com'
+        )
+
+    def names(self, prefix, limit=10):
+        return [row['nome_completo'] for row in autocomplete(prefix, limit, self.user.pk)]
+
+    def test_folded_columns_follow_writes(self):
+        self.assertEqual(self.joao.nome_busca, 'joao da silva')
+        self.joao.nome_completo = 'JOSÉ Álvares'
+        self.joao.email = 'Jose@Example.com'
+        self.joao.save(update_fields=['nome_completo', 'email'])
+        self.joao.refresh_from_db()
+        self.assertEqual((self.joao.nome_busca, self.joao.email_busca), ('jose alvares', 'jose@example.com'))
+
+    def test_prefix_ignores_accents_and_case(self):
+        self.assertEqual(self.names('JOÃ'), ['Joana Souza', 'João da Silva'])
+        self.assertEqual(self.names('joao '), ['João da Silva'])
+
+    def test_names_come_before_emails_and_limit_applies(self):
+        self.assertEqual(self.names('jo', limit=2), ['Joana Souza', 'João da Silva'])
+        self.assertEqual(self.names('Joao.'), ['João da Silva', 'Maria Lima'])
+
+    def test_full_list_of_names_skips_email_query(self):
+        with self.assertNumQueries(1):
+            autocomplete('jo', 2, self.user.pk)
+
+    def test_only_owner_contacts(self):
+        other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='testpass123')
+        self.assertEqual(autocomplete('jo', 10, other.pk), [])
+
+    def test_range_queries_use_prefix_indexes(self):
+        nome, email = autocomplete_querysets('jo', 10, self.user.pk)
+        self.assertIn('agenda_owner_nome_busca_idx', nome.explain())
+        self.assertIn('agenda_owner_email_busca_idx', email.explain())
+        self.assertNotIn('TEMP B-TREE', nome.explain() + email.explain())
+
+
+class AutocompleteViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('autocomplete_contacts')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url, {'q': 'jo'})
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_returns_results_and_echoes_seq(self):
+        response = self.client.get(self.url, {'q': 'jo', 'seq': '7'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json(), {
+            'q': 'jo',
+            'seq': 7,
+            'results': [{
+                'id': self.contact.id, 'nome_completo': 'John Doe',
+                'email': 'john@example.com', 'telefone': '(19) 99999-8888',
+            }],
+        })
+
+    @override_settings(AGENDA_AUTOCOMPLETE_MAX_AGE=30)
+    def test_short_private_cache(self):
+        response = self.client.get(self.url, {'q': 'jo'})
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age=30', response['Cache-Control'])
+
+    def test_empty_prefix_skips_database(self):
+        self.client.get(self.url, {'q': 'jo'})
+        # Só sessão e usuário.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'q': '  ', 'seq': 'x'})
+        self.assertEqual(response.json(), {'q': '', 'seq': None, 'results': []})
+
+    def test_malformed_seq_is_dropped(self):
+        for seq in ('²', '-1', str(2 ** 64)):
+            response = self.client.get(self.url, {'q': 'jo', 'seq': seq})
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertIsNone(response.json()['seq'])
+
+    def test_limit_is_bounded(self):
+        for i in range(30):
+            Agenda.objects.create(
+                owner=self.user, nome_completo=f'Jo {i}', telefone='19999998888', email=f'c{i}@example.com'
+            )
+        self.assertEqual(len(self.client.get(self.url, {'q': 'jo', 'limit': 1000}).json()['results']), 25)
+        self.assertEqual(len(self.client.get(self.url, {'q': 'jo', 'limit': 'x'}).json()['results']), 10)
+
+    def test_list_page_wires_the_search_box(self):
+        response = self.client.get(reverse('list_contacts'))
+        self.assertContains(response, f'data-autocomplete-url="{self.url}"')
@@ -0,0 +1,111 @@
+from unittest import mock
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core.forms import LoginForm
+
+UserModel = get_user_model()
+
+
+class EmailBackendTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(
+            username='orlando',
+            email='orlando@fatec.sp.gov.br',
+            password='senha123'
+        )
+
+    def test_authenticates_by_email_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = authenticate(email='orlando@fatec.sp.gov.br', password='senha123')
+        self.assertEqual(user, self.user)
+
+    def test_wrong_password(self):
+        self.assertIsNone(authenticate(email='orlando@fatec.sp.gov.br', password='errada'))
+
+    def test_inactive_user(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(authenticate(email='orlando@fatec.sp.gov.br', password='senha123'))
+
+    def test_hasher_runs_once_for_unknown_and_known_emails(self):
+        for email in ('naoexiste@fatec.sp.gov.br', 'orlando@fatec.sp.gov.br'):
+            with self.subTest(email=email):
+                with mock.patch.object(PBKDF2PasswordHasher, 'encode', autospec=True,
+                                       side_effect=PBKDF2PasswordHasher.encode) as encode:
+                    authenticate(email=email, password='errada')
+                self.assertEqual(encode.call_count, 1)
+
+    def test_username_login_still_works(self):
+        self.assertEqual(authenticate(username='orlando', password='senha123'), self.user)
+
+    def test_email_lookup_uses_index(self):
+        queryset = UserModel.objects.filter(email='orlando@fatec.sp.gov.br', email__gt='')
+        self.assertIn('core_auth_user_email_uniq', queryset.explain())
+
+    def test_email_is_unique(self):
+        with self.assertRaises(IntegrityError):
+            UserModel.objects.create_user(username='outro', email='orlando@fatec.sp.gov.br')
+
+    def test_blank_emails_may_repeat(self):
+        UserModel.objects.create_user(username='semEmail1', email='')
+        UserModel.objects.create_user(username='semEmail2', email='')
+        self.assertEqual(UserModel.objects.filter(email='').count(), 2)
+
+
+class LoginFormQueriesTest(TestCase):
+    def setUp(self):
+        UserModel.objects.create_user(
+            username='orlando',
+            email='orlando@fatec.sp.gov.br',
+            password='senha123'
+        )
+
+    def test_successful_login_runs_one_query(self):
+        form = LoginForm(data={'email': 'orlando@fatec.sp.gov.br', 'password': 'senha123'})
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+
+
+@override_settings(
+    AGENDA_USER_CACHE_TTL=60,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+)
+class CachedSessionAndUserTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = UserModel.objects.create_user(
+            username='orlando',
+            email='orlando@fatec.sp.gov.br',
+            password='senha123'
+        )
+        self.client.login(email='orlando@fatec.sp.gov.br', password='senha123')
+        self.url = reverse('home')
+
+    def test_authenticated_page_without_queries(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_password_change_logs_out(self):
+        self.client.get(self.url)
+        self.user.set_password('nova-senha')
+        self.user.save()
+        self.assertRedirects(self.client.get(self.url), f"{reverse('login')}?next={self.url}")
+
+    def test_deactivated_user_is_not_served_from_cache(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_logout_forgets_user(self):
+        self.client.get(self.url)
+        self.client.post(reverse('logout'))
+        self.assertIsNone(cache.get(f'agenda:user:{self.user.pk}'))
+        self.assertEqual(self.client.get(self.url).status_code, 302)
@@ -0,0 +1,38 @@
+from django.test import TestCase
+from core.benchmarks import MEMORY_SAMPLES, BenchmarkError, compare, percentile, run_benchmarks, seed_contacts
+from core.models import Agenda
+
+
+class BenchmarkTest(TestCase):
+    def test_seed_is_deterministic(self):
+        seed_contacts(30, seed=7)
+        first = list(Agenda.objects.order_by('id').values_list('nome_completo', 'telefone'))
+        Agenda.objects.all().delete()
+        seed_contacts(30, seed=7)
+        second = list(Agenda.objects.order_by('id').values_list('nome_completo', 'telefone'))
+        self.assertEqual(first, second)
+        self.assertFalse(Agenda.objects.filter(telefone_normalizado='').exists())
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50.5)
+        self.assertEqual(percentile(samples, 100), 100)
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(20, 3, warmup=1, only=['list_contacts', 'update_contact', 'delete_contact'])
+        self.assertEqual(set(results['scenarios']), {'list_contacts', 'update_contact', 'delete_contact'})
+        row = results['scenarios']['list_contacts']
+        self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+        self.assertEqual(row['queries_max'], 3)
+        self.assertGreater(row['peak_alloc_kb'], 0)
+        # 4 exclusões medidas e as das amostras de memória.
+        self.assertEqual(Agenda.objects.count(), 20 - 4 - MEMORY_SAMPLES)
+
+    def test_dataset_too_small(self):
+        with self.assertRaises(BenchmarkError):
+            run_benchmarks(5, 10)
+
+    def test_compare_with_baseline(self):
+        results = {'scenarios': {'login': {'p95_ms': 15.0}, 'novo': {'p95_ms': 1.0}}}
+        baseline = {'scenarios': {'login': {'p95_ms': 10.0}}}
+        self.assertEqual(compare(results, baseline), {'login': 50.0})
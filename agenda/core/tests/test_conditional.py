@@ -0,0 +1,95 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from http import HTTPStatus
+from core.models import Agenda
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def etag_for(self, url):
+        # A primeira resposta cria o cookie CSRF, que faz parte do ETag.
+        self.client.get(url)
+        response = self.client.get(url)
+        return response['ETag']
+
+    def test_timestamps(self):
+        self.assertIsNotNone(self.contact.criado_em)
+        atualizado_em = self.contact.atualizado_em
+        self.contact.nome_completo = 'John Updated'
+        self.contact.save(update_fields=['nome_completo'])
+        self.contact.refresh_from_db()
+        self.assertGreater(self.contact.atualizado_em, atualizado_em)
+
+    def test_list_returns_304_when_unchanged(self):
+        url = reverse('list_contacts')
+        etag = self.etag_for(url)
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_list_etag_changes_after_write(self):
+        url = reverse('list_contacts')
+        etag = self.etag_for(url)
+        Agenda.objects.create(owner=self.user, nome_completo='Jane Smith', telefone='19999997777', email='jane@example.com')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Jane Smith')
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_list_etag_depends_on_parameters(self):
+        url = reverse('list_contacts')
+        etag = self.etag_for(url)
+        response = self.client.get(url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_update_page_returns_304_when_unchanged(self):
+        url = reverse('update_contact', args=[self.contact.id])
+        etag = self.etag_for(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_update_page_changes_after_save(self):
+        url = reverse('update_contact', args=[self.contact.id])
+        etag = self.etag_for(url)
+        self.contact.observacao = 'Nova observação'
+        self.contact.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Nova observação')
+
+    def test_update_fragment_does_not_match_page_etag(self):
+        url = reverse('update_contact', args=[self.contact.id])
+        etag = self.etag_for(url)
+        response = self.client.get(url, headers={'X-Partial': '1', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertTemplateUsed(response, '_contact_form.html')
+        self.assertTemplateNotUsed(response, 'update_contact.html')
+        response = self.client.get(url, headers={'X-Partial': '1', 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_etag_is_per_user(self):
+        url = reverse('list_contacts')
+        etag = self.etag_for(url)
+        User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='testpass123')
+        other = Client()
+        other.login(username='outro', password='testpass123')
+        response = other.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
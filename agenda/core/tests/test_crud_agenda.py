@@ -64,11 +64,13 @@ class ListContactsTest(TestCase):
         self.client.login(username='testuser', password='testpass123')
         self.url = reverse('list_contacts')
         self.contact1 = Agenda.objects.create(
+            owner=self.user,
             nome_completo='John Doe',
             telefone='(19) 99999-8888',
             email='john@example.com'
         )
         self.contact2 = Agenda.objects.create(
+            owner=self.user,
             nome_completo='Jane Smith',
             telefone='(19) 99999-7777',
             email='jane@example.com'
@@ -105,6 +107,7 @@ class UpdateContactTest(TestCase):
         )
         self.client.login(username='testuser', password='testpass123')
         self.contact = Agenda.objects.create(
+            owner=self.user,
             nome_completo='John Doe',
             telefone='(19) 99999-8888',
             email='john@example.com',
@@ -171,6 +174,7 @@ class DeleteContactTest(TestCase):
         )
         self.client.login(username='testuser', password='testpass123')
         self.contact = Agenda.objects.create(
+            owner=self.user,
             nome_completo='John Doe',
             telefone='(19) 99999-8888',
             email='john@example.com'
@@ -194,3 +198,158 @@ class DeleteContactTest(TestCase):
         url = reverse('delete_contact', args=[999])
         response = self.client.post(url)
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class ContactDetailTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def test_detail_returns_json(self):
+        response = self.client.get(reverse('contact_detail', args=[self.contact.id]))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['email'], 'john@example.com')
+
+    def test_detail_404_not_found(self):
+        response = self.client.get(reverse('contact_detail', args=[999]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class OwnerIsolationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        other = User.objects.create_user(
+            username='outro',
+            email='outro@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.own = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+        self.foreign = Agenda.objects.create(
+            owner=other,
+            nome_completo='Jane Smith',
+            telefone='(19) 99999-7777',
+            email='jane@example.com'
+        )
+
+    def test_create_assigns_owner(self):
+        self.client.post(reverse('create_contact'), {
+            'nome_completo': 'Maria Souza',
+            'telefone': '(11) 98888-7777',
+            'email': 'maria@example.com',
+        })
+        self.assertEqual(Agenda.objects.get(nome_completo='Maria Souza').owner, self.user)
+
+    def test_list_search_and_export_show_only_own_contacts(self):
+        for url, params in [
+            (reverse('list_contacts'), {}),
+            (reverse('search_contacts'), {'q': 'example'}),
+            (reverse('export_contacts'), {'formato': 'csv'}),
+        ]:
+            with self.subTest(url=url):
+                response = self.client.get(url, params)
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                self.assertIn(b'John Doe', content)
+                self.assertNotIn(b'Jane Smith', content)
+
+    def test_foreign_contact_is_not_found(self):
+        self.assertEqual(
+            self.client.get(reverse('contact_detail', args=[self.foreign.id])).status_code, HTTPStatus.NOT_FOUND
+        )
+        response = self.client.post(reverse('update_contact', args=[self.foreign.id]), {
+            'nome_completo': 'Invadido', 'telefone': '(19) 99999-7777', 'email': 'jane@example.com',
+        })
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.client.post(reverse('delete_contact', args=[self.foreign.id]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.nome_completo, 'Jane Smith')
+
+
+class PartialResponseTest(TestCase):
+    def setUp(self):
+        self.client = Client(headers={'X-Partial': '1'})
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+        self.data = {
+            'nome_completo': 'Jane Smith',
+            'telefone': '(19) 99999-7777',
+            'email': 'jane@example.com',
+        }
+
+    def test_create_returns_only_the_new_row(self):
+        response = self.client.post(reverse('create_contact'), self.data)
+        contact = Agenda.objects.get(nome_completo='Jane Smith')
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertTemplateUsed(response, '_contact_row.html')
+        self.assertTemplateNotUsed(response, 'list_contacts.html')
+        self.assertContains(response, f'data-contact-id="{contact.id}"', status_code=HTTPStatus.CREATED)
+
+    def test_forms_are_returned_as_snippets(self):
+        response = self.client.get(reverse('create_contact'))
+        self.assertTemplateUsed(response, '_contact_form.html')
+        self.assertTemplateNotUsed(response, 'create_contact.html')
+        self.assertNotContains(response, '<html')
+        self.assertIn('X-Partial', response['Vary'])
+        response = self.client.get(reverse('update_contact', args=[self.contact.id]))
+        self.assertContains(response, f'action="{reverse("update_contact", args=[self.contact.id])}"')
+        self.assertContains(response, 'value="John Doe"')
+
+    def test_invalid_post_returns_form_with_errors(self):
+        response = self.client.post(reverse('update_contact', args=[self.contact.id]), {'nome_completo': ''})
+        self.assertEqual(response.status_code, HTTPStatus.UNPROCESSABLE_ENTITY)
+        self.assertTemplateUsed(response, '_contact_form.html')
+        self.assertIn('telefone', response.context['form'].errors)
+
+    def test_update_returns_the_changed_row(self):
+        response = self.client.post(reverse('update_contact', args=[self.contact.id]), self.data)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, f'data-contact-id="{self.contact.id}"')
+        self.assertContains(response, 'Jane Smith')
+
+    def test_delete_returns_no_content(self):
+        response = self.client.post(reverse('delete_contact', args=[self.contact.id]))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Agenda.objects.filter(id=self.contact.id).exists())
+
+    def test_full_page_without_header(self):
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        response = client.get(reverse('update_contact', args=[self.contact.id]))
+        self.assertTemplateUsed(response, 'update_contact.html')
+        self.assertTemplateUsed(response, '_contact_form.html')
+        self.assertIn('X-Partial', response['Vary'])
+        response = client.get(reverse('list_contacts'))
+        self.assertContains(response, 'id="contact-form-slot"')
+        self.assertContains(response, 'data-partial')
@@ -0,0 +1,133 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.urls import reverse
+from http import HTTPStatus
+from core.dedupe import candidate_pairs, find_duplicates, merge_candidates, score_pair
+from core.models import Agenda, DuplicateCandidate
+from core.normalization import fold_text
+
+
+class DedupeTest(TestCase):
+    def setUp(self):
+        self.joao = Agenda.objects.create(
+            nome_completo='João da Silva', telefone='(19) 99999-8888', email='joao@example.com',
+            observacao='Cliente antigo'
+        )
+        self.joao2 = Agenda.objects.create(
+            nome_completo='joao  DA silva', telefone='+55 19 99999-8888', email='JOAO@example.com',
+            observacao='Prefere WhatsApp'
+        )
+        self.joao3 = Agenda.objects.create(
+            nome_completo='Silva, João da', telefone='19999998888', email='outro@example.com'
+        )
+        self.maria = Agenda.objects.create(
+            nome_completo='Maria Souza', telefone='(11) 98888-7777', email='maria@example.com'
+        )
+
+    def test_fold_text(self):
+        self.assertEqual(fold_text('  José  da Silva-Júnior'), 'jose da silva junior')
+
+    def test_blocking_only_pairs_sharing_a_key(self):
+        pairs = candidate_pairs(Agenda.objects.all())
+        self.assertEqual(pairs, {
+            (self.joao.id, self.joao2.id), (self.joao.id, self.joao3.id), (self.joao2.id, self.joao3.id),
+        })
+
+    def test_blocks_do_not_cross_owners(self):
+        other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='testpass123')
+        Agenda.objects.create(
+            owner=other, nome_completo='Maria Souza', telefone='11988887777', email='maria@example.com'
+        )
+        paired = {contact_id for pair in candidate_pairs(Agenda.objects.all()) for contact_id in pair}
+        self.assertNotIn(self.maria.id, paired)
+
+    def test_oversized_blocks_are_skipped(self):
+        # Telefone e nome reúnem três contatos; só o bloco do e-mail (dois) fica.
+        self.assertEqual(candidate_pairs(Agenda.objects.all(), max_block_size=2), {(self.joao.id, self.joao2.id)})
+
+    def test_score(self):
+        a = {'nome_completo': 'João da Silva', 'email': 'joao@example.com', 'telefone_normalizado': '19999998888'}
+        b = {'nome_completo': 'joao silva', 'email': 'Joao@Example.com', 'telefone_normalizado': '11999998888'}
+        score, motivos = score_pair(a, b)
+        self.assertEqual(motivos, ['email', 'telefone parecido', 'nome parecido'])
+        self.assertGreater(score, 0.8)
+
+    def test_score_range(self):
+        a = {'nome_completo': 'João da Silva', 'email': 'joao@example.com', 'telefone_normalizado': '19999998888'}
+        self.assertEqual(score_pair(a, dict(a)), (1.0, ['email', 'telefone', 'nome']))
+        variants = [
+            a,
+            {**a, 'nome_completo': 'joao silva'},
+            {**a, 'telefone_normalizado': '11999998888'},
+            {**a, 'email': ''},
+            {'nome_completo': 'Maria', 'email': 'm@example.com', 'telefone_normalizado': ''},
+        ]
+        for x in variants:
+            for y in variants:
+                self.assertTrue(0 <= score_pair(x, y)[0] <= 1.0)
+
+    def test_find_stores_candidates_once(self):
+        self.assertEqual(find_duplicates()['candidatos'], 3)
+        DuplicateCandidate.objects.update(status=DuplicateCandidate.DESCARTADO)
+        find_duplicates()
+        self.assertEqual(DuplicateCandidate.objects.filter(status=DuplicateCandidate.PENDENTE).count(), 0)
+
+    def test_merge_keeps_oldest_and_notes(self):
+        find_duplicates()
+        merged = merge_candidates(DuplicateCandidate.objects.all())
+        self.assertEqual(merged, 2)
+        self.assertEqual(list(Agenda.objects.order_by('id')), [self.joao, self.maria])
+        self.joao.refresh_from_db()
+        self.assertEqual(self.joao.observacao, 'Cliente antigo\nPrefere WhatsApp')
+        self.assertFalse(DuplicateCandidate.objects.exists())
+
+
+class ReviewDuplicatesViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.a = Agenda.objects.create(
+            owner=self.user, nome_completo='John Doe', telefone='(19) 99999-8888', email='john@example.com'
+        )
+        self.b = Agenda.objects.create(
+            owner=self.user, nome_completo='John Doe', telefone='19999998888', email='john@example.com'
+        )
+        find_duplicates()
+        self.candidate = DuplicateCandidate.objects.get()
+
+    def test_list(self):
+        response = self.client.get(reverse('review_duplicates'))
+        self.assertContains(response, 'John Doe', count=2)
+        self.assertContains(response, 'email, telefone, nome')
+
+    def test_other_owner_candidates_are_hidden(self):
+        User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='testpass123')
+        self.client.login(username='outro', password='testpass123')
+        response = self.client.get(reverse('review_duplicates'))
+        self.assertNotContains(response, 'John Doe')
+        self.client.post(reverse('review_duplicates'), {'candidatos': [self.candidate.id], 'acao': 'mesclar'})
+        self.assertEqual(Agenda.objects.count(), 2)
+
+    def test_dismiss(self):
+        self.client.post(reverse('review_duplicates'), {'candidatos': [self.candidate.id], 'acao': 'descartar'})
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.status, DuplicateCandidate.DESCARTADO)
+        self.assertEqual(Agenda.objects.count(), 2)
+
+    def test_junk_ids_are_ignored(self):
+        response = self.client.post(reverse('review_duplicates'), {
+            'candidatos': ['²', 'x', '-1', str(2 ** 64), self.candidate.id], 'acao': 'descartar',
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.status, DuplicateCandidate.DESCARTADO)
+
+    def test_merge(self):
+        response = self.client.post(
+            reverse('review_duplicates'), {'candidatos': [self.candidate.id, 'x'], 'acao': 'mesclar'}
+        )
+        self.assertRedirects(response, reverse('review_duplicates'))
+        self.assertEqual(list(Agenda.objects.all()), [self.a])
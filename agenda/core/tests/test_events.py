@@ -0,0 +1,201 @@
+import asyncio
+import threading
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.urls import reverse
+from http import HTTPStatus
+from core import events
+from core.events import RESET, Broker, ChangeLogBackend, format_event, missed_events, stream
+from core.models import Agenda, ContactChange
+
+
+def create_contact(owner, nome='John Doe'):
+    return Agenda.objects.create(owner=owner, nome_completo=nome, telefone='(19) 99999-8888', email='john@example.com')
+
+
+class BrokerTest(TestCase):
+    def setUp(self):
+        self.broker = Broker()
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event({'op': 'delete', 'id': 3, 'seq': 9}),
+            'id: 9\nevent: contact\ndata: {"op":"delete","id":3,"seq":9}\n\n',
+        )
+        self.assertEqual(format_event(RESET), 'event: reset\ndata: {"op":"reset"}\n\n')
+
+    async def test_publish_from_another_thread(self):
+        subscription = self.broker.subscribe(1)
+        other = self.broker.subscribe(2)
+        thread = threading.Thread(target=self.broker.publish, args=(1, {'op': 'delete', 'id': 5}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await asyncio.wait_for(subscription.get(), 1), {'op': 'delete', 'id': 5})
+        self.assertTrue(other.queue.empty())
+
+    async def test_slow_client_gets_reset(self):
+        subscription = self.broker.subscribe(1, maxsize=2)
+        for i in range(5):
+            self.broker.publish(1, {'op': 'delete', 'id': i})
+        await asyncio.sleep(0)
+        self.assertIs(await subscription.get(), RESET)
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_stream_unsubscribes_when_closed(self):
+        subscription = self.broker.subscribe(1)
+        body = stream(subscription)
+        self.assertEqual(await anext(body), 'retry: 5000\n\n')
+        self.assertTrue(self.broker.has_subscribers(1))
+        await body.aclose()
+        self.assertFalse(self.broker.has_subscribers())
+
+    @override_settings(AGENDA_EVENTS_KEEPALIVE=0.01)
+    async def test_idle_stream_sends_keepalive(self):
+        body = stream(self.broker.subscribe(1))
+        await anext(body)
+        self.assertEqual(await anext(body), ': keepalive\n\n')
+        await body.aclose()
+
+
+class ChangeLogBackendTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+        self.other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='x')
+        self.broker = Broker()
+        self.backend = ChangeLogBackend(self.broker)
+
+    async def test_poll_publishes_changes_of_subscribed_owners(self):
+        subscription = self.broker.subscribe(self.user.pk)
+        self.backend.last_seq = await sync_to_async(self.backend.current_seq)()
+        contact = await sync_to_async(create_contact)(self.user)
+        await sync_to_async(create_contact)(self.other)
+        self.assertEqual(await sync_to_async(self.backend.poll)(), 2)
+        event = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual((event['op'], event['id']), ('upsert', contact.id))
+        self.assertIn(f'data-contact-id="{contact.id}"', event['html'])
+        self.assertIn('John Doe', event['html'])
+        self.assertTrue(subscription.queue.empty())
+
+        contact_id = contact.id
+        await sync_to_async(contact.delete)()
+        await sync_to_async(self.backend.poll)()
+        event = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual((event['op'], event['id']), ('delete', contact_id))
+        self.assertEqual(event['seq'], self.backend.last_seq)
+
+    def test_poll_query_is_a_primary_key_range(self):
+        plan = ContactChange.objects.filter(seq__gt=10).order_by('seq')[:500].explain()
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotIn('SCAN', plan)
+
+    def test_missed_events(self):
+        contact = create_contact(self.user)
+        first = ContactChange.objects.get(contact_id=contact.id).seq
+        contact_id = contact.id
+        contact.delete()
+        create_contact(self.user, 'Ana')
+        self.assertEqual([e['op'] for e in missed_events(self.user.pk, 0)], ['delete', 'upsert'])
+        self.assertEqual(missed_events(self.user.pk, first)[0]['id'], contact_id)
+        self.assertEqual(missed_events(self.user.pk, 0, limit=1), [RESET])
+
+
+@override_settings(AGENDA_READ_REPLICAS=['replica1'])
+class ChangeLogReplicaTest(TransactionTestCase):
+    def test_change_log_is_read_from_primary(self):
+        # Não há banco "replica1" nos testes: uma leitura roteada para a
+        # réplica falharia.
+        user = User.objects.create_user(username='testuser', email='test@fatec.sp.gov.br', password='x')
+        contact = create_contact(user)
+        self.assertEqual([e['id'] for e in missed_events(user.pk, 0)], [contact.id])
+        backend = ChangeLogBackend(Broker())
+        self.assertEqual(backend.current_seq(), ContactChange.objects.get().seq)
+        backend.last_seq = 0
+        self.assertEqual(backend.poll(), 1)
+
+
+@override_settings(ROOT_URLCONF='core.async_urls', AGENDA_EVENTS_BACKEND='core.events.LocalBackend')
+class ContactEventsViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.url = reverse('contact_events')
+
+    async def test_requires_login(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    async def test_streams_saved_contacts(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        body = aiter(response.streaming_content)
+        self.assertEqual(await anext(body), b'retry: 5000\n\n')
+        contact = await sync_to_async(create_contact)(self.user)
+        chunk = (await asyncio.wait_for(anext(body), 1)).decode()
+        self.assertTrue(chunk.startswith('event: contact\n'))
+        self.assertIn(f'"id":{contact.id}', chunk)
+        await body.aclose()
+
+    async def test_reconnect_replays_missed_events(self):
+        contact = await sync_to_async(create_contact)(self.user)
+        seq = (await ContactChange.objects.aget(contact_id=contact.id)).seq
+        await sync_to_async(create_contact)(self.user, 'Ana')
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url, headers={'Last-Event-ID': str(seq)})
+        body = aiter(response.streaming_content)
+        await anext(body)
+        chunk = (await anext(body)).decode()
+        self.assertIn('Ana', chunk)
+        self.assertTrue(chunk.startswith(f'id: {seq + 1}\n'))
+        await body.aclose()
+
+    async def test_malformed_last_event_id_starts_fresh(self):
+        await sync_to_async(create_contact)(self.user)
+        await self.async_client.aforce_login(self.user)
+        for value in ('²', '-1', str(2 ** 64)):
+            response = await self.async_client.get(self.url, headers={'Last-Event-ID': value})
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            body = aiter(response.streaming_content)
+            self.assertEqual(await anext(body), b'retry: 5000\n\n')
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(anext(body), 0.1)
+            await body.aclose()
+
+    def test_wsgi_view_stops_reconnects(self):
+        with self.settings(ROOT_URLCONF='core.urls'):
+            client = Client()
+            client.login(username='testuser', password='testpass123')
+            response = client.get(reverse('contact_events'))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+
+
+class LiveListTemplateTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_list_page_wires_live_updates(self):
+        contact = create_contact(self.user)
+        response = self.client.get(reverse('list_contacts'))
+        self.assertContains(response, f'data-events-url="{reverse("contact_events")}"')
+        self.assertContains(response, f'data-contact-id="{contact.id}" data-ordem="{contact.nome_ordenacao}"')
+        self.assertContains(response, 'data-has-next="false"')
+        response = self.client.get(reverse('list_contacts'), {'q': 'john'})
+        self.assertNotContains(response, 'data-has-next')
+
+    def test_local_backend_is_quiet_without_subscribers(self):
+        backend = events.LocalBackend(Broker())
+        with self.assertNumQueries(0):
+            backend.contact_saved(Agenda(id=1, owner_id=self.user.pk, nome_completo='x'))
@@ -0,0 +1,82 @@
+import io
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.urls import reverse
+from http import HTTPStatus
+from core import vcard
+from core.importers import read_csv
+from core.models import Agenda
+
+
+class VCardSerializeTest(TestCase):
+    def test_roundtrip(self):
+        observacao = 'Linha 1\nLinha 2; com vírgula, e texto longo ' + 'ção' * 40
+        card = vcard.serialize('João da Silva', '(19) 99999-8888', 'joao@example.com', observacao)
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in card.split('\r\n')))
+        [(line, data)] = list(vcard.parse(io.StringIO(card)))
+        self.assertEqual(data, {
+            'nome_completo': 'João da Silva',
+            'telefone': '(19) 99999-8888',
+            'email': 'joao@example.com',
+            'observacao': observacao,
+        })
+
+
+class ExportContactsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('export_contacts')
+        Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com',
+            observacao='Vírgula, e "aspas"'
+        )
+        Agenda.objects.create(
+            owner=self.user,
+            nome_completo='Jane Smith',
+            telefone='(19) 99999-7777',
+            email='jane@example.com'
+        )
+
+    def test_export_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_export_csv_is_streamed(self):
+        response = self.client.get(self.url, {'formato': 'csv'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="contatos.csv"')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = [data for line, data in read_csv(io.StringIO(content, newline=''))]
+        self.assertEqual([r['nome_completo'] for r in rows], ['Jane Smith', 'John Doe'])
+        self.assertEqual(rows[1]['observacao'], 'Vírgula, e "aspas"')
+
+    def test_export_vcard(self):
+        response = self.client.get(self.url, {'formato': 'vcard'})
+        content = b''.join(response.streaming_content).decode('utf-8')
+        cards = [data for line, data in vcard.parse(io.StringIO(content))]
+        self.assertEqual([c['email'] for c in cards], ['jane@example.com', 'john@example.com'])
+
+    def test_export_applies_list_filters(self):
+        response = self.client.get(self.url, {'formato': 'csv', 'q': 'jane'})
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('Jane Smith', content)
+        self.assertNotIn('John Doe', content)
+
+    def test_invalid_format(self):
+        response = self.client.get(self.url, {'formato': 'pdf'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_list_links_to_export(self):
+        response = self.client.get(reverse('list_contacts'))
+        self.assertContains(response, reverse('export_contacts') + '?formato=csv')
@@ -0,0 +1,196 @@
+import io
+import tempfile
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from http import HTTPStatus
+from core.bulk import INSERT_FIELDS, BulkReport, ContactValidator, bulk_create_contacts, import_file
+from core.forms import AgendaForm
+from core.importers import InvalidImportFile
+from core.models import Agenda
+from core.search import search_contacts
+from core import vcard
+
+CSV = (
+    'nome_completo;telefone;email;observacao\n'
+    'João da Silva;(19) 99999-8888;joao@example.com;Cliente\n'
+    'Sem Telefone;;sem@example.com;\n'
+    'Maria Souza;11988887777;maria@example.com;"Linha 1\nLinha 2"\n'
+    'E-mail Ruim;11988887777;invalido;\n'
+).encode('utf-8')
+
+VCARD = (
+    'BEGIN:VCARD\r\n'
+    'VERSION:3.0\r\n'
+    'N:Silva;João;;;\r\n'
+    'FN:João da Silva\r\n'
+    'TEL;TYPE=CELL:(19) 99999-8888\r\n'
+    'EMAIL:joao@example.com\r\n'
+    'NOTE:Primeira linha\\nsegunda\\, com vírgula e uma linha muito longa que foi\r\n'
+    '  dobrada\r\n'
+    'END:VCARD\r\n'
+    'BEGIN:VCARD\r\n'
+    'VERSION:3.0\r\n'
+    'N:Souza;Maria;;;\r\n'
+    'TEL:123\r\n'
+    'EMAIL:maria@example.com\r\n'
+    'END:VCARD\r\n'
+)
+
+
+# Um campo maior que csv.field_size_limit() (128 KiB) faz o csv.reader falhar.
+BROKEN_CSV = (
+    'nome_completo;telefone;email\n'
+    'Ana;19999998888;ana@example.com\n'
+    f'"{"x" * 200_000}";19999997777;bia@example.com\n'
+).encode('utf-8')
+
+
+class VCardParseTest(TestCase):
+    def test_parse_cards(self):
+        cards = list(vcard.parse(io.StringIO(VCARD)))
+        self.assertEqual(len(cards), 2)
+        line, data = cards[0]
+        self.assertEqual(line, 1)
+        self.assertEqual(data['nome_completo'], 'João da Silva')
+        self.assertEqual(data['telefone'], '(19) 99999-8888')
+        self.assertEqual(data['observacao'], 'Primeira linha\nsegunda, com vírgula e uma linha muito longa que foi dobrada')
+
+    def test_falls_back_to_structured_name(self):
+        line, data = list(vcard.parse(io.StringIO(VCARD)))[1]
+        self.assertEqual(line, 10)
+        self.assertEqual(data['nome_completo'], 'Maria Souza')
+
+
+class ImportFileTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+
+    def test_import_csv(self):
+        report = import_file(io.BytesIO(CSV), 'csv', self.user, batch_size=1)
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.error_count, 2)
+        self.assertEqual([e['linha'] for e in report.errors], [3, 6])
+        self.assertIn('telefone', report.errors[0]['erros'])
+        self.assertIn('email', report.errors[1]['erros'])
+        maria = Agenda.objects.get(nome_completo='Maria Souza')
+        self.assertEqual(maria.observacao, 'Linha 1\nLinha 2')
+        self.assertEqual(maria.telefone_normalizado, '11988887777')
+        self.assertEqual(maria.owner, self.user)
+
+    def test_validator_matches_agenda_form(self):
+        validator = ContactValidator(self.user)
+        for data in [
+            {'nome_completo': 'Ana', 'telefone': '(19) 99999-8888', 'email': 'ana@example.com'},
+            {'nome_completo': '', 'telefone': '', 'email': ''},
+            {'nome_completo': 'A' * 151, 'telefone': '19a99998888', 'email': 'ana@'},
+            {'nome_completo': 'Ana', 'telefone': '123', 'email': 'ana@example.com', 'observacao': 'x'},
+            {'nome_completo': 'Ana', 'telefone': '(19) 99999-88889', 'email': ' ana@example.com '},
+        ]:
+            form = AgendaForm(data)
+            cleaned, errors = validator.clean(data)
+            if form.is_valid():
+                self.assertEqual(cleaned, form.cleaned_data)
+            else:
+                self.assertEqual(errors, {field: list(messages) for field, messages in form.errors.items()})
+
+    def test_imported_rows_are_complete(self):
+        import_file(io.BytesIO(CSV), 'csv', self.user)
+        joao = Agenda.objects.get(nome_completo='João da Silva')
+        self.assertEqual((joao.nome_busca, joao.ddd, joao.email_dominio), ('joao da silva', '19', 'example.com'))
+        self.assertIsNotNone(joao.criado_em)
+        self.assertEqual(joao.criado_em, joao.atualizado_em)
+        # Os triggers da busca valem também para o INSERT direto.
+        self.assertEqual(search_contacts('joao', 10, self.user.pk), [joao])
+
+    def test_batch_is_inserted_in_multirow_statements(self):
+        rows = [
+            (line, {'nome_completo': f'Pessoa {line}', 'telefone': f'1999999000{line}', 'email': f'p{line}@example.com'})
+            for line in range(5)
+        ]
+        # Dois contatos por INSERT: o lote de 5 vira 3 comandos.
+        with mock.patch('core.bulk.max_query_params', return_value=2 * len(INSERT_FIELDS) + 1), \
+                CaptureQueriesContext(connection) as queries:
+            report = bulk_create_contacts(rows, self.user, batch_size=5)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT INTO "core_agenda"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(report.created, 5)
+        self.assertEqual(len(search_contacts('pessoa', 10, self.user.pk)), 5)
+
+    def test_import_vcard_uses_form_rules(self):
+        report = import_file(io.BytesIO(VCARD.encode('utf-8')), 'vcard', self.user)
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors[0]['linha'], 10)
+        self.assertIn('telefone', report.errors[0]['erros'])
+
+    def test_error_report_is_bounded(self):
+        rows = [(line, {'nome_completo': 'X', 'telefone': '1', 'email': 'x'}) for line in range(5)]
+        report = bulk_create_contacts(rows, self.user, report=BulkReport(max_errors=2))
+        self.assertEqual(report.error_count, 5)
+        self.assertEqual(len(report.errors), 2)
+        self.assertTrue(report.errors_truncated)
+
+    def test_missing_columns(self):
+        with self.assertRaises(InvalidImportFile):
+            import_file(io.BytesIO(b'nome,fone\nA,1\n'), 'csv', self.user)
+
+
+    def test_unreadable_csv_is_invalid(self):
+        with self.assertRaisesMessage(InvalidImportFile, 'CSV inválido na linha 3'):
+            import_file(io.BytesIO(BROKEN_CSV), 'csv', self.user)
+
+    def test_command_reports_unreadable_csv(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as f:
+            f.write(BROKEN_CSV)
+            f.flush()
+            with self.assertRaisesMessage(CommandError, 'CSV inválido na linha 3'):
+                call_command('import_contacts', f.name, '--owner', 'testuser')
+
+
+class ImportContactsViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('import_contacts')
+
+    def test_import_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_get_returns_form(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTemplateUsed(response, 'import_contacts.html')
+
+    def test_post_csv_reports_results(self):
+        arquivo = SimpleUploadedFile('contatos.csv', CSV, content_type='text/csv')
+        response = self.client.post(self.url, {'arquivo': arquivo})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context['report'].created, 2)
+        self.assertContains(response, '2 registro(s) com erro.')
+        self.assertEqual(Agenda.objects.count(), 2)
+
+    def test_post_unreadable_csv(self):
+        arquivo = SimpleUploadedFile('contatos.csv', BROKEN_CSV, content_type='text/csv')
+        response = self.client.post(self.url, {'arquivo': arquivo})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('CSV inválido na linha 3', response.context['form'].errors['arquivo'][0])
+
+    def test_post_unsupported_format(self):
+        arquivo = SimpleUploadedFile('contatos.xlsx', b'PK', content_type='application/octet-stream')
+        response = self.client.post(self.url, {'arquivo': arquivo})
+        self.assertIn('arquivo', response.context['form'].errors)
+        self.assertIsNone(response.context['report'])
@@ -0,0 +1,337 @@
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+from core import bulk, jobs
+from core.jobs import JobFailed, claim, enqueue, requeue_stale, run, run_pending, work
+from core.models import Agenda, DuplicateCandidate, Job
+
+CSV = (
+    'nome_completo;telefone;email;observacao\n'
+    'João da Silva;(19) 99999-8888;joao@example.com;Cliente\n'
+    'Maria Souza;11988887777;maria@example.com;\n'
+    'E-mail Ruim;11988887777;invalido;\n'
+).encode('utf-8')
+
+# Campo maior que csv.field_size_limit(): o csv.reader falha na linha 3.
+BROKEN_CSV = f'nome_completo;telefone;email\nAna;1;a@x.com\n"{"x" * 200_000}";1;b@x.com\n'.encode('utf-8')
+
+CALLS = []
+
+
+@jobs.handler('test_flaky')
+def flaky(job, progress):
+    CALLS.append(job.tentativas)
+    progress(1, 2)
+    if job.tentativas < job.params.get('ok_on', 99):
+        raise RuntimeError('falha temporária')
+    return {'ok': True}
+
+
+@jobs.handler('test_invalid')
+def invalid(job, progress):
+    raise JobFailed('não adianta repetir')
+
+
+@jobs.handler('test_slow')
+def slow(job, progress):
+    started = time.monotonic()
+    time.sleep(0.2)
+    CALLS.append((started, time.monotonic()))
+    return {}
+
+
+@jobs.handler('test_silent')
+def silent(job, progress):
+    # Passa de AGENDA_JOBS_STALE_AFTER sem chamar progress.
+    time.sleep(0.3)
+    CALLS.append(jobs.requeue_stale())
+    return {}
+
+
+class JobsDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.jobs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.jobs_dir, ignore_errors=True)
+        override = override_settings(AGENDA_JOBS_DIR=self.jobs_dir, AGENDA_JOBS_RETRY_DELAY=30)
+        override.enable()
+        self.addCleanup(override.disable)
+        CALLS.clear()
+
+
+class JobQueueTest(JobsDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+
+    def test_claim_is_exclusive(self):
+        job = enqueue('test_flaky')
+        self.assertEqual(claim('w1').id, job.id)
+        self.assertIsNone(claim('w2'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.tentativas), (Job.EXECUTANDO, 'w1', 1))
+
+    def test_claim_respects_delay_and_order(self):
+        later = enqueue('test_flaky')
+        Job.objects.filter(id=later.id).update(executar_apos=timezone.now() + timedelta(minutes=5))
+        first, second = enqueue('test_flaky'), enqueue('test_flaky')
+        self.assertEqual([claim('w').id, claim('w').id, claim('w')], [first.id, second.id, None])
+
+    def test_queue_query_uses_index(self):
+        plan = Job.objects.filter(status=Job.PENDENTE, executar_apos__lte=timezone.now()) \
+            .order_by('executar_apos', 'id').explain()
+        self.assertIn('job_fila_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_unknown_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('nao_existe')
+
+    def test_retry_with_backoff_then_success(self):
+        job = enqueue('test_flaky', params={'ok_on': 2})
+        before = timezone.now()
+        with self.assertLogs('core.jobs', 'ERROR'):
+            run(claim('w'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.erro), (Job.PENDENTE, 'falha temporária'))
+        self.assertGreaterEqual(job.executar_apos, before + timedelta(seconds=30))
+        # Adiada: ainda não pode ser reservada.
+        self.assertIsNone(claim('w'))
+        Job.objects.filter(id=job.id).update(executar_apos=timezone.now())
+        run(claim('w'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.resultado, job.erro, job.progresso), (Job.CONCLUIDO, {'ok': True}, '', 2))
+        self.assertEqual(CALLS, [1, 2])
+
+    def test_gives_up_after_max_attempts(self):
+        job = enqueue('test_flaky', max_tentativas=2)
+        for _ in range(2):
+            Job.objects.filter(id=job.id).update(executar_apos=timezone.now())
+            with self.assertLogs('core.jobs', 'ERROR'):
+                run(claim('w'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.tentativas), (Job.FALHOU, 2))
+        self.assertIsNotNone(job.concluido_em)
+
+    def test_permanent_error_is_not_retried(self):
+        job = enqueue('test_invalid')
+        with self.assertLogs('core.jobs', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.erro, job.tentativas), (Job.FALHOU, 'não adianta repetir', 1))
+
+    def test_stale_jobs_are_requeued(self):
+        job = enqueue('test_flaky')
+        claim('morto')
+        long_ago = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(id=job.id).update(atualizado_em=long_ago)
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (Job.PENDENTE, ''))
+        claim('w')
+        Job.objects.filter(id=job.id).update(atualizado_em=long_ago, max_tentativas=2)
+        requeue_stale()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FALHOU)
+
+    def test_import_job(self):
+        job = enqueue('import_contacts', self.user, {'formato': 'csv'}, ContentFile(CSV, name='contatos.csv'))
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.CONCLUIDO)
+        self.assertEqual((job.resultado['criados'], job.resultado['com_erro'], job.progresso), (2, 1, 3))
+        self.assertEqual(Agenda.objects.filter(owner=self.user).count(), 2)
+        # O arquivo enviado é apagado quando a tarefa termina.
+        self.assertFalse(job.arquivo)
+
+    def test_unreadable_csv_import_is_not_retried(self):
+        job = enqueue('import_contacts', self.user, {'formato': 'csv'}, ContentFile(BROKEN_CSV, name='contatos.csv'))
+        with self.assertLogs('core.jobs', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.tentativas), (Job.FALHOU, 1))
+        self.assertIn('CSV inválido na linha 3', job.erro)
+
+    @override_settings(AGENDA_IMPORT_BATCH_SIZE=1)
+    def test_import_retry_resumes_after_committed_batches(self):
+        job = enqueue('import_contacts', self.user, {'formato': 'csv'}, ContentFile(CSV, name='contatos.csv'))
+        insert = bulk._insert_contacts
+        calls = []
+
+        def fail_on_second_batch(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('disco cheio')
+            insert(*args)
+
+        with mock.patch.object(bulk, '_insert_contacts', fail_on_second_batch), self.assertLogs('core.jobs', 'ERROR'):
+            run(claim('w'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.params['retomar']['linha']), (Job.PENDENTE, 2))
+        self.assertEqual(Agenda.objects.filter(owner=self.user).count(), 1)
+
+        Job.objects.filter(id=job.id).update(executar_apos=timezone.now())
+        run(claim('w'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.CONCLUIDO)
+        self.assertEqual((job.resultado['criados'], job.resultado['com_erro']), (2, 1))
+        self.assertEqual(
+            sorted(Agenda.objects.filter(owner=self.user).values_list('nome_completo', flat=True)),
+            ['João da Silva', 'Maria Souza'],
+        )
+
+    def test_export_job(self):
+        Agenda.objects.create(owner=self.user, nome_completo='Zé', telefone='19999998888', email='ze@example.com')
+        Agenda.objects.create(owner=self.user, nome_completo='Ana', telefone='19999997777', email='ana@example.com')
+        job = enqueue('export_contacts', self.user, {'formato': 'csv', 'q': ''})
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.resultado, job.progresso, job.total), (Job.CONCLUIDO, {'contatos': 2}, 2, 2))
+        with job.arquivo_resultado.open('rb') as f:
+            lines = f.read().decode('utf-8').splitlines()
+        self.assertEqual([line.split(',')[0] for line in lines], ['nome_completo', 'Ana', 'Zé'])
+
+    def test_find_duplicates_job_is_owner_scoped(self):
+        other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='x')
+        for owner in (self.user, self.user, other):
+            Agenda.objects.create(owner=owner, nome_completo='João Silva', telefone='19999998888', email='j@x.com')
+        enqueue('find_duplicates', other)
+        run_pending()
+        self.assertFalse(DuplicateCandidate.objects.exists())
+        enqueue('find_duplicates', self.user)
+        run_pending()
+        self.assertEqual(DuplicateCandidate.objects.count(), 1)
+
+    def test_rebuild_search_index_job(self):
+        job = enqueue('rebuild_search_index')
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.CONCLUIDO)
+
+
+@override_settings(AGENDA_JOBS_IMPORT_MIN_BYTES=100, AGENDA_JOBS_EXPORT_MIN_ROWS=1)
+class JobViewsTest(JobsDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_large_import_is_enqueued(self):
+        response = self.client.post(reverse('import_contacts'), {
+            'arquivo': SimpleUploadedFile('contatos.csv', CSV, content_type='text/csv'),
+        })
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('job_detail', args=[job.id]))
+        self.assertEqual((job.tipo, job.owner, job.params), ('import_contacts', self.user, {'formato': 'csv'}))
+        self.assertFalse(Agenda.objects.exists())
+        run_pending()
+        self.assertEqual(Agenda.objects.filter(owner=self.user).count(), 2)
+
+    def test_small_import_runs_in_request(self):
+        response = self.client.post(reverse('import_contacts'), {
+            'arquivo': SimpleUploadedFile('contatos.csv', CSV[:60], content_type='text/csv'),
+        })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(Job.objects.exists())
+
+    def test_large_export_is_enqueued_and_downloaded(self):
+        for nome in ('Ana', 'Bia', 'Bia Lima'):
+            Agenda.objects.create(owner=self.user, nome_completo=nome, telefone='19999998888', email='a@x.com')
+        response = self.client.get(reverse('export_contacts'), {'formato': 'vcard', 'q': 'bia'})
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('job_detail', args=[job.id]))
+        self.assertEqual(job.params, {'formato': 'vcard', 'q': 'bia'})
+        run_pending()
+        status = self.client.get(reverse('job_status', args=[job.id])).json()
+        self.assertEqual(status['status'], Job.CONCLUIDO)
+        self.assertEqual(status['download_url'], reverse('download_job_result', args=[job.id]))
+        response = self.client.get(status['download_url'])
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('FN:Bia', content)
+        self.assertNotIn('FN:Ana', content)
+
+    def test_status_is_not_cached(self):
+        job = enqueue('test_flaky', self.user)
+        response = self.client.get(reverse('job_status', args=[job.id]))
+        self.assertEqual(response.json()['status'], Job.PENDENTE)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_job_page_polls_status(self):
+        job = enqueue('test_flaky', self.user)
+        response = self.client.get(reverse('job_detail', args=[job.id]))
+        self.assertContains(response, f'data-status-url="{reverse("job_status", args=[job.id])}"')
+
+    def test_jobs_are_owner_scoped(self):
+        other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='x')
+        job = enqueue('test_flaky', other)
+        for name in ('job_detail', 'job_status', 'download_job_result'):
+            response = self.client.get(reverse(name, args=[job.id]))
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class WorkerTest(JobsDirMixin, TransactionTestCase):
+    def serialize(self, *targets):
+        # O banco de teste é SQLite em memória com cache compartilhado: duas
+        # threads escrevendo ao mesmo tempo falham na hora ("table is locked"),
+        # sem o busy_timeout do banco em arquivo. Só os pontos que acessam o
+        # banco são serializados; as tarefas em si continuam em paralelo.
+        lock = threading.RLock()
+        for owner, name in targets:
+            def locked(*args, original=getattr(owner, name), **kwargs):
+                with lock:
+                    return original(*args, **kwargs)
+            patcher = mock.patch.object(owner, name, locked)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def serialize_pool(self):
+        self.serialize((jobs, 'claim'), (jobs, 'requeue_stale'), (jobs.Progress, '__call__'), (Job, 'save'))
+
+    def test_pool_runs_jobs_concurrently_until_queue_is_empty(self):
+        self.serialize_pool()
+        created = [enqueue('test_slow') for _ in range(4)]
+        self.assertEqual(work(worker='w', concurrency=2, poll_interval=0.01, burst=True), 4)
+        self.assertEqual(
+            set(Job.objects.values_list('status', flat=True)), {Job.CONCLUIDO},
+        )
+        self.assertEqual(len(CALLS), len(created))
+        # Execuções sobrepostas: o pool rodou tarefas ao mesmo tempo.
+        periods = sorted(CALLS)
+        self.assertTrue(any(later[0] < earlier[1] for earlier, later in zip(periods, periods[1:])))
+
+    @override_settings(AGENDA_JOBS_STALE_AFTER=0.2)
+    def test_heartbeat_keeps_silent_job_claimed(self):
+        self.serialize((jobs.Heartbeat, 'beat'), (jobs, 'requeue_stale'))
+        job = enqueue('test_silent')
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.tentativas), (Job.CONCLUIDO, 1))
+        self.assertEqual(CALLS, [0])
+
+    def test_command_respects_max_jobs(self):
+        self.serialize_pool()
+        for _ in range(3):
+            enqueue('test_flaky', params={'ok_on': 1})
+        out = StringIO()
+        call_command('run_jobs', '--burst', '--max-jobs', '2', '--poll-interval', '0.01', stdout=out)
+        self.assertIn('2 tarefa(s) executada(s)', out.getvalue())
+        self.assertEqual(Job.objects.filter(status=Job.PENDENTE).count(), 1)
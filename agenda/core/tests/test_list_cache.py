@@ -0,0 +1,90 @@
+import io
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from core.bulk import import_file
+from core.cache import contacts_version
+from core.models import Agenda
+
+
+class ContactListCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('list_contacts')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def test_repeated_views_skip_contact_queries(self):
+        self.client.get(self.url)
+        # Só sessão e usuário: nenhuma consulta a contatos, nenhum template da tabela.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'John Doe')
+        self.assertTemplateNotUsed(response, '_contact_list.html')
+
+    def test_each_page_and_filter_has_its_own_entry(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {'q': 'ninguem'})
+        self.assertTemplateUsed(response, '_contact_list.html')
+        self.assertNotContains(response, 'John Doe')
+
+    def test_save_and_delete_bump_version(self):
+        version = contacts_version(self.user.pk)
+        self.contact.save()
+        self.assertGreater(contacts_version(self.user.pk), version)
+        version = contacts_version(self.user.pk)
+        self.contact.delete()
+        self.assertGreater(contacts_version(self.user.pk), version)
+
+    def test_other_owner_changes_keep_cache(self):
+        other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='testpass123')
+        version = contacts_version(self.user.pk)
+        Agenda.objects.create(owner=other, nome_completo='Jane Smith', telefone='19999997777', email='jane@example.com')
+        self.assertEqual(contacts_version(self.user.pk), version)
+
+    def test_create_view_invalidates(self):
+        self.client.get(self.url)
+        self.client.post(reverse('create_contact'), {
+            'nome_completo': 'Jane Smith',
+            'telefone': '(19) 99999-7777',
+            'email': 'jane@example.com',
+        })
+        self.assertContains(self.client.get(self.url), 'Jane Smith')
+
+    def test_update_view_invalidates(self):
+        self.client.get(self.url)
+        self.client.post(reverse('update_contact', args=[self.contact.id]), {
+            'nome_completo': 'John Updated',
+            'telefone': '(19) 99999-8888',
+            'email': 'john@example.com',
+        })
+        self.assertContains(self.client.get(self.url), 'John Updated')
+
+    def test_delete_view_invalidates(self):
+        self.client.get(self.url)
+        self.client.post(reverse('delete_contact', args=[self.contact.id]))
+        self.assertNotContains(self.client.get(self.url), 'John Doe')
+
+    def test_bulk_import_invalidates(self):
+        self.client.get(self.url)
+        import_file(io.BytesIO(b'nome_completo,telefone,email\nJane Smith,19999997777,jane@example.com\n'),
+                    'csv', self.user)
+        self.assertContains(self.client.get(self.url), 'Jane Smith')
+
+    def test_cached_fragment_has_no_csrf_token(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'csrfmiddlewaretoken', count=1)
+        self.assertContains(response, 'form="delete-contact-form"')
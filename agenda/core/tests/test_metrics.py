@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core import metrics
+from core.models import Agenda
+
+
+@override_settings(AGENDA_METRICS_TOKEN='segredo')
+class MetricsTest(TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        Agenda.objects.create(
+            owner=self.user, nome_completo='John Doe', telefone='(19) 99999-8888', email='john@example.com'
+        )
+
+    def scrape(self):
+        return self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer segredo'}).content.decode()
+
+    def test_requests_by_view_and_status(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.client.get(reverse('list_contacts'))
+        self.client.get(reverse('contact_detail', args=[999]))
+        body = self.scrape()
+        self.assertIn('agenda_http_requests_total{view="list_contacts",method="GET"} 1', body)
+        self.assertIn('agenda_http_responses_total{view="contact_detail",status="404"} 1', body)
+        self.assertIn('agenda_http_request_duration_seconds_count{view="list_contacts"} 1', body)
+        self.assertIn('agenda_http_request_duration_seconds_bucket{view="list_contacts",le="+Inf"} 1', body)
+        # Sessão, usuário e página de contatos.
+        self.assertIn('agenda_http_request_queries_sum{view="list_contacts"} 3.0', body)
+
+    def test_login_counters(self):
+        self.client.post(reverse('login'), {'email': 'test@fatec.sp.gov.br', 'password': 'errada'})
+        self.client.post(reverse('login'), {'email': 'test@fatec.sp.gov.br', 'password': 'testpass123'})
+        body = self.scrape()
+        self.assertIn('agenda_logins_total{result="failure"} 1', body)
+        self.assertIn('agenda_logins_total{result="success"} 1', body)
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics.observe('agenda_http_request_duration_seconds', (('view', 'x'),), 0.02)
+        metrics.observe('agenda_http_request_duration_seconds', (('view', 'x'),), 3)
+        body = metrics.render()
+        self.assertIn('agenda_http_request_duration_seconds_bucket{view="x",le="0.01"} 0', body)
+        self.assertIn('agenda_http_request_duration_seconds_bucket{view="x",le="0.025"} 1', body)
+        self.assertIn('agenda_http_request_duration_seconds_bucket{view="x",le="5.0"} 2', body)
+        self.assertIn('agenda_http_request_duration_seconds_sum{view="x"} 3.02', body)
+
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer errado'})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer segredo'})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(AGENDA_METRICS_TOKEN=None)
+    def test_closed_by_default(self):
+        # Sem token, sem DEBUG (desligado nos testes) e sem opt-in: fechado.
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        self.client.login(username='testuser', password='testpass123')
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+        with override_settings(AGENDA_METRICS_PUBLIC=True):
+            self.client.logout()
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    def test_staff_can_read(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.login(username='testuser', password='testpass123')
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    def test_merges_other_processes(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(AGENDA_METRICS_DIR=directory):
+            metrics.inc('agenda_logins_total', (('result', 'success'),))
+            metrics.flush(force=True)
+            with open(os.path.join(directory, '1-0.json'), 'w') as fileobj:
+                json.dump({
+                    'counters': [['agenda_logins_total', [['result', 'success']], 2]],
+                    'histograms': [],
+                }, fileobj)
+            body = metrics.render()
+        self.assertIn('agenda_logins_total{result="success"} 3', body)
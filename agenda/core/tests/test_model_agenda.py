@@ -1,5 +1,13 @@
+import ast
+from importlib import import_module
+from pathlib import Path
+from types import SimpleNamespace
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
 from core.models import Agenda
+from core.normalization import sort_key
 
 class AgendaModelTest(TestCase):
     def setUp(self):
@@ -18,3 +26,66 @@ class AgendaModelTest(TestCase):
 
     def test_str_retorna_nome_e_email(self):
         self.assertEqual(str(self.agenda), "João da Silva - joao.silva@example.com")
+
+    def test_chave_de_ordenacao_atualizada_ao_salvar(self):
+        self.agenda.nome_completo = "Ágata Souza"
+        self.agenda.save(update_fields=["nome_completo"])
+        self.agenda.refresh_from_db()
+        self.assertEqual(self.agenda.nome_ordenacao, sort_key("Ágata Souza"))
+
+
+class SortKeyTest(TestCase):
+    def test_ordem_alfabetica_em_portugues(self):
+        nomes = ["Zuleica", "élcio", "Ana Maria", "Ágata", "Ana", "Elcio", "anabela", "Álvaro", "Çarina", "Carlos"]
+        self.assertEqual(sorted(nomes, key=sort_key), [
+            "Ágata", "Álvaro", "Ana", "Ana Maria", "anabela", "Çarina", "Carlos", "Elcio", "élcio", "Zuleica",
+        ])
+
+
+class AgendaOwnerTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@fatec.sp.gov.br', password='x')
+        self.user = User.objects.create_user(username='testuser', email='test@fatec.sp.gov.br', password='x')
+
+    def test_migration_assigns_existing_contacts(self):
+        sem_dono = Agenda.objects.create(nome_completo='Antigo', telefone='19999998888', email='a@example.com')
+        do_usuario = Agenda.objects.create(
+            owner=self.user, nome_completo='Novo', telefone='19999997777', email='n@example.com'
+        )
+        migration = import_module('core.migrations.0010_assign_agenda_owner')
+        migration.assign_owner(apps, SimpleNamespace(connection=connection))
+        sem_dono.refresh_from_db()
+        do_usuario.refresh_from_db()
+        self.assertEqual(sem_dono.owner, self.admin)
+        self.assertEqual(do_usuario.owner, self.user)
+
+    def test_owner_list_uses_composite_index(self):
+        plan = self.user.contatos.order_by('nome_ordenacao', 'id').explain()
+        self.assertIn('agenda_owner_ordenacao_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class MigrationsTest(TestCase):
+    def test_migrations_do_not_import_app_code(self):
+        # Uma migração aplicada não pode mudar de comportamento quando o app
+        # muda: as regras que ela usa ficam copiadas em core.migrations.
+        directory = Path(import_module('core.migrations').__file__).parent
+        for path in sorted(directory.glob('0*.py')):
+            modules = set()
+            for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'))):
+                if isinstance(node, ast.ImportFrom):
+                    modules.add(node.module)
+                elif isinstance(node, ast.Import):
+                    modules.update(alias.name for alias in node.names)
+            for module in modules:
+                # core.models só aparece como referência serializada (storage).
+                if module.split('.')[0] == 'core' and module != 'core.models':
+                    self.assertTrue(module.startswith('core.migrations.'), f'{path.name} importa {module}')
+
+    def test_phone_backfill(self):
+        contact = Agenda.objects.create(nome_completo='Ana', telefone='+55 (19) 99999-8888', email='a@example.com')
+        Agenda.objects.filter(pk=contact.pk).update(telefone_normalizado='')
+        migration = import_module('core.migrations.0005_backfill_telefone_normalizado')
+        migration.backfill_telefone_normalizado(apps, SimpleNamespace(connection=connection))
+        contact.refresh_from_db()
+        self.assertEqual(contact.telefone_normalizado, '19999998888')
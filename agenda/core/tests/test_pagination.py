@@ -0,0 +1,109 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.urls import reverse
+from http import HTTPStatus
+from core.models import Agenda
+from core.pagination import KeysetPaginator, InvalidCursor, decode_cursor, encode_cursor
+
+
+class CursorTest(TestCase):
+    def test_roundtrip(self):
+        cursor = encode_cursor('João da Silva', 42)
+        self.assertEqual(decode_cursor(cursor), ('João da Silva', 42))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('nao-e-um-cursor')
+
+    def test_value_and_pk_types_are_checked(self):
+        for value, pk in [(None, 1), (['x'], 1), ('Ana', True), ('Ana', '1')]:
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(encode_cursor(value, pk))
+        self.assertEqual(decode_cursor(encode_cursor(7, 3), value_type=int), (7, 3))
+
+
+class KeysetPaginatorTest(TestCase):
+    def setUp(self):
+        # Nomes repetidos garantem que o desempate por id é respeitado.
+        for nome in ['Ana', 'Bruno', 'Bruno', 'Carla', 'Daniel']:
+            Agenda.objects.create(nome_completo=nome, telefone='19999998888', email='a@example.com')
+        self.paginator = KeysetPaginator(Agenda.objects.all(), 'nome_completo', 2)
+        self.expected = list(Agenda.objects.order_by('nome_completo', 'id'))
+
+    def test_walks_forward_and_backward(self):
+        first = self.paginator.page()
+        self.assertEqual(first.object_list, self.expected[:2])
+        self.assertFalse(first.has_previous)
+
+        second = self.paginator.page(after=first.next_cursor)
+        self.assertEqual(second.object_list, self.expected[2:4])
+
+        last = self.paginator.page(after=second.next_cursor)
+        self.assertEqual(last.object_list, self.expected[4:])
+        self.assertFalse(last.has_next)
+
+        back = self.paginator.page(before=last.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[2:4])
+        self.assertTrue(back.has_next)
+
+        start = self.paginator.page(before=back.previous_cursor)
+        self.assertEqual(start.object_list, self.expected[:2])
+        self.assertFalse(start.has_previous)
+
+    def test_page_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            self.paginator.page(after=encode_cursor('Bruno', self.expected[1].id))
+
+
+class ListContactsPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('list_contacts')
+        for i in range(5):
+            Agenda.objects.create(
+                owner=self.user, nome_completo=f'Contato {i}', telefone='19999998888', email='c@example.com'
+            )
+
+    def test_page_size_parameter(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.context['contacts']), 2)
+        self.assertTrue(response.context['page'].has_next)
+        self.assertContains(response, 'page_size=2')
+
+    def test_next_link_returns_next_page(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        page = response.context['page']
+        response = self.client.get(self.url, {'page_size': 2, 'after': page.next_cursor})
+        nomes = [c.nome_completo for c in response.context['contacts']]
+        self.assertEqual(nomes, ['Contato 2', 'Contato 3'])
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(self.url, {'page_size': 2, 'after': '!!!'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context['contacts'][0].nome_completo, 'Contato 0')
+        for param in ('after', 'before'):
+            response = self.client.get(self.url, {'page_size': 2, param: encode_cursor(None, 1)})
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(response.context['contacts'][0].nome_completo, 'Contato 0')
+
+    def test_accented_names_in_alphabetical_order_across_pages(self):
+        for nome in ['Zuleica', 'Ágata', 'élcio', 'Bruno']:
+            Agenda.objects.create(owner=self.user, nome_completo=nome, telefone='19999998888', email='c@example.com')
+        nomes, params = [], {'page_size': 3}
+        while True:
+            response = self.client.get(self.url, params)
+            page = response.context['page']
+            nomes += [c.nome_completo for c in response.context['contacts']]
+            if not page.has_next:
+                break
+            params['after'] = page.next_cursor
+        self.assertEqual(nomes, [
+            'Ágata', 'Bruno', 'Contato 0', 'Contato 1', 'Contato 2', 'Contato 3', 'Contato 4', 'élcio', 'Zuleica',
+        ])
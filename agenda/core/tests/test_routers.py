@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import tempfile
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from core.middleware import ReplicaPinningMiddleware
+from core.models import Agenda, ContactChange, Job
+from core.routers import ReplicaRouter, pin_to_primary, pinned
+from core.sqlite import copy_database
+
+
+@override_settings(AGENDA_READ_REPLICAS=['replica1'])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Agenda), 'replica1')
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Agenda), 'default')
+
+    def test_pinned_reads_go_to_primary(self):
+        with pin_to_primary():
+            self.assertIsNone(self.router.db_for_read(Agenda))
+
+    def test_other_apps_stay_on_primary(self):
+        self.assertIsNone(self.router.db_for_read(User))
+
+    def test_queue_and_change_log_stay_on_primary(self):
+        self.assertIsNone(self.router.db_for_read(Job))
+        self.assertIsNone(self.router.db_for_read(ContactChange))
+
+    def test_no_migrations_on_replicas(self):
+        self.assertFalse(self.router.allow_migrate('replica1', 'core'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core'))
+
+    @override_settings(AGENDA_READ_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertIsNone(self.router.db_for_read(Agenda))
+
+
+@override_settings(AGENDA_READ_REPLICAS=['replica1'], AGENDA_REPLICA_PIN_SECONDS=10)
+class ReplicaPinningMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+        def view(request):
+            self.seen.append(pinned.get())
+            return HttpResponse()
+
+        self.middleware = ReplicaPinningMiddleware(view)
+
+    def test_get_reads_replica(self):
+        response = self.middleware(self.factory.get('/contacts/'))
+        self.assertEqual(self.seen, [False])
+        self.assertNotIn(ReplicaPinningMiddleware.cookie_name, response.cookies)
+
+    def test_post_pins_and_sets_cookie(self):
+        response = self.middleware(self.factory.post('/contacts/create/'))
+        self.assertEqual(self.seen, [True])
+        cookie = response.cookies[ReplicaPinningMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 10)
+
+    def test_redirect_after_post_reads_primary(self):
+        request = self.factory.get('/contacts/')
+        request.COOKIES[ReplicaPinningMiddleware.cookie_name] = '1'
+        self.middleware(request)
+        self.assertEqual(self.seen, [True])
+        self.assertFalse(pinned.get())
+
+
+class CopyDatabaseTest(SimpleTestCase):
+    def test_backup_copies_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            conn = sqlite3.connect(source)
+            conn.execute('CREATE TABLE t (x)')
+            conn.execute('INSERT INTO t VALUES (1)')
+            conn.commit()
+            reader = sqlite3.connect(target)
+            copy_database(source, target)
+            # Conexões abertas na réplica enxergam a cópia nova.
+            self.assertEqual(reader.execute('SELECT x FROM t').fetchall(), [(1,)])
+            reader.close()
+            conn.close()
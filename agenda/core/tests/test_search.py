@@ -0,0 +1,130 @@
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.urls import reverse
+from http import HTTPStatus
+from core import search
+from core.models import Agenda
+from core.search import match_expression, search_contacts, filter_contacts
+
+
+class MatchExpressionTest(TestCase):
+    def test_quotes_each_token_as_prefix(self):
+        self.assertEqual(match_expression('joão silva'), '"joão"* "silva"*')
+
+    def test_neutralizes_fts_syntax(self):
+        self.assertEqual(match_expression('a" OR NEAR(*'), '"a"* "OR"* "NEAR"*')
+
+    def test_empty_query(self):
+        self.assertEqual(match_expression('  -- '), '')
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+        self.joao = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='João da Silva',
+            telefone='(19) 99999-8888',
+            email='joao@example.com',
+            observacao='Fornecedor de café'
+        )
+        self.maria = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='Maria Souza',
+            telefone='(11) 98888-7777',
+            email='maria@example.com',
+            observacao='Indicada pelo João'
+        )
+
+    def test_finds_by_name_ignoring_accents(self):
+        self.assertEqual(search_contacts('joao', 10, self.user.pk)[0], self.joao)
+
+    def test_ranks_name_matches_above_notes(self):
+        self.assertEqual(search_contacts('joão', 10, self.user.pk), [self.joao, self.maria])
+
+    def test_finds_by_email_phone_and_notes(self):
+        self.assertEqual(search_contacts('maria@example', 10, self.user.pk), [self.maria])
+        self.assertEqual(search_contacts('98888', 10, self.user.pk), [self.maria])
+        self.assertEqual(search_contacts('cafe', 10, self.user.pk), [self.joao])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.joao.nome_completo = 'Pedro Alves'
+        self.joao.save()
+        self.assertEqual(search_contacts('pedro', 10, self.user.pk), [self.joao])
+        self.maria.delete()
+        self.assertEqual(search_contacts('maria', 10, self.user.pk), [])
+
+    def test_filter_contacts_composes_with_querysets(self):
+        queryset = filter_contacts(self.user.contatos.order_by('nome_completo'), 'example')
+        self.assertEqual(list(queryset), [self.joao, self.maria])
+
+    def test_only_owner_contacts(self):
+        other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='testpass123')
+        Agenda.objects.create(owner=other, nome_completo='João Pereira', telefone='19988887777', email='jp@example.com')
+        self.assertEqual(search_contacts('joao', 10, self.user.pk)[0], self.joao)
+        self.assertEqual(len(search_contacts('pereira', 10, self.user.pk)), 0)
+        self.assertEqual(len(search_contacts('pereira', 10, other.pk)), 1)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO core_agenda_fts(core_agenda_fts) VALUES ('delete-all')")
+        self.assertEqual(search_contacts('maria', 10, self.user.pk), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search_contacts('maria', 10, self.user.pk), [self.maria])
+
+
+    def test_failed_rebuild_keeps_old_index(self):
+        # Falha logo depois de apagar a tabela antiga.
+        failing = mock.patch.object(search, 'rebuild', side_effect=RuntimeError('interrompido'))
+        with failing, self.assertRaises(RuntimeError):
+            call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search_contacts('maria', 10, self.user.pk), [self.maria])
+        Agenda.objects.create(owner=self.user, nome_completo='Ana', telefone='19977776666', email='ana@example.com')
+        self.assertEqual(len(search_contacts('ana', 10, self.user.pk)), 1)
+
+
+class SearchContactsViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('search_contacts')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def test_search_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url, {'q': 'john'})
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_search_renders_results(self):
+        response = self.client.get(self.url, {'q': 'john'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTemplateUsed(response, 'list_contacts.html')
+        self.assertEqual(response.context['contacts'], [self.contact])
+
+    def test_search_without_results(self):
+        response = self.client.get(self.url, {'q': 'ninguem'})
+        self.assertContains(response, 'Nenhum resultado para')
+
+    def test_empty_query_redirects_to_list(self):
+        response = self.client.get(self.url, {'q': ''})
+        self.assertRedirects(response, reverse('list_contacts'))
+
+    def test_list_has_search_box(self):
+        response = self.client.get(reverse('list_contacts'))
+        self.assertContains(response, 'name="q"')
@@ -0,0 +1,39 @@
+import os
+import tempfile
+from django.db import connection
+from django.test import TestCase, override_settings
+from core import sqlite
+from core.benchmarks import sqlite_throughput
+
+
+class SqlitePragmasTest(TestCase):
+    def test_statements(self):
+        self.assertEqual(
+            sqlite.pragma_statements({'journal_mode': 'WAL', 'cache_size': -2000}),
+            ['PRAGMA journal_mode = WAL', 'PRAGMA cache_size = -2000'],
+        )
+
+    def test_rejects_sql_in_values(self):
+        with self.assertRaises(ValueError):
+            sqlite.pragma_statements({'cache_size': '1; DROP TABLE core_agenda'})
+
+    @override_settings(AGENDA_SQLITE_PRAGMAS={'cache_size': -1234, 'busy_timeout': 1234})
+    def test_applied_on_connection(self):
+        sqlite.configure(connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1234)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 1234)
+
+    def test_max_query_params(self):
+        # O limite da conexão, não os 999 que o Django assume para o SQLite.
+        self.assertGreaterEqual(sqlite.max_query_params(connection), connection.features.max_query_params)
+
+    def test_throughput_benchmark(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            result = sqlite_throughput(path, {'journal_mode': 'WAL'}, persistent=True,
+                                       readers=2, writers=1, duration=0.2, rows=100)
+        self.assertGreater(result['reads_per_s'], 0)
+        self.assertGreater(result['writes_per_s'], 0)
@@ -0,0 +1,179 @@
+from datetime import timedelta
+from unittest import mock
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from http import HTTPStatus
+from core.bulk import delete_matching, update_matching
+from core.models import Agenda, ContactChange
+from core.signals import ensure_triggers
+from core.sync import changes_since, make_cursor, purge_tombstones
+
+
+class ChangeLogTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+        self.joao = Agenda.objects.create(
+            owner=self.user, nome_completo='João da Silva', telefone='19999998888', email='joao@example.com'
+        )
+        self.maria = Agenda.objects.create(
+            owner=self.user, nome_completo='Maria Souza', telefone='11988887777', email='maria@example.com'
+        )
+
+    def seq(self, contact):
+        return ContactChange.objects.get(contact_id=contact.id).seq
+
+    def test_every_write_gets_a_higher_sequence(self):
+        first, second = self.seq(self.joao), self.seq(self.maria)
+        self.assertLess(first, second)
+        self.joao.observacao = 'alterado'
+        self.joao.save()
+        self.assertGreater(self.seq(self.joao), second)
+        # Uma linha por contato, não uma por escrita.
+        self.assertEqual(ContactChange.objects.count(), 2)
+
+    def test_bulk_and_raw_writes_are_tracked(self):
+        last = self.seq(self.maria)
+        update_matching(Agenda.objects.filter(id=self.joao.id), observacao='x')
+        self.assertGreater(self.seq(self.joao), last)
+        Agenda.objects.bulk_create([
+            Agenda(owner=self.user, nome_completo='Ana', telefone='19999997777', email='ana@example.com'),
+        ])
+        delete_matching(Agenda.objects.filter(id=self.maria.id))
+        tombstone = ContactChange.objects.get(contact_id=self.maria.id)
+        self.assertTrue(tombstone.apagado)
+        self.assertEqual(tombstone.owner_id, self.user.pk)
+        self.assertEqual(ContactChange.objects.filter(apagado=False).count(), 2)
+
+    def test_changes_since_cursor(self):
+        changes, cursor, has_more = changes_since(self.user.pk, None, 10)
+        self.assertEqual([c['contact']['nome_completo'] for c in changes], ['João da Silva', 'Maria Souza'])
+        self.assertFalse(has_more)
+        after = changes[-1]['seq']
+        changes, _, _ = changes_since(self.user.pk, after, 10)
+        self.assertEqual(changes, [])
+
+        maria_id = self.maria.id
+        self.maria.delete()
+        self.joao.telefone = '19911112222'
+        self.joao.save()
+        changes, _, _ = changes_since(self.user.pk, after, 10)
+        self.assertEqual([(c['op'], c.get('id') or c['contact']['id']) for c in changes],
+                         [('delete', maria_id), ('upsert', self.joao.id)])
+
+    def test_initial_load_skips_tombstones_and_pages(self):
+        self.maria.delete()
+        Agenda.objects.create(owner=self.user, nome_completo='Ana', telefone='19999997777', email='a@x.com')
+        changes, _, has_more = changes_since(self.user.pk, None, 1)
+        self.assertEqual((len(changes), changes[0]['op'], has_more), (1, 'upsert', True))
+        # Depois da primeira página, exclusões posteriores ao cursor vêm junto.
+        rest, _, has_more = changes_since(self.user.pk, changes[0]['seq'], 10)
+        self.assertEqual([c['op'] for c in rest], ['delete', 'upsert'])
+        self.assertEqual(rest[1]['contact']['nome_completo'], 'Ana')
+        self.assertFalse(has_more)
+
+    def test_only_owner_changes(self):
+        other = User.objects.create_user(username='outro', email='outro@fatec.sp.gov.br', password='x')
+        self.assertEqual(changes_since(other.pk, None, 10)[0], [])
+
+    def test_delta_query_uses_index(self):
+        plan = ContactChange.objects.filter(owner_id=self.user.pk, seq__gt=0).order_by('seq')[:10].explain()
+        self.assertIn('change_owner_seq_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_purge_old_tombstones(self):
+        self.maria.delete()
+        self.assertEqual(purge_tombstones(days=30), 0)
+        self.assertEqual(purge_tombstones(days=30, now=timezone.now() + timedelta(days=31)), 1)
+        self.assertFalse(ContactChange.objects.filter(apagado=True).exists())
+
+    def test_triggers_follow_migrated_tables(self):
+        sender = apps.get_app_config('core')
+        with mock.patch('core.sync.install') as install:
+            ensure_triggers(sender, using='default')
+            install.assert_called_once()
+            # Migrado para antes da 0015: sem core_contactchange, sem triggers.
+            tables = [t for t in connection.introspection.table_names() if t != ContactChange._meta.db_table]
+            with mock.patch.object(connection.introspection, 'table_names', return_value=tables):
+                install.reset_mock()
+                ensure_triggers(sender, using='default')
+                install.assert_not_called()
+
+
+@override_settings(AGENDA_READ_REPLICAS=['replica1'])
+class ChangeFeedReplicaTest(TransactionTestCase):
+    def test_feed_is_read_from_primary(self):
+        # Não há banco "replica1" nos testes: uma leitura roteada para a
+        # réplica falharia.
+        user = User.objects.create_user(username='testuser', email='test@fatec.sp.gov.br', password='x')
+        contact = Agenda.objects.create(owner=user, nome_completo='Ana', telefone='19999997777', email='a@x.com')
+        changes, _, _ = changes_since(user.pk, None, 10)
+        self.assertEqual([c['contact']['id'] for c in changes], [contact.id])
+
+
+class ContactChangesApiTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('api_contact_changes')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_sync_round_trip(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['changes'][0]['contact']['nome_completo'], 'John Doe')
+        self.assertFalse(data['has_more'])
+        cursor = data['cursor']
+        # Nada mudou: página vazia, cursor no mesmo ponto.
+        data = self.client.get(self.url, {'cursor': cursor}).json()
+        self.assertEqual(data['changes'], [])
+        contact_id = self.contact.id
+        self.client.post(reverse('delete_contact', args=[contact_id]))
+        data = self.client.get(self.url, {'cursor': data['cursor']}).json()
+        self.assertEqual([(c['op'], c['id']) for c in data['changes']], [('delete', contact_id)])
+
+    def test_cost_does_not_depend_on_table_size(self):
+        cursor = self.client.get(self.url).json()['cursor']
+        Agenda.objects.bulk_create(
+            Agenda(owner=self.user, nome_completo=f'Contato {i}', telefone='19999998888', email=f'c{i}@x.com')
+            for i in range(50)
+        )
+        cursor = self.client.get(self.url, {'cursor': cursor, 'limit': 1000}).json()['cursor']
+        # Sessão, usuário e a faixa vazia do log (mais o savepoint da leitura).
+        with self.assertNumQueries(5):
+            data = self.client.get(self.url, {'cursor': cursor}).json()
+        self.assertEqual(data['changes'], [])
+
+    def test_limit_is_bounded(self):
+        Agenda.objects.bulk_create(
+            Agenda(owner=self.user, nome_completo=f'Contato {i}', telefone='19999998888', email=f'c{i}@x.com')
+            for i in range(5)
+        )
+        with override_settings(AGENDA_SYNC_MAX_PAGE_SIZE=2):
+            data = self.client.get(self.url, {'limit': 100}).json()
+        self.assertEqual((len(data['changes']), data['has_more']), (2, True))
+
+    def test_invalid_and_expired_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'xyz'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        old = make_cursor(1, timezone.now() - timedelta(days=31))
+        response = self.client.get(self.url, {'cursor': old})
+        self.assertEqual(response.status_code, HTTPStatus.GONE)
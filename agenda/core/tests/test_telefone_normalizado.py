@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.urls import reverse
+from http import HTTPStatus
+from core.models import Agenda
+from core.normalization import normalize_phone
+
+
+class NormalizePhoneTest(TestCase):
+    def test_formats(self):
+        cases = {
+            '(19) 99999-8888': '19999998888',
+            '19 3333-4444': '1933334444',
+            '+55 (19) 99999-8888': '19999998888',
+            '019 99999 8888': '19999998888',
+            '': '',
+        }
+        for telefone, expected in cases.items():
+            with self.subTest(telefone=telefone):
+                self.assertEqual(normalize_phone(telefone), expected)
+
+
+class TelefoneNormalizadoModelTest(TestCase):
+    def test_filled_on_save(self):
+        contact = Agenda.objects.create(nome_completo='John Doe', telefone='(19) 99999-8888', email='john@example.com')
+        self.assertEqual(contact.telefone_normalizado, '19999998888')
+
+    def test_update_fields_includes_derived_field(self):
+        contact = Agenda.objects.create(nome_completo='John Doe', telefone='(19) 99999-8888', email='john@example.com')
+        contact.telefone = '(11) 3333-4444'
+        contact.save(update_fields=['telefone'])
+        contact.refresh_from_db()
+        self.assertEqual(contact.telefone_normalizado, '1133334444')
+
+
+class LookupContactTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('lookup_contact')
+        self.contact = Agenda.objects.create(
+            owner=self.user,
+            nome_completo='John Doe',
+            telefone='(19) 99999-8888',
+            email='john@example.com'
+        )
+
+    def test_lookup_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url, {'telefone': '19999998888'})
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_lookup_by_any_format(self):
+        response = self.client.get(self.url, {'telefone': '+55 19 99999 8888'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()
+        self.assertEqual(data['telefone'], '19999998888')
+        self.assertEqual([c['id'] for c in data['contacts']], [self.contact.id])
+
+    def test_lookup_unknown_number(self):
+        response = self.client.get(self.url, {'telefone': '1133334444'})
+        self.assertEqual(response.json()['contacts'], [])
+
+    def test_lookup_without_number(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
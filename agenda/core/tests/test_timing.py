@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core.models import Agenda
+from core.testing import QueryBudgetMixin
+
+
+def server_timing(response):
+    metrics = {}
+    for metric in response['Server-Timing'].split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@override_settings(AGENDA_REQUEST_TIMING=True)
+class RequestTimingTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@fatec.sp.gov.br',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.contact = Agenda.objects.create(
+            owner=self.user, nome_completo='John Doe', telefone='(19) 99999-8888', email='john@example.com'
+        )
+
+    def test_server_timing_header(self):
+        with self.assertLogs('core.timing', 'INFO'):
+            response = self.client.get(reverse('search_contacts'), {'q': 'john'})
+        metrics = server_timing(response)
+        self.assertEqual(set(metrics), {'db', 'tpl', 'view', 'total'})
+        # Sessão, usuário e a busca.
+        self.assertEqual(metrics['db']['desc'], '"3 queries"')
+        self.assertGreater(float(metrics['tpl']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['view']['dur']))
+
+    def test_log_line(self):
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.get(reverse('list_contacts'))
+        self.assertIn('path=/contacts/ status=200', logs.output[0])
+        self.assertEqual(logs.records[0].timing['queries'], 3)
+
+    @override_settings(ROOT_URLCONF='core.async_urls')
+    async def test_async_views(self):
+        await self.async_client.aforce_login(self.user)
+        with self.assertLogs('core.timing', 'INFO'):
+            response = await self.async_client.get(reverse('contact_detail', args=[self.contact.id]))
+        self.assertIn('"3 queries"', response['Server-Timing'])
+
+
+class RequestTimingDisabledTest(TestCase):
+    def test_no_header_by_default(self):
+        response = Client().get(reverse('login'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@fatec.sp.gov.br', password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_budget_exceeded(self):
+        with self.assertRaises(AssertionError) as ctx:
+            with self.assertMaxQueries(1):
+                list(User.objects.all())
+                list(Agenda.objects.all())
+        self.assertIn('2 consultas executadas, orçamento de 1', str(ctx.exception))
+
+    def test_list_does_not_grow_with_page_size(self):
+        Agenda.objects.bulk_create(
+            Agenda(owner=self.user, nome_completo=f'Contato {i}', telefone='19999998888', email=f'c{i}@example.com')
+            for i in range(60)
+        )
+        for page_size in (5, 50):
+            with self.subTest(page_size=page_size), self.assertMaxQueries(3):
+                self.client.get(reverse('search_contacts'), {'q': 'contato', 'page_size': page_size})
@@ -0,0 +1,92 @@
+import time
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template
+
+# Métricas da requisição em andamento. Um ContextVar (e não uma variável de
+# thread) acompanha a requisição também nas threads do sync_to_async.
+current = ContextVar('agenda_request_timing', default=None)
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.total = None
+        self.view = None
+
+    def start_view(self):
+        self.view_started = time.perf_counter()
+
+    def finish(self):
+        now = time.perf_counter()
+        self.total = now - self.started
+        if self.view_started is not None:
+            self.view = now - self.view_started
+
+    def server_timing(self):
+        metrics = [
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.2f}',
+        ]
+        if self.view is not None:
+            metrics.append(f'view;dur={self.view * 1000:.2f}')
+        metrics.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db * 1000, 2),
+            'template_ms': round(self.template * 1000, 2),
+            'view_ms': None if self.view is None else round(self.view * 1000, 2),
+            'total_ms': round(self.total * 1000, 2),
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    timing = current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db += time.perf_counter() - start
+        timing.queries += 1
+
+
+def install_query_recorder(conn):
+    # Fica instalado na conexão: sem requisição medida, só repassa a consulta.
+    if record_query not in conn.execute_wrappers:
+        conn.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = current.get()
+        if timing is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Backend de templates do Django que soma o tempo de renderização na
+    requisição medida (inclui os {% include %}, renderizados dentro dela).
+    """
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
@@ -1,5 +1,11 @@
 from django.urls import path
-from core.views import login, logout, home, create_contact, list_contacts, update_contact, delete_contact
+from core import api
+from core.views import (
+    login, logout, home, create_contact, list_contacts, update_contact, delete_contact,
+    search_contacts, lookup_contact, import_contacts, export_contacts, contact_detail, metrics,
+    review_duplicates, autocomplete_contacts, job_detail, job_status, download_job_result,
+    contact_events,
+)
 
 
 urlpatterns = [
@@ -8,7 +14,23 @@ urlpatterns = [
     path('index/', home, name='index'),
     path('', home, name='home'),
     path('contacts/create/', create_contact, name='create_contact'),
+    path('contacts/import/', import_contacts, name='import_contacts'),
+    path('contacts/export/', export_contacts, name='export_contacts'),
     path('contacts/', list_contacts, name='list_contacts'),
+    path('contacts/search/', search_contacts, name='search_contacts'),
+    path('contacts/lookup/', lookup_contact, name='lookup_contact'),
+    path('contacts/autocomplete/', autocomplete_contacts, name='autocomplete_contacts'),
+    path('contacts/events/', contact_events, name='contact_events'),
+    path('contacts/duplicates/', review_duplicates, name='review_duplicates'),
+    path('contacts/<int:contact_id>/', contact_detail, name='contact_detail'),
     path('contacts/<int:contact_id>/update/', update_contact, name='update_contact'),
     path('contacts/<int:contact_id>/delete/', delete_contact, name='delete_contact'),
+    path('jobs/<int:job_id>/', job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/status/', job_status, name='job_status'),
+    path('jobs/<int:job_id>/download/', download_job_result, name='download_job_result'),
+    path('metrics', metrics, name='metrics'),
+    path('api/contacts/batch/create/', api.create_contacts, name='api_create_contacts'),
+    path('api/contacts/batch/update/', api.update_contacts, name='api_update_contacts'),
+    path('api/contacts/batch/delete/', api.delete_contacts, name='api_delete_contacts'),
+    path('api/contacts/changes/', api.contact_changes, name='api_contact_changes'),
 ]
\ No newline at end of file
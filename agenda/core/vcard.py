@@ -0,0 +1,108 @@
+_UNESCAPE = {'n': '\n', 'N': '\n', ',': ',', ';': ';', '\\': '\\'}
+
+
+def unescape(value):
+    chars = []
+    it = iter(value)
+    for char in it:
+        if char == '\\':
+            escaped = next(it, '')
+            chars.append(_UNESCAPE.get(escaped, escaped))
+        else:
+            chars.append(char)
+    return ''.join(chars)
+
+
+def _unfold(lines):
+    # RFC 6350: linhas que começam com espaço ou tab continuam a anterior.
+    current, start = None, 0
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def parse(lines):
+    """
+    Lê vCards de um iterável de linhas, um cartão por vez, e gera tuplas
+    (linha inicial, dados) com as chaves usadas pelo AgendaForm.
+    """
+    card = None
+    for number, line in _unfold(lines):
+        if not line.strip():
+            continue
+        name, _, value = line.partition(':')
+        # "item1.TEL;TYPE=CELL" -> "TEL"
+        prop = name.split(';', 1)[0].rsplit('.', 1)[-1].upper()
+        if prop == 'BEGIN' and value.strip().upper() == 'VCARD':
+            card = {'_linha': number}
+        elif card is None:
+            continue
+        elif prop == 'END':
+            start = card.pop('_linha')
+            if 'nome_completo' not in card and '_n' in card:
+                card['nome_completo'] = card['_n']
+            card.pop('_n', None)
+            yield start, card
+            card = None
+        elif prop == 'FN':
+            card['nome_completo'] = unescape(value).strip()
+        elif prop == 'N':
+            parts = [unescape(p).strip() for p in value.split(';')]
+            # N: sobrenome;nome;nomes adicionais;prefixo;sufixo
+            ordered = parts[3:4] + parts[1:3] + parts[0:1] + parts[4:5]
+            card['_n'] = ' '.join(p for p in ordered if p)
+        elif prop == 'TEL':
+            card.setdefault('telefone', unescape(value).strip().removeprefix('tel:'))
+        elif prop == 'EMAIL':
+            card.setdefault('email', unescape(value).strip())
+        elif prop == 'NOTE':
+            card['observacao'] = unescape(value)
+
+
+def escape(value):
+    return (
+        value.replace('\\', '\\\\')
+        .replace('\r\n', '\n')
+        .replace('\n', '\\n')
+        .replace(',', '\\,')
+        .replace(';', '\\;')
+    )
+
+
+def _fold(line, limit=75):
+    # RFC 6350: linhas com mais de 75 octetos são dobradas com CRLF + espaço.
+    if len(line.encode('utf-8')) <= limit:
+        return line + '\r\n'
+    parts, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > limit:
+            parts.append(current)
+            # O espaço de continuação conta no limite da próxima linha.
+            current, size = '', 1
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def serialize(nome_completo, telefone, email, observacao=''):
+    lines = [
+        'BEGIN:VCARD',
+        'VERSION:3.0',
+        f'FN:{escape(nome_completo)}',
+        f'N:{escape(nome_completo)};;;;',
+        f'TEL:{escape(telefone)}',
+        f'EMAIL:{escape(email)}',
+    ]
+    if observacao:
+        lines.append(f'NOTE:{escape(observacao)}')
+    lines.append('END:VCARD')
+    return ''.join(_fold(line) for line in lines)
@@ -1,6 +1,32 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse,
+)
 from django.shortcuts import render, redirect, get_object_or_404
-from core.forms import LoginForm, AgendaForm
-from core.models import Agenda
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import add_never_cache_headers, patch_cache_control, patch_vary_headers
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+from core import metrics as metrics_registry
+from core.bulk import import_file, is_contact_id
+from core.cache import list_cache_key
+from core.conditional import (
+    add_contact_validators, contact_list_etag, contact_list_last_modified, contact_not_modified, is_partial,
+)
+from core.dedupe import merge_candidates
+from core.exporters import FORMATS as EXPORT_FORMATS, stream_contacts
+from core.forms import LoginForm, AgendaForm, ImportContactsForm
+from core.importers import InvalidImportFile
+from core.jobs import enqueue
+from core.models import Agenda, DuplicateCandidate, Job
+from core.normalization import normalize_phone
+from core.pagination import KeysetPaginator, InvalidCursor
+from core.search import autocomplete, filter_contacts, search_contacts as search_index
 from django.contrib.auth import login as auth_login, logout as auth_logout
 from django.contrib.auth.decorators import login_required
 
@@ -30,41 +56,300 @@ def home(request):
     return render(request, 'index.html', context)
 
 
+def render_contact_form(request, template_name, form, contact=None):
+    context = {'form': form, 'contact': contact}
+    if is_partial(request):
+        # 422 num POST inválido: a página mantém o formulário aberto, com os erros.
+        status = 422 if form.is_bound else 200
+        response = render(request, '_contact_form.html', context, status=status)
+    else:
+        response = render(request, template_name, context)
+    patch_vary_headers(response, ['X-Partial'])
+    return response
+
+
+def render_contact_row(request, contact, status=200):
+    return render(request, '_contact_row.html', {'contact': contact}, status=status)
+
+
 @login_required
 def create_contact(request):
     if request.method == 'POST':
         form = AgendaForm(request.POST)
         if form.is_valid():
-            form.save()
+            form.instance.owner = request.user
+            contact = form.save()
+            if is_partial(request):
+                return render_contact_row(request, contact, status=201)
             return redirect('list_contacts')
     else:
         form = AgendaForm()
-    return render(request, 'create_contact.html', {'form': form})
+    return render_contact_form(request, 'create_contact.html', form)
+
+
+def parse_id(value):
+    """
+    `value` como inteiro não negativo que cabe no SQLite, ou None. Não usa
+    str.isdigit(): ele aceita dígitos como '²', que o int() recusa.
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 and is_contact_id(number) else None
+
+
+def get_page_size(request):
+    try:
+        page_size = int(request.GET.get('page_size', settings.AGENDA_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.AGENDA_PAGE_SIZE
+    return max(1, min(page_size, settings.AGENDA_MAX_PAGE_SIZE))
 
 
 @login_required
+def import_contacts(request):
+    report = None
+    if request.method == 'POST':
+        form = ImportContactsForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+            if arquivo.size > settings.AGENDA_JOBS_IMPORT_MIN_BYTES:
+                # Arquivos grandes são importados pelo worker (core/jobs.py).
+                job = enqueue('import_contacts', request.user, {'formato': form.formato}, arquivo)
+                return redirect('job_detail', job.id)
+            try:
+                report = import_file(arquivo, form.formato, request.user)
+            except InvalidImportFile as e:
+                form.add_error('arquivo', str(e))
+    else:
+        form = ImportContactsForm()
+    return render(request, 'import_contacts.html', {'form': form, 'report': report})
+
+
+def owner_contacts(request):
+    # Ponto único de escopo: toda view parte só dos contatos do usuário logado.
+    return Agenda.objects.filter(owner=request.user)
+
+
+def contacts_queryset(request):
+    """
+    Contatos visíveis na listagem, com os filtros da query string aplicados.
+    É a base comum da listagem e da exportação.
+    """
+    return filter_contacts(owner_contacts(request), request.GET.get('q', '').strip())
+
+
+def get_page(request, queryset):
+    paginator = KeysetPaginator(queryset, 'nome_ordenacao', get_page_size(request))
+    try:
+        return paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        return paginator.page()
+
+
+def render_contact_list(request, kind, build_context):
+    """
+    Renderiza list_contacts.html reaproveitando o fragmento da tabela em
+    cache. `build_context` só é chamado (e o banco só é consultado) quando o
+    fragmento para esta versão dos contatos e estes parâmetros não existe.
+    """
+    context = {'query': request.GET.get('q', '').strip()}
+    key = list_cache_key(request, kind)
+    contact_list = cache.get(key)
+    if contact_list is None:
+        context.update(build_context())
+        contact_list = render_to_string('_contact_list.html', context, request)
+        cache.set(key, contact_list, settings.AGENDA_LIST_CACHE_TIMEOUT)
+    context['contact_list'] = mark_safe(contact_list)
+    return render(request, 'list_contacts.html', context)
+
+
+@login_required
+@condition(etag_func=contact_list_etag, last_modified_func=contact_list_last_modified)
 def list_contacts(request):
-    contacts = Agenda.objects.all().order_by('nome_completo')
-    return render(request, 'list_contacts.html', {'contacts': contacts})
+    def build_context():
+        page = get_page(request, contacts_queryset(request))
+        return {'contacts': page.object_list, 'page': page}
+    return render_contact_list(request, 'list', build_context)
+
+
+@login_required
+def export_contacts(request):
+    formato = request.GET.get('formato', 'csv')
+    if formato not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('Formato de exportação inválido.')
+    content_type, filename = EXPORT_FORMATS[formato]
+    queryset = contacts_queryset(request).order_by('nome_ordenacao', 'id')
+    limit = settings.AGENDA_JOBS_EXPORT_MIN_ROWS
+    if queryset[limit:limit + 1].exists():
+        # Só verifica se passa do limite, sem contar tudo.
+        job = enqueue('export_contacts', request.user, {
+            'formato': formato, 'q': request.GET.get('q', '').strip(),
+        })
+        return redirect('job_detail', job.id)
+    response = StreamingHttpResponse(stream_contacts(queryset, formato), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def search_contacts(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return redirect('list_contacts')
+    return render_contact_list(request, 'search', lambda: {
+        'contacts': search_index(query, get_page_size(request), request.user.pk),
+    })
+
+
+@login_required
+def lookup_contact(request):
+    telefone = normalize_phone(request.GET.get('telefone', ''))
+    if not telefone:
+        return JsonResponse({'erro': 'Informe um telefone.'}, status=400)
+    contacts = owner_contacts(request).filter(telefone_normalizado=telefone).order_by('id')
+    return JsonResponse({'telefone': telefone, 'contacts': [c.to_dict() for c in contacts]})
+
+
+def get_autocomplete_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.AGENDA_AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = settings.AGENDA_AUTOCOMPLETE_LIMIT
+    return max(1, min(limit, settings.AGENDA_AUTOCOMPLETE_MAX_LIMIT))
+
+
+def autocomplete_response(request, prefix, results):
+    """
+    Devolve `seq` como veio: o navegador numera cada tecla e descarta
+    respostas que chegam depois de uma mais nova. O cache curto evita
+    repetir a consulta quando o usuário apaga e redigita o mesmo prefixo.
+    """
+    response = JsonResponse({
+        'q': prefix,
+        'seq': parse_id(request.GET.get('seq')),
+        'results': results,
+    })
+    patch_cache_control(response, private=True, max_age=settings.AGENDA_AUTOCOMPLETE_MAX_AGE)
+    return response
+
+
+@login_required
+def autocomplete_contacts(request):
+    prefix = request.GET.get('q', '').lstrip()
+    results = autocomplete(prefix, get_autocomplete_limit(request), request.user.pk) if prefix else []
+    return autocomplete_response(request, prefix, results)
+
+
+@login_required
+def contact_detail(request, contact_id):
+    contact = get_object_or_404(owner_contacts(request), id=contact_id)
+    return JsonResponse(contact.to_dict())
 
 
 @login_required
 def update_contact(request, contact_id):
-    contact = get_object_or_404(Agenda, id=contact_id)
+    contact = get_object_or_404(owner_contacts(request), id=contact_id)
     if request.method == 'POST':
         form = AgendaForm(request.POST, instance=contact)
         if form.is_valid():
             form.save()
+            if is_partial(request):
+                return render_contact_row(request, contact)
             return redirect('list_contacts')
     else:
+        not_modified = contact_not_modified(request, contact)
+        if not_modified is not None:
+            return not_modified
         form = AgendaForm(instance=contact)
-    return render(request, 'update_contact.html', {'form': form, 'contact': contact})
+    response = render_contact_form(request, 'update_contact.html', form, contact)
+    return add_contact_validators(request, response, contact)
 
 
 @login_required
 def delete_contact(request, contact_id):
-    contact = get_object_or_404(Agenda, id=contact_id)
+    contact = get_object_or_404(owner_contacts(request), id=contact_id)
     if request.method == 'POST':
         contact.delete()
+        if is_partial(request):
+            return HttpResponse(status=204)
         return redirect('list_contacts')
-    return redirect('list_contacts')
\ No newline at end of file
+    return redirect('list_contacts')
+
+@login_required
+def review_duplicates(request):
+    pending = DuplicateCandidate.objects.filter(
+        status=DuplicateCandidate.PENDENTE, contact_a__owner=request.user,
+    )
+    if request.method == 'POST':
+        ids = [i for i in map(parse_id, request.POST.getlist('candidatos')) if i is not None]
+        selected = pending.filter(id__in=ids)
+        if request.POST.get('acao') == 'mesclar':
+            merge_candidates(selected)
+        else:
+            selected.update(status=DuplicateCandidate.DESCARTADO)
+        return redirect('review_duplicates')
+    candidates = pending.select_related('contact_a', 'contact_b').order_by('-score', 'id')
+    return render(request, 'duplicates.html', {
+        'candidates': candidates[:get_page_size(request)],
+        'total': pending.count(),
+    })
+
+
+@login_required
+def contact_events(request):
+    # Eventos ao vivo só existem sob ASGI (core.async_views.contact_events):
+    # no WSGI cada conexão aberta prenderia uma thread. O 204 faz o
+    # EventSource do navegador desistir de reconectar.
+    return HttpResponse(status=204)
+
+
+def owner_job(request, job_id):
+    return get_object_or_404(Job.objects.filter(owner=request.user), id=job_id)
+
+
+@login_required
+def job_detail(request, job_id):
+    return render(request, 'job.html', {'job': owner_job(request, job_id)})
+
+
+@login_required
+def job_status(request, job_id):
+    job = owner_job(request, job_id)
+    data = job.to_dict()
+    data['download_url'] = reverse('download_job_result', args=[job.id]) if job.arquivo_resultado else None
+    response = JsonResponse(data)
+    # Consultado repetidamente pela página da tarefa: nunca em cache.
+    add_never_cache_headers(response)
+    return response
+
+
+@login_required
+def download_job_result(request, job_id):
+    job = owner_job(request, job_id)
+    if not job.arquivo_resultado:
+        raise Http404('Tarefa sem arquivo de resultado.')
+    return FileResponse(
+        job.arquivo_resultado.open('rb'), as_attachment=True,
+        filename=os.path.basename(job.arquivo_resultado.name),
+    )
+
+
+def can_read_metrics(request):
+    if settings.AGENDA_METRICS_PUBLIC or request.user.is_staff:
+        return True
+    token = settings.AGENDA_METRICS_TOKEN
+    if not token:
+        return settings.DEBUG
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+def metrics(request):
+    # Rotas, volumes e falhas de login não são públicos: veja
+    # AGENDA_METRICS_TOKEN e AGENDA_METRICS_PUBLIC nas configurações.
+    if not can_read_metrics(request):
+        return HttpResponse(status=403 if request.user.is_authenticated else 401)
+    return HttpResponse(
+        metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )